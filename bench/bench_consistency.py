@@ -0,0 +1,93 @@
+"""
+Finding the snapshots missing from Hyperbase in a consistency window.
+
+`--rows` snapshots are spread over `--connectors` connectors, one per
+connector and second, and `--missing` of them have no Hyperbase record.
+Both the former set-based diff, which parses every timestamp with
+`dateutil` and keys snapshots by formatted strings, and the current merge
+join of `missing_snapshot_ids` over sorted keys are run on the same data.
+Database and network time are left out, only the in-process work is timed.
+"""
+import argparse
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from dateutil import parser as date_parser
+
+from hyperbase.common import missing_snapshot_ids
+from hyperbase.recorder import to_epoch_ms
+
+
+def set_diff(snapshot_rows, records):
+    """Former diff: rows are (id, connector, ISO timestamp) as read from SQLite."""
+    snapshot_set = [(row[1], date_parser.isoparse(row[2]).replace(microsecond=0)) for row in snapshot_rows]
+    mapping = {}
+    for row in snapshot_rows:
+        mapping[f"{row[1]}{date_parser.isoparse(row[2]).replace(microsecond=0)}"] = row[0]
+    record_set = set()
+    for entry in records:
+        record_set.add((entry.get("hass_connector_entity"),
+            date_parser.isoparse(entry.get("hass_record_date")).replace(microsecond=0)))
+    missing = set(snapshot_set)
+    missing.difference_update(record_set)
+    return [mapping.get(f"{item[0]}{item[1]}") for item in missing]
+
+
+def merge_join(snapshot_keys, records):
+    """Current diff: keys are (connector, epoch second, id) sorted by SQLite."""
+    record_keys = [
+        (entry.get("hass_connector_entity"), to_epoch_ms(entry.get("hass_record_date")) // 1000)
+        for entry in records
+    ]
+    record_keys.sort()
+    return missing_snapshot_ids(snapshot_keys, record_keys)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument("--rows", type=int, default=1_000_000)
+    argument_parser.add_argument("--connectors", type=int, default=1000)
+    argument_parser.add_argument("--missing", type=float, default=0.01)
+    args = argument_parser.parse_args()
+
+    random.seed(0)
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    snapshot_rows = []
+    records = []
+    for snapshot_id in range(args.rows):
+        connector = f"event.connector_{snapshot_id % args.connectors}"
+        timestamp = start + timedelta(seconds=snapshot_id // args.connectors,
+            microseconds=random.randrange(1_000_000))
+        snapshot_rows.append((snapshot_id, connector, timestamp.isoformat()))
+        if random.random() >= args.missing:
+            records.append({
+                "hass_connector_entity": connector,
+                "hass_record_date": timestamp.isoformat(timespec="milliseconds"),
+            })
+    # the recorder returns these keys already ordered by its index
+    snapshot_keys = sorted(
+        (row[1], to_epoch_ms(row[2]) // 1000, row[0]) for row in snapshot_rows)
+    # records of several collections arrive in no particular order
+    random.shuffle(records)
+    print(f"{args.rows:,} snapshots, {args.rows - len(records):,} missing from Hyperbase")
+
+    elapsed = time.perf_counter()
+    expected = sorted(set_diff(snapshot_rows, records))
+    print(f"set diff:   {time.perf_counter() - elapsed:.2f} s")
+
+    elapsed = time.perf_counter()
+    found = merge_join(snapshot_keys, records)
+    print(f"merge join: {time.perf_counter() - elapsed:.2f} s")
+    record_keys = sorted(
+        (entry["hass_connector_entity"], to_epoch_ms(entry["hass_record_date"]) // 1000)
+        for entry in records)
+    elapsed = time.perf_counter()
+    missing_snapshot_ids(snapshot_keys, record_keys)
+    print(f"  of which missing_snapshot_ids: {time.perf_counter() - elapsed:.2f} s")
+
+    assert sorted(found) == expected, "both diffs must find the same snapshots"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Per-tick cost of reading entity states into records.
+
+Every listened entity is read once per tick. A tick over `--entities`
+entities is timed with `parse_entity_data`, which dispatches on the domain
+and builds a new dict on every call, and, when the tree has them, with the
+extractors of `get_entry_extractor`, built once per entity before the ticks.
+The memory allocated per entity is the tracemalloc peak of one tick over
+one entity of each sample kind, each of which fills its own columns.
+"""
+import argparse
+import time
+import tracemalloc
+
+from homeassistant.core import State
+from homeassistant.helpers.entity_registry import RegistryEntry
+
+from hyperbase import models
+
+ENTITIES = [
+    ("sensor.temperature", "temperature", "21.5", {"unit_of_measurement": "°C"}),
+    ("sensor.power", "power", "1250.0", {"unit_of_measurement": "W"}),
+    ("binary_sensor.motion", "motion", "on", {}),
+    ("switch.plug", None, "off", {}),
+    ("light.lamp", None, "on", {
+        "brightness": 180, "color_mode": "rgb", "rgb_color": (255, 120, 10),
+        "color_temp_kelvin": None, "effect": None,
+    }),
+    ("climate.living_room", None, "heat", {
+        "current_temperature": 20.5, "temperature": 22.0, "hvac_action": "heating",
+        "fan_mode": "auto", "preset_mode": None,
+    }),
+    ("cover.blind", "blind", "open", {"current_position": 60, "current_tilt_position": 30}),
+]
+
+
+def build_entities(count):
+    entries = []
+    for index in range(count):
+        entity_id, device_class, state, attributes = ENTITIES[index % len(ENTITIES)]
+        entity_id = f"{entity_id}_{index}"
+        entry = RegistryEntry(
+            entity_id=entity_id,
+            unique_id=entity_id,
+            platform="bench",
+            original_device_class=device_class,
+        )
+        entries.append((entry, State(entity_id, state, attributes)))
+    return entries
+
+
+def measure(name, tick, entities, samples, ticks):
+    tick(entities)
+    elapsed = time.perf_counter()
+    for _ in range(ticks):
+        tick(entities)
+    elapsed = (time.perf_counter() - elapsed) / ticks
+
+    tracemalloc.start()
+    tick(samples)
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    tick(samples)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {elapsed * 1e3:.2f} ms per tick, "
+        f"peak {max(0, peak - before) / len(samples):.0f} bytes allocated per entity")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=10_000)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+    entities = build_entities(args.entities)
+    samples = build_entities(len(ENTITIES))
+    print(f"{args.entities:,} entities")
+
+    def tick_parse(entities):
+        record = {}
+        for entry, state in entities:
+            data = models.parse_entity_data(entry, state)
+            if data is not None:
+                record = {**record, **data}
+        return record
+
+    measure("parse_entity_data", tick_parse, entities, samples, args.ticks)
+
+    get_entry_extractor = getattr(models, "get_entry_extractor", None)
+    if get_entry_extractor is None:
+        return
+    extractors = [(get_entry_extractor(entry), state) for entry, state in entities]
+    sample_extractors = [(get_entry_extractor(entry), state) for entry, state in samples]
+    # the record is kept between ticks, extractors write into it
+    record = {}
+
+    def tick_extractors(extractors):
+        for extractor, state in extractors:
+            extractor(state, record)
+        return record
+
+    measure("get_entry_extractor", tick_extractors, extractors, sample_extractors, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Snapshot recorder throughput.
+
+Writes `--rows` snapshots in batches of `--batch` rows through
+`SnapshotRecorder.write_recorder`, then queries `--windows` consistency
+windows of three minutes. The recorder database is created in a temporary
+directory, the Home Assistant storage directory is never touched.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--connectors", type=int, default=50)
+    parser.add_argument("--windows", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="hyperbase-bench-")
+    os.makedirs(os.path.join(workdir, "config", ".storage"))
+    # the snapshot path is resolved relative to the working directory on import
+    os.chdir(workdir)
+    from hyperbase import recorder as recorder_module
+
+    recorder = recorder_module.SnapshotRecorder(None)
+    recorder._SnapshotRecorder__create_table()
+
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    payload = json.dumps({"data": {"sensor__temperature": 21.5, "hass_name_default": "abc" * 20}})
+    rows = [{
+        "timestamp": (start + timedelta(seconds=i // args.connectors)).isoformat(),
+        "connector_entity_id": f"event.connector_{i % args.connectors}",
+        "collection_id": "collection",
+        "payload": payload,
+    } for i in range(args.rows)]
+
+    elapsed = time.perf_counter()
+    for i in range(0, len(rows), args.batch):
+        recorder.write_recorder(rows[i:i + args.batch], "project")
+    elapsed = time.perf_counter() - elapsed
+    print(f"insert: {args.rows / elapsed:,.0f} rows/s "
+        f"({args.rows // args.batch} batches of {args.batch}, {elapsed:.2f} s)")
+
+    # the baseline recorder returns parsed keys from `query_snapshots`
+    query = getattr(recorder, "query_snapshot_keys", None) or recorder.query_snapshots
+    span = args.rows // args.connectors
+    step = max(1, (span - 180) // args.windows)
+    elapsed = time.perf_counter()
+    for window in range(args.windows):
+        window_start = start + timedelta(seconds=window * step)
+        query(window_start.isoformat(), (window_start + timedelta(minutes=3)).isoformat(), "project")
+    elapsed = time.perf_counter() - elapsed
+    print(f"query:  {args.windows / elapsed:,.1f} windows/s "
+        f"({args.windows} windows of 3 minutes, {elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
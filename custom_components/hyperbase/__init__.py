@@ -10,6 +10,7 @@ configuration.yaml file.
 
 hello_world:
 """
+import voluptuous as vol
 
 from .util import get_model_identity
 from .csv_download import CSVDownloadView
@@ -18,7 +19,35 @@ from .registry import remove_registry
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.typing import ConfigType
-from .const import CONF_BUCKET_ID, CONF_MQTT_ADDRESS, CONF_MQTT_PORT, CONF_MQTT_TOPIC, CONF_PROJECT_ID, CONF_PROJECT_NAME, CONF_USER_COLLECTION_ID, CONF_USER_ID, DOMAIN, HYPERBASE_CONFIG, LOGGER
+from .const import (
+    CAPTURE_MODE_EVENT,
+    CAPTURE_MODE_POLL,
+    CONF_BUCKET_ID,
+    CONF_CAPTURE_MODE,
+    CONF_CHANGE_DEBOUNCE,
+    CONF_CONSISTENCY_CONCURRENCY,
+    CONF_EXPORT_CACHE_SIZE,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_KEYFRAME_INTERVAL,
+    CONF_MQTT_ADDRESS,
+    CONF_MQTT_PORT,
+    CONF_MQTT_TOPIC,
+    CONF_MQTT_TRANSPORT,
+    CONF_PROJECT_ID,
+    CONF_PROJECT_NAME,
+    CONF_PUBLISH_MODE,
+    CONF_RECORDS_PAGE_SIZE,
+    CONF_RECOVERY_CHUNK_SIZE,
+    CONF_USER_COLLECTION_ID,
+    CONF_USER_ID,
+    DOMAIN,
+    HYPERBASE_CONFIG,
+    LOGGER,
+    MQTT_TRANSPORT_ASYNCIO,
+    MQTT_TRANSPORT_THREAD,
+    PUBLISH_MODE_DELTA,
+    PUBLISH_MODE_FULL,
+)
 from .common import HyperbaseCoordinator
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
@@ -26,6 +55,25 @@ from homeassistant.helpers.entity_registry import async_get as async_get_entity_
 
 HyperbaseConfigEntry = ConfigEntry["HyperbaseCoordinator"]
 
+# advanced tuning options of the `hyperbase:` section, see docs/advanced_tuning.md
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema({
+            vol.Optional(CONF_MQTT_TRANSPORT): vol.In((MQTT_TRANSPORT_THREAD, MQTT_TRANSPORT_ASYNCIO)),
+            vol.Optional(CONF_CAPTURE_MODE): vol.In((CAPTURE_MODE_POLL, CAPTURE_MODE_EVENT)),
+            vol.Optional(CONF_CHANGE_DEBOUNCE): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_HEARTBEAT_INTERVAL): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_PUBLISH_MODE): vol.In((PUBLISH_MODE_FULL, PUBLISH_MODE_DELTA)),
+            vol.Optional(CONF_KEYFRAME_INTERVAL): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_RECOVERY_CHUNK_SIZE): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_CONSISTENCY_CONCURRENCY): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_RECORDS_PAGE_SIZE): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_EXPORT_CACHE_SIZE): vol.All(int, vol.Range(min=0)),
+        }),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: HyperbaseConfigEntry
 ) -> bool:
@@ -64,6 +112,8 @@ async def async_setup_entry(
         project_name,
         user_id,
         user_collection_id,
+        config=hass.data.get(HYPERBASE_CONFIG) or {},
+        recorder=snapshot,
     )
     connectors = await entry.runtime_data.reload_listened_devices()
     er = async_get_entity_registry(hass)
@@ -94,6 +144,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: HyperbaseConfigEntry) -
         if entry.runtime_data.is_connected:
             await entry.runtime_data.disconnect()
             LOGGER.info("Disconnected from Hyperbase proxy MQTT server")
+        else:
+            await entry.runtime_data.async_shutdown()
         entry.runtime_data = None
     return True
 
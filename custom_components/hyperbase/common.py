@@ -1,36 +1,113 @@
 import asyncio
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from datetime import timedelta, datetime
+from functools import partial
 from io import BytesIO
-from typing import Any
+from typing import Any, AsyncIterator, Mapping
 from zoneinfo import ZoneInfo
-from dateutil import parser
 
 import httpx
 
-from .recorder import SnapshotRecorder
+from .delta import KEYFRAME_COLUMN, DeltaEncoder
+from .recorder import FailedSnapshot, SnapshotRecorder, to_epoch_ms
 
 
-from .models import DomainDeviceClass, create_schema, parse_entity_data
+from .models import (
+    DomainDeviceClass, create_schema, get_schema_fingerprint, schema_to_dict
+)
 from homeassistant.const import CONF_API_TOKEN, EVENT_HOMEASSISTANT_STARTED, EVENT_HOMEASSISTANT_STOP
 from homeassistant.helpers import json
-from homeassistant.util.json import json_loads
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.core import Event, EventStateChangedData, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event, async_track_time_interval
 # from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from .metadata import ConnectorMetadataCache
+from .model_index import ModelDomainIndex
 from .mqtt import MQTT
+from .scheduler import HyperbaseTickScheduler
 from .const import (
+    CAPTURE_MODE_EVENT,
+    CAPTURE_MODE_POLL,
+    CONF_CAPTURE_MODE,
+    CONF_CHANGE_DEBOUNCE,
+    CONF_CONSISTENCY_CONCURRENCY,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_KEYFRAME_INTERVAL,
+    CONF_MQTT_TRANSPORT,
+    CONF_PUBLISH_MODE,
+    CONF_RECORDS_PAGE_SIZE,
+    CONF_RECOVERY_CHUNK_SIZE,
+    DEFAULT_CHANGE_DEBOUNCE_S,
+    DEFAULT_CONSISTENCY_CONCURRENCY,
+    DEFAULT_HEARTBEAT_INTERVAL_S,
+    DEFAULT_KEYFRAME_INTERVAL,
+    DEFAULT_RECORDS_PAGE_SIZE,
+    DEFAULT_RECOVERY_CHUNK_SIZE,
+    COLLECTION_CATALOG_TTL_S,
+    CONF_AUTH_TOKEN,
     CONF_PROJECT_NAME,
     DOMAIN,
     CONF_BASE_URL,
     LOGGER,
+    MQTT_TRANSPORT_THREAD,
+    PUBLISH_MODE_DELTA,
+    PUBLISH_MODE_FULL,
+    RECOVERY_ACK_TIMEOUT,
+    REVALIDATION_CONCURRENCY,
+    SNAPSHOT_CLEANUP_INTERVAL_S,
 )
 from .exceptions import HyperbaseMQTTConnectionError, HyperbaseRESTConnectionError
-from homeassistant.helpers.device_registry import async_get as async_get_device_registry
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 from .registry import HyperbaseConnectorEntry, async_get_hyperbase_registry
-from homeassistant.helpers.httpx_client import get_async_client
+from .rest import async_get_rest_client
+
+
+def build_recovery_file(record_time: datetime, payloads: list[str]) -> bytes:
+    """Bucket file content of recovered records.
+    
+    Stored payloads already are JSON documents, they are spliced as is into
+    `{"timestamp": ..., "length": ..., "data": [...]}` without being decoded.
+    """
+    content = bytearray(b'{"timestamp":')
+    content += json.json_dumps(record_time.isoformat()).encode("utf-8")
+    content += b',"length":%d,"data":[' % len(payloads)
+    content += b",".join(payload.encode("utf-8") for payload in payloads)
+    content += b"]}"
+    return bytes(content)
+
+
+def missing_snapshot_ids(
+    snapshot_keys: list[tuple[str, int, int]],
+    record_keys: list[tuple[str, int]],
+    ) -> list[int]:
+    """Ids of the snapshots without a Hyperbase record, in a single merge pass.
+    
+    `snapshot_keys` holds (connector entity, epoch second, id) and
+    `record_keys` holds (connector entity, epoch second); both must be sorted.
+    A single id is returned for snapshots sharing the same key.
+    """
+    missing: list[int] = []
+    last_connector = None
+    last_second = None
+    index = 0
+    record_count = len(record_keys)
+    for connector, second, snapshot_id in snapshot_keys:
+        while index < record_count:
+            record_connector, record_second = record_keys[index]
+            if record_connector > connector or (
+                record_connector == connector and record_second >= second):
+                break
+            index += 1
+        if index < record_count and record_keys[index][0] == connector \
+            and record_keys[index][1] == second:
+            continue
+        if connector == last_connector and second == last_second:
+            missing[-1] = snapshot_id
+            continue
+        missing.append(snapshot_id)
+        last_connector = connector
+        last_second = second
+    return missing
 
 
 class HyperbaseConnectors:
@@ -38,59 +115,6 @@ class HyperbaseConnectors:
         self.entries = connectors
 
 
-async def async_verify_device_models(hass: HomeAssistant, connectors: list[HyperbaseConnectorEntry]):
-        """
-        Get each device model and construct mapping for corresponding entity domains.
-        
-        Returns a `dict` with model identities as key and list of DomainDeviceClass.
-        Model identity will be used to create new collection if needed with pattern
-        `hass.<manufacturer> <model identity>`. Model identity can be one of these. Identity priority
-        is aligned with the order.
-        - model name
-        - model id
-        - device name by user
-        - device default name
-        """
-        er = async_get_entity_registry(hass)
-        models: dict[str, dict[str, set]] = {}
-        for connector in connectors:
-            model_identity = connector._collection_name
-            
-            if models.get(model_identity, None) is None:
-                models[model_identity] = {}
-            
-            for listened_entity in connector._listened_entities:
-                entity = er.async_get(listened_entity)
-                if models[model_identity].get(entity.domain, None) is None:
-                    models[model_identity][entity.domain] = set([])
-                
-                if entity.original_device_class is not None:
-                    models[model_identity][entity.domain].add(entity.original_device_class)
-                    continue
-                
-                if entity.translation_key is not None:
-                    models[model_identity][entity.domain].add(entity.translation_key)
-                    continue
-                
-                else:
-                    models[model_identity][entity.domain].add("unknown")
-        
-        model_domains_map: dict[str, list[DomainDeviceClass]] = {}
-        for model_name in models.keys():
-            if model_domains_map.get(model_name, None) is None:
-                model_domains_map[model_name] = []
-            
-            for domain in models[model_name].keys():
-                domain_class = DomainDeviceClass(
-                    domain,
-                    list(models[model_name][domain])
-                )
-                model_domains_map[model_name].append(domain_class)
-        
-        return model_domains_map
-
-
-
 class HyperbaseCoordinator:
     def __init__(
         self,
@@ -104,19 +128,31 @@ class HyperbaseCoordinator:
         hyperbase_project_name: str,
         user_id: str,
         user_collection_id: str,
+        config: dict[str, Any] | None = None,
+        recorder: SnapshotRecorder | None = None,
     ):
-        """Initialize."""
+        """Initialize.
+        
+        `config` holds optional tuning read from the `hyperbase:` section
+        of configuration.yaml. `recorder` is owned by the coordinator and
+        closed on disconnect.
+        """
+        if config is None:
+            config = {}
         self.hass = hass
         self.hyperbase_device_id = device_id
         self.unloading = False
         self._project_name = hyperbase_project_name
         
         self._connectors = HyperbaseConnectors()
+        self.model_index = ModelDomainIndex(hass)
+        self.__unsub_model_index = None
         
         self.manager = HyperbaseProjectManager(
             hass,
             hyperbase_project_id,
             bucket_id,
+            publish_mode=config.get(CONF_PUBLISH_MODE, PUBLISH_MODE_FULL),
         )
         LOGGER.info(hyperbase_project_id)
         self.mqtt_client = MQTT(
@@ -124,6 +160,7 @@ class HyperbaseCoordinator:
             user_id,
             hyperbase_mqtt_host,
             hyperbase_mqtt_port,
+            transport=config.get(CONF_MQTT_TRANSPORT, MQTT_TRANSPORT_THREAD),
         )
         
         self.task_manager = HyperbaseTaskManager(
@@ -132,19 +169,23 @@ class HyperbaseCoordinator:
             mqttc = self.mqtt_client,
             mqtt_topic=hyperbase_mqtt_topic,
             project_manager=self.manager,
+            model_index=self.model_index,
             user_id=user_id,
-            user_collection_id=user_collection_id
+            user_collection_id=user_collection_id,
+            config=config,
+            recorder=recorder,
         )
     
     
     async def async_startup(self):
-        model_domains_map = await async_verify_device_models(self.hass, self._connectors.entries)
+        model_domains_map = self.model_index.get_model_domains_map()
         LOGGER.info(f"({self._project_name}) Startup: Listened devices loaded")
         succeed = await self.manager.async_revalidate_collections(model_domains_map)
         if not succeed:
             return False
         
         LOGGER.info(f"({self._project_name}) Startup: Hyperbase collections revalidated")
+        self.__unsub_model_index = self.model_index.async_listen(self.__on_models_changed)
         await self.connect()
         if self.hass.is_running:
             await self.__async_startup_load_runtime_tasks()
@@ -168,8 +209,18 @@ class HyperbaseCoordinator:
         hyp = await async_get_hyperbase_registry(self.hass)
         _conn = hyp.get_connector_entries_for_project(self.manager.project_id)
         self._connectors.entries = _conn.copy()
+        for connector in self._connectors.entries:
+            self.model_index.add_connector(connector)
 
         return self._connectors.entries
+    
+    
+    @callback
+    def __on_models_changed(self, model_identities: set[str]):
+        """Entity registry changes altered the domains of listened models."""
+        LOGGER.info(f"({self._project_name}) Revalidating collections of changed models: {', '.join(sorted(model_identities))}")
+        self.hass.async_create_task(self.manager.async_revalidate_models(
+            self.model_index.get_model_domains_map(model_identities)))
 
 
     async def async_add_new_listened_device(self, connector: HyperbaseConnectorEntry):
@@ -179,37 +230,8 @@ class HyperbaseCoordinator:
         self._connectors.entries.append(connector)
         if connector._collection_name is None:
             raise Exception("device model identity is not exist")
-        model_identity = connector._collection_name
-        models = {
-            model_identity: {}
-        }
-        er = async_get_entity_registry(self.hass)
-        for entity in connector._listened_entities:
-            entity_entry = er.async_get(entity)
-            if models[model_identity].get(entity_entry.domain, None) is None:
-                models[model_identity][entity_entry.domain] = set([])
-            
-            if entity_entry.original_device_class is not None:
-                models[model_identity][entity_entry.domain].add(entity_entry.original_device_class)
-                continue
-            
-            if entity_entry.translation_key is not None:
-                models[model_identity][entity_entry.domain].add(entity_entry.translation_key)
-                continue
-            
-            else:
-                models[model_identity][entity_entry.domain].add("unknown")
-        
-        
-        model_domains_map: dict[str, list[DomainDeviceClass]] = {
-            model_identity: []
-        }
-        for domain in models[model_identity].keys():
-            domain_class = DomainDeviceClass(
-                domain,
-                list(models[model_identity][domain])
-            )
-            model_domains_map[model_identity].append(domain_class)
+        self.model_index.add_connector(connector)
+        model_domains_map = self.model_index.get_model_domains_map([connector._collection_name])
         
         await self.manager.async_revalidate_collections(model_domains_map, await_result=True)
         await self.task_manager.async_load_runtime_tasks([connector]) # register new device into runtime task
@@ -224,44 +246,35 @@ class HyperbaseCoordinator:
         connector = self.task_manager.get_active_connector_by_id(connector_entity)
         model_identity = connector._collection_name
 
-        # construct schema for updated listened_entities.
-        # It is used to check if hyperbase collection schema should update.
-        models = {
-            model_identity: {}
-        }
-        er = async_get_entity_registry(self.hass)
-        for entity in listened_entities:
-            entity_entry = er.async_get(entity)
-            if models[model_identity].get(entity_entry.domain, None) is None:
-                models[model_identity][entity_entry.domain] = set([])
-            
-            if entity_entry.original_device_class is not None:
-                models[model_identity][entity_entry.domain].add(entity_entry.original_device_class)
-                continue
-            
-            if entity_entry.translation_key is not None:
-                models[model_identity][entity_entry.domain].add(entity_entry.translation_key)
-                continue
-            
-            else:
-                models[model_identity][entity_entry.domain].add("unknown")
+        # only the entities added to or removed from the connector are looked up.
+        # The schema covers every connector of the model, they share a collection.
+        self.model_index.update_connector(connector_entity, model_identity, listened_entities)
+        device_classes = self.model_index.get_model_domains(model_identity)
+        if not self.manager.is_schema_applied(model_identity, get_schema_fingerprint(device_classes, self.manager.keyframe_column)):
+            await self.__async_update_model_schema(model_identity, device_classes)
         
-        model_domains_map: dict[str, list[DomainDeviceClass]] = {
-            model_identity: []
-        }
-        
-        for domain in models[model_identity].keys():
-            domain_class = DomainDeviceClass(
-                domain,
-                list(models[model_identity][domain])
-            )
-            model_domains_map[model_identity].append(domain_class)
+        # mutate Task in the runtime task info list
+        # idk if it is best practice or not, duhh..
+        # if it is working, I ain't touching that anymore
+        connector._listened_entities = listened_entities
+        connector._poll_time_s = poll_time_s
+        self.task_manager.async_refresh_change_capture(connector_entity)
         
-        device_classes = model_domains_map.get(model_identity)
-        latest_schema = create_schema(device_classes)
+        # use returned conenector to cancel and reload runtime task
+        # if needed.
+        return connector
+    
+    
+    async def __async_update_model_schema(self,
+        model_identity: str,
+        device_classes: list[DomainDeviceClass],
+        ):
+        latest_schema = create_schema(device_classes, self.manager.keyframe_column)
         
         # Fetch current collections and schema
-        response = await self.hass.async_add_executor_job(self.manager.fetch_collections)
+        response = await self.manager.async_fetch_collections()
+        if response is None:
+            return
         collections_data = response.get("data", [])
         
         existing_schema = None
@@ -275,22 +288,19 @@ class HyperbaseCoordinator:
                 collection_name = collection.get("name")
                 collection_id = collection.get("id")
         
+        if collection_id is None:
+            return
+        
         # check for different schema.
         # call update schema API if needed
         missing_columns = set(latest_schema.keys()).difference(existing_schema.keys())
+        fingerprint = get_schema_fingerprint(device_classes, self.manager.keyframe_column)
         if len(missing_columns) > 0:
             await self.manager.async_update_collection_task(
-                collection_id, {**latest_schema, **existing_schema}, collection_name)
-        
-        # mutate Task in the runtime task info list
-        # idk if it is best practice or not, duhh..
-        # if it is working, I ain't touching that anymore
-        connector._listened_entities = listened_entities
-        connector._poll_time_s = poll_time_s
-        
-        # use returned conenector to cancel and reload runtime task
-        # if needed.
-        return connector
+                collection_id, {**latest_schema, **existing_schema}, collection_name,
+                fingerprint=fingerprint)
+        else:
+            self.manager.set_schema_applied(collection_id, fingerprint)
     
     
     async def async_reload_task(self, connector: HyperbaseConnectorEntry):
@@ -299,6 +309,16 @@ class HyperbaseCoordinator:
         await self.task_manager.async_load_runtime_tasks([connector])
     
     
+    def remove_listened_device(self, connector_entity_id: str):
+        """Remove a listened device from the runtime."""
+        self.model_index.remove_connector(connector_entity_id)
+        self._connectors.entries = [
+            connector for connector in self._connectors.entries
+            if connector._connector_entity_id != connector_entity_id
+        ]
+        self._cancel_runtime_task(connector_entity_id)
+    
+    
     def _cancel_runtime_task(self, key: str):
         """Cancel task and clear info from runtime dictionary"""
         tasks = self.task_manager.runtime_tasks
@@ -307,10 +327,20 @@ class HyperbaseCoordinator:
         # self.task_manager.cancel_waiting_tasks(key)
         cancel = tasks.get(key)
         cancel() # terminate all tasks
+        self.task_manager.metadata_cache.invalidate(key)
         if task_info.get(key) is not None:
             del task_info[key]
 
 
+    def get_collection_fingerprint(self, collection_id: str) -> str | None:
+        """Schema fingerprint of the model stored in `collection_id`, None if no model uses it."""
+        for model_identity, model_collection_id in self.manager.collections.items():
+            if model_collection_id == collection_id:
+                return get_schema_fingerprint(
+                    self.model_index.get_model_domains(model_identity), self.manager.keyframe_column)
+        return None
+
+
     async def connect(self):
         """Connects to MQTT Broker"""
         try:
@@ -324,16 +354,34 @@ class HyperbaseCoordinator:
         """Disonnects to MQTT Broker"""
         self.unloading = True
         await self.mqtt_client.async_disconnect()
+        await self.async_shutdown()
+
+
+    async def async_shutdown(self):
+        """Stop runtime tasks and timers and close the snapshot recorder.
+        
+        Used by `disconnect`, and on unload when the MQTT connection is
+        already down.
+        """
+        self.unloading = True
+        if self.__unsub_model_index is not None:
+            self.__unsub_model_index()
+            self.__unsub_model_index = None
         tasks = self.task_manager.runtime_tasks
         for connector_id in tasks.keys():
             task = tasks[connector_id] # terminate all tasks
             task()
         self.task_manager._shutdown_cancel()
+        await self.task_manager.recorder.async_close()
 
 
     @property
     def is_connected(self):
         return self.mqtt_client.connected
+    
+    @property
+    def publish_metrics(self):
+        return self.mqtt_client.metrics.as_dict
 
 
 
@@ -351,21 +399,74 @@ class HyperbaseCollection:
 
 
 
+@dataclass(slots=True)
+class CollectionChange:
+    """Collection to create, or to patch when `collection_id` is set."""
+    model_name: str
+    schema: Mapping[str, Mapping[str, Any]]
+    fingerprint: str
+    collection_id: str | None = None
+
+
+
+@dataclass
+class RevalidationPlan:
+    creates: list[CollectionChange] = field(default_factory=list)
+    updates: list[CollectionChange] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_empty(self):
+        return len(self.creates) < 1 and len(self.updates) < 1
+
+
+
+@dataclass
+class RevalidationReport:
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    # collections created without the insert rule of the API token
+    rule_failed: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    elapsed_s: float = 0
+
+    def __str__(self):
+        return (f"{len(self.created)} created, {len(self.updated)} updated, "
+            f"{self.unchanged} unchanged, {len(self.failed)} failed, "
+            f"{len(self.rule_failed)} without token rule in {self.elapsed_s:.2f}s")
+
+
+
 class HyperbaseProjectManager:
     def __init__(
         self,
         hass: HomeAssistant,
         hyperbase_project_id: str,
-        bucket_id: str
+        bucket_id: str,
+        publish_mode: str = PUBLISH_MODE_FULL,
     ):
         """Initialize Hyperbase project manager."""
         self.hass = hass
         LOGGER.info(hyperbase_project_id)
         self.__hyperbase_project_id = hyperbase_project_id
         self._hyperbase_bucket_id = bucket_id
+        # delta records need the keyframe flag to be reassembled
+        self.keyframe_column = publish_mode == PUBLISH_MODE_DELTA
         self.entry = self.hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, self.__hyperbase_project_id)
         self.__collections = {}
         self.__updated_collections = set([])
+        # collection id -> fingerprint of the latest schema known to be applied
+        self.__schema_fingerprints: dict[str, str] = {}
+        # collection list response of the Hyperbase REST API
+        self.__catalog: dict[str, Any] | None = None
+        self.__catalog_etag: str | None = None
+        self.__catalog_fetched_at = float("-inf")
+        self.__catalog_lock = asyncio.Lock()
+        # model identity -> revalidation in flight
+        self.__revalidations: dict[str, asyncio.Task] = {}
+        self.__rest_semaphore = asyncio.Semaphore(REVALIDATION_CONCURRENCY)
+        self.last_revalidation_report: RevalidationReport | None = None
 
     async def async_revalidate_collections(self, model_mapping:dict[str, list[DomainDeviceClass]], await_result: bool = False):
         """Revalidate hyperbase collections.
@@ -376,69 +477,114 @@ class HyperbaseProjectManager:
         If the collection does not exist, it will be created.
         
         Example: `hass.Tuya Wifi Smart Plug`
+        
+        Returns False when the collections cannot be fetched. Without
+        `await_result` the planned changes are applied in the background.
         """
-        response = None
-        try:
-            response = await self.hass.async_add_executor_job(self.fetch_collections)
-        except HyperbaseRESTConnectionError as exc:
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed ({exc.status_code}): {exc}")
+        plan = await self.async_plan_revalidation(model_mapping)
+        if plan is None:
+            return False
+        if plan.is_empty:
+            self.last_revalidation_report = RevalidationReport(unchanged=plan.unchanged)
+        elif not await_result:
+            self.hass.async_create_task(self.async_apply_revalidation(plan))
+        else:
+            # this way used for updated collection while hyperbase connection is running
+            await self.async_apply_revalidation(plan)
+        return True
+    
+    
+    async def async_plan_revalidation(self, model_mapping: dict[str, list[DomainDeviceClass]]) -> RevalidationPlan | None:
+        """Collections to create and to patch for the given models, None if the collections cannot be fetched."""
+        response = await self.async_fetch_collections()
+        if response is None:
+            return None
         
-        if response is not None:
-            collections_data = response.get("data", [])
-            collections: list[HyperbaseCollection] = []
-            for collection in collections_data:
-                
-                # filters only homeassistant collections
-                if collection["name"].startswith("hass."):
-                    collections.append(HyperbaseCollection(
-                        id=collection["id"],
-                        name=collection["name"],
-                        schema_fields=collection["schema_fields"].keys()
-                        ))
-                    collection_name = collection.get("name")
-                    device_model = collection_name.removeprefix("hass.")
-                    self.__collections[device_model] = collection.get("id")
-
-            existing_collections = [c.name.removeprefix("hass.") for c in collections]
-            
-            latest_collections = model_mapping.keys()
-            missing_collections = set(latest_collections).difference(existing_collections)
-            
-            for model_name in missing_collections:
-                device_classes = model_mapping[model_name]
-                schema_fields = create_schema(device_classes)
-                
-                if not await_result:
-                    # invoke near-parallel execution of independent tasks to create new collections
-                    self.hass.async_create_task(self.__async_create_collection_task(model_name, schema_fields))
-                else:
-                    # this way used for updated collection while hyperbase connection is running
-                    await self.__async_create_collection_task(model_name, schema_fields)
-            
-            for collection in collections:
-                if model_mapping.get(collection.name.removeprefix("hass."), None) is None:
-                    continue
-                device_classes = model_mapping[collection.name.removeprefix("hass.")]
-                latest_schema = create_schema(device_classes)
-                existing_schema = collection.schema_fields
-                missing_columns = set(latest_schema.keys()).difference(existing_schema)
-                if len(missing_columns) > 0:
-                    # invoke parallel execution of independent tasks to update collection schema
-                    if not await_result:
-                        self.hass.async_create_task(
-                            self.async_update_collection_task(
-                                collection.id, latest_schema, collection.name))
-                    else:
-                        # this way used for updated collection while hyperbase connection is running
-                        await self.async_update_collection_task(
-                                collection.id, latest_schema, collection.name)
-            return True
+        collections: list[HyperbaseCollection] = []
+        for collection in response.get("data", []):
+            # filters only homeassistant collections
+            if collection["name"].startswith("hass."):
+                collections.append(HyperbaseCollection(
+                    id=collection["id"],
+                    name=collection["name"],
+                    schema_fields=collection["schema_fields"].keys()
+                    ))
+                self.__collections[collection["name"].removeprefix("hass.")] = collection.get("id")
+        
+        plan = RevalidationPlan()
+        existing_collections = set(c.name.removeprefix("hass.") for c in collections)
+        for model_name in set(model_mapping.keys()).difference(existing_collections):
+            device_classes = model_mapping[model_name]
+            plan.creates.append(CollectionChange(
+                model_name, create_schema(device_classes, self.keyframe_column),
+                get_schema_fingerprint(device_classes, self.keyframe_column)))
+        
+        for collection in collections:
+            device_classes = model_mapping.get(collection.name.removeprefix("hass."))
+            if device_classes is None:
+                continue
+            fingerprint = get_schema_fingerprint(device_classes, self.keyframe_column)
+            if self.__schema_fingerprints.get(collection.id) == fingerprint:
+                # same model schema was already checked against this collection
+                plan.unchanged += 1
+                continue
+            latest_schema = create_schema(device_classes, self.keyframe_column)
+            if set(latest_schema.keys()).issubset(collection.schema_fields):
+                self.__schema_fingerprints[collection.id] = fingerprint
+                plan.unchanged += 1
+                continue
+            plan.updates.append(CollectionChange(
+                collection.name.removeprefix("hass."), latest_schema, fingerprint, collection.id))
+        return plan
+    
+    
+    async def async_apply_revalidation(self, plan: RevalidationPlan) -> RevalidationReport:
+        """Create and patch the planned collections.
+        
+        Every change runs concurrently over the shared REST client, with at
+        most `REVALIDATION_CONCURRENCY` requests in flight.
+        """
+        report = RevalidationReport(unchanged=plan.unchanged)
+        started = time.monotonic()
+        await asyncio.gather(
+            *(self.__async_apply_create(change, report) for change in plan.creates),
+            *(self.__async_apply_update(change, report) for change in plan.updates),
+        )
+        report.elapsed_s = time.monotonic() - started
+        self.last_revalidation_report = report
+        LOGGER.info(f"({self.entry.data[CONF_PROJECT_NAME]}) Collections revalidated: {report}")
+        return report
+    
+    
+    async def __async_apply_create(self, change: CollectionChange, report: RevalidationReport):
+        async with self.__rest_semaphore:
+            collection_id = await self.__async_create_collection(change.model_name, schema_to_dict(change.schema))
+        if collection_id is None:
+            report.failed.append(change.model_name)
+            return
+        self.__schema_fingerprints[collection_id] = change.fingerprint
+        report.created.append(change.model_name)
+        async with self.__rest_semaphore:
+            is_added = await self.__async_add_collection_rule(collection_id, change.model_name)
+        if not is_added:
+            report.rule_failed.append(change.model_name)
+    
+    
+    async def __async_apply_update(self, change: CollectionChange, report: RevalidationReport):
+        async with self.__rest_semaphore:
+            is_updated = await self.__async_update_collection_fields(
+                change.collection_id, schema_to_dict(change.schema), f"hass.{change.model_name}")
+        if not is_updated:
+            report.failed.append(change.model_name)
+            return
+        self.__schema_fingerprints[change.collection_id] = change.fingerprint
+        report.updated.append(change.model_name)
 
 
     async def async_get_project_collections(self):
         response = None
         try:
-            response = await self.hass.async_add_executor_job(self.fetch_collections)
+            response = await self.async_fetch_collections()
         except Exception as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed {exc}")
         
@@ -454,16 +600,22 @@ class HyperbaseProjectManager:
                     self.__collections[device_model] = collection.get("id")
 
 
-    async def __async_create_collection_task(self, entity_domain, schema):
-        await self.hass.async_add_executor_job(
-            self.__create_collection, entity_domain, schema
-        )
-    
     async def async_update_collection_task(self, collection_id, schema,
-        collection_name: str | None = None):
-        await self.hass.async_add_executor_job(
-            self.__update_collection_fields, collection_id, schema, collection_name
-        )
+        collection_name: str | None = None, fingerprint: str | None = None):
+        is_updated = await self.__async_update_collection_fields(
+            collection_id, schema_to_dict(schema), collection_name)
+        if is_updated and fingerprint is not None:
+            self.__schema_fingerprints[collection_id] = fingerprint
+    
+    
+    def is_schema_applied(self, model_identity: str, fingerprint: str):
+        """Whether the model schema with `fingerprint` is known to be applied to its collection."""
+        collection_id = self.get_collection_id(model_identity)
+        return collection_id is not None and self.__schema_fingerprints.get(collection_id) == fingerprint
+    
+    
+    def set_schema_applied(self, collection_id: str, fingerprint: str):
+        self.__schema_fingerprints[collection_id] = fingerprint
 
     
     def get_collection_id(self, model_identity: str):
@@ -475,103 +627,116 @@ class HyperbaseProjectManager:
         return collections_ids
     
     
-    def __update_collection_fields(self, collection_id, schema, collection_name):
+    async def __async_update_collection_fields(self, collection_id, schema, collection_name):
         headers = {
                 "Authorization": f"Bearer {self.entry.data["auth_token"]}",
             }
         response = None
         base_url = self.entry.data[CONF_BASE_URL]
         try:
-            with httpx.Client(headers=headers, verify=False) as session:
-                response = session.patch(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/collection/{collection_id}",
-                        json={
-                            "schema_fields": schema,
-                        },
-                        timeout=httpx.Timeout(10, connect=5, read=20, write=5)
-                    )
-                response.raise_for_status()
-                LOGGER.info(f"({self.entry.data[CONF_PROJECT_NAME]}) schema updated for collection: {collection_name}")
-                self.__updated_collections.discard(collection_id)
+            response = await self.rest_client.patch(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/collection/{collection_id}",
+                    json={
+                        "schema_fields": schema,
+                    },
+                    headers=headers,
+                )
+            response.raise_for_status()
+            LOGGER.info(f"({self.entry.data[CONF_PROJECT_NAME]}) schema updated for collection: {collection_name}")
+            self.invalidate_catalog()
+            self.__updated_collections.discard(collection_id)
+            return True
         except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed: {exc}")
         except httpx.HTTPStatusError as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to fetch collections: {exc}")
-        except json.decoder.JSONDecodeError as exc:
+        except ValueError as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown response from server. JSON decode error")
         except Exception as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown error on collection {collection_id}: {exc}")
 
-    def __create_collection(self, entity_domain, schema):
+    async def __async_create_collection(self, entity_domain, schema) -> str | None:
         headers = {
                 "Authorization": f"Bearer {self.entry.data["auth_token"]}",
             }
-        response = None
         base_url = self.entry.data[CONF_BASE_URL]
-        api_token_id = self.entry.data.get(CONF_API_TOKEN)
-        
-        is_success = False
-        created_collection: str = ""
         try:
-            with httpx.Client(headers=headers, verify=False) as session:
-                response = session.post(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/collection",
-                        json={
-                            "name": "hass." + entity_domain,
-                            "schema_fields": schema,
-                            "opt_auth_column_id": False
-                        },
-                        timeout=httpx.Timeout(10, connect=5, read=20, write=5)
-                    )
-                response.raise_for_status()
-                is_success = True
-                LOGGER.info(f"({self.entry.data[CONF_PROJECT_NAME]}) create new collection: hass.{entity_domain}")
-                
-                # insert new rule for api token to insert into created collection
-                result = response.json()
-                data = result.get("data")
-                created_collection = data.get("name")
-                created_collection_id = data.get("id")
-                response = session.post(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/token/{api_token_id}/collection_rule",
-                        json={
-                            "collection_id": created_collection_id,
-                            "find_one": "none",
-                            "find_many": "none",
-                            "insert_one": True,
-                            "update_one": "none",
-                            "delete_one": "none"
-                        },
-                        timeout=httpx.Timeout(10, connect=5, read=20, write=5),
-                    )
-                response.raise_for_status()
-                self.__collections[created_collection.removeprefix("hass.")] = created_collection_id
+            response = await self.rest_client.post(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/collection",
+                    json={
+                        "name": "hass." + entity_domain,
+                        "schema_fields": schema,
+                        "opt_auth_column_id": False
+                    },
+                    headers=headers,
+                )
+            response.raise_for_status()
+            self.invalidate_catalog()
+            LOGGER.info(f"({self.entry.data[CONF_PROJECT_NAME]}) create new collection: hass.{entity_domain}")
+            
+            data = response.json().get("data")
+            created_collection_id = data.get("id")
+            self.__collections[data.get("name").removeprefix("hass.")] = created_collection_id
+            return created_collection_id
         except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed: {exc}")
         except httpx.HTTPStatusError as exc:
-            LOGGER.info(exc.response.json())
-            if not is_success:
-                LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to create collection: {exc}")
-                return
-            LOGGER.warning(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to create new rule for collection {created_collection}. Please add it manually in the Hyperbase.")
+            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to create collection: {exc}")
         except Exception as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown error: {exc}")
     
     
-    async def async_create_bucket_object(self, payload: dict):
+    async def __async_add_collection_rule(self, collection_id: str, entity_domain: str) -> bool:
+        """Allow the API token to insert into the collection."""
         headers = {
                 "Authorization": f"Bearer {self.entry.data["auth_token"]}",
             }
-        json_string = json.json_dumps(payload)
-        json_bytes = json_string.encode("utf-8")
+        base_url = self.entry.data[CONF_BASE_URL]
+        api_token_id = self.entry.data.get(CONF_API_TOKEN)
+        try:
+            response = await self.rest_client.post(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/token/{api_token_id}/collection_rule",
+                    json={
+                        "collection_id": collection_id,
+                        "find_one": "none",
+                        "find_many": "none",
+                        "insert_one": True,
+                        "update_one": "none",
+                        "delete_one": "none"
+                    },
+                    headers=headers,
+                )
+            response.raise_for_status()
+            return True
+        except httpx.HTTPError as exc:
+            LOGGER.warning(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to create new rule for collection hass.{entity_domain}: {exc}. Please add it manually in the Hyperbase.")
+        except Exception as exc:
+            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown error: {exc}")
+        return False
+    
+    
+    async def async_create_bucket_object(self, payload: dict | bytes, part: int | None = None):
+        """Upload recovered records. `part` numbers the files of a recovery split in chunks.
+        
+        `payload` may be given as already encoded JSON bytes.
+        """
+        headers = {
+                "Authorization": f"Bearer {self.entry.data["auth_token"]}",
+            }
+        if isinstance(payload, bytes):
+            json_bytes = payload
+        else:
+            json_bytes = json.json_dumps(payload).encode("utf-8")
         
         file = BytesIO(json_bytes)
         file_name = f"HA{datetime.now().strftime("%Y%M%d_%H%m%s")}.json"
+        if part is not None:
+            file_name = f"HA{datetime.now().strftime("%Y%M%d_%H%m%s")}_{part}.json"
         files = {"file": (file_name, file, "application/json")}
         base_url = self.entry.data[CONF_BASE_URL]
         try:
-            session = get_async_client(self.hass)
-            response = await session.post(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/bucket/{self._hyperbase_bucket_id}/file",
+            # verified, unlike the other project calls
+            client = async_get_rest_client(self.hass, verify_ssl=True)
+            response = await client.post(f"{base_url}/api/rest/project/{self.__hyperbase_project_id}/bucket/{self._hyperbase_bucket_id}/file",
                     files=files,
                     data = {"file_name": file_name},
-                    timeout=httpx.Timeout(10, connect=5, read=20, write=5),
                     headers=headers
                 )
             response.raise_for_status()
@@ -589,124 +754,167 @@ class HyperbaseProjectManager:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown error: {exc}")
     
     
-    async def async_fetch_csv_data(self, collection_id, start_time, end_time):
-        try:
-            client = get_async_client(self.hass, verify_ssl=False)
-            
-            headers = {
-                "Authorization": f"Bearer {self.entry.data["auth_token"]}",
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
-            
-            query = {
-                "orders": [
-                    {"field": "hass_connector_entity", "kind": "asc"},
-                    {"field": "hass_record_date", "kind": "asc"},
-                ],
-                "filters": [{
-                    "op": "AND",
+    async def async_iter_records(self,
+        collection_id: str,
+        start_time: str,
+        end_time: str,
+        fields: list[str] | None = None,
+        end_inclusive: bool = False,
+        page_size: int = DEFAULT_RECORDS_PAGE_SIZE,
+        ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate the collection records of a time window, one page at a time.
+        
+        Records are ordered by connector entity and record date. Pages are
+        requested with a limit and continue after the last (connector entity,
+        record date) of the previous page, so only one page is held in memory.
+        Raises `HyperbaseRESTConnectionError` when a page cannot be fetched.
+        """
+        if not self.entry.data[CONF_AUTH_TOKEN]:
+            raise HyperbaseRESTConnectionError("Token not found", status_code=401)
+        
+        client = self.rest_client
+        url = f"{self.entry.data[CONF_BASE_URL]}/api/rest/project/{self.__hyperbase_project_id}/collection/{collection_id}/records"
+        headers = {
+            "Authorization": f"Bearer {self.entry.data[CONF_AUTH_TOKEN]}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        window = [
+            {"field": "hass_record_date", "op": ">=", "value": start_time},
+            {"field": "hass_record_date", "op": "<=" if end_inclusive else "<", "value": end_time},
+        ]
+        last_row: dict[str, Any] | None = None
+        while True:
+            children = list(window)
+            if last_row is not None:
+                # a connector records at most once per record date, so the
+                # page key is unique and the next page starts right after it
+                last_connector = last_row.get("hass_connector_entity")
+                children.append({
+                    "op": "OR",
                     "children": [
-                        {"field": "hass_record_date", "op": ">=", "value": start_time},
-                        {"field": "hass_record_date", "op": "<=", "value": end_time},
+                        {"field": "hass_connector_entity", "op": ">", "value": last_connector},
+                        {"op": "AND", "children": [
+                            {"field": "hass_connector_entity", "op": "=", "value": last_connector},
+                            {"field": "hass_record_date", "op": ">", "value": last_row.get("hass_record_date")},
+                        ]},
                     ]
-                }]
-            }
-            if not self.entry.data["auth_token"]:
-                raise HyperbaseRESTConnectionError("Token not found", 401)
-            
-            client.base_url = self.entry.data[CONF_BASE_URL]
-            LOGGER.info(query)
-            result = await client.post(f"/api/rest/project/{self.__hyperbase_project_id}/collection/{collection_id}/records",
-                headers=headers,
-                timeout=httpx.Timeout(10, connect=5, read=20, write=5),
-                json=query)
-            result.raise_for_status()
-            return {
-                "success": True,
-                "data": result.json().get("data"),
-                "count": result.json().get("pagination").get("total")
-            }
-        except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed: {exc}")
-            return {"success": False}
-        except httpx.HTTPStatusError as exc:
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to fetch collections: {exc}")
-            return {"success": False}
-        except Exception as exc:
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown error: {exc}")
-            return {"success": False}
-    
-    
-    async def async_fetch_records_consistency(self, collection_id, start_time, end_time):
-        try:
-            client = get_async_client(self.hass, verify_ssl=False)
-            
-            headers = {
-                "Authorization": f"Bearer {self.entry.data["auth_token"]}",
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
-            
+                })
             query = {
-                "fields": ["hass_record_date", "hass_connector_entity"],
                 "orders": [
                     {"field": "hass_connector_entity", "kind": "asc"},
                     {"field": "hass_record_date", "kind": "asc"},
                 ],
-                "filters": [{
-                    "op": "AND",
-                    "children": [
-                        {"field": "hass_record_date", "op": ">=", "value": start_time},
-                        {"field": "hass_record_date", "op": "<", "value": end_time},
-                    ]
-                }]
+                "filters": [{"op": "AND", "children": children}],
+                "limit": page_size,
             }
-            if not self.entry.data["auth_token"]:
-                raise HyperbaseRESTConnectionError("Token not found", 401)
+            if fields is not None:
+                query["fields"] = fields
             
-            client.base_url = self.entry.data[CONF_BASE_URL]
-            result = await client.post(f"/api/rest/project/{self.__hyperbase_project_id}/collection/{collection_id}/records",
-                headers=headers,
-                timeout=httpx.Timeout(10, connect=5, read=20, write=5),
-                json=query)
-            result.raise_for_status()
+            try:
+                result = await client.post(url, headers=headers, json=query)
+                result.raise_for_status()
+                rows = result.json().get("data") or []
+            except httpx.HTTPStatusError as exc:
+                raise HyperbaseRESTConnectionError(
+                    f"Failed to fetch records of collection {collection_id}: {exc}",
+                    status_code=exc.response.status_code) from exc
+            except (httpx.HTTPError, ValueError) as exc:
+                raise HyperbaseRESTConnectionError(
+                    f"Failed to fetch records of collection {collection_id}: {exc}") from exc
             
-            return {
-                "success": True,
-                "data": result.json().get("data"),
-                "count": result.json().get("pagination").get("total")
-            }
-        except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed: {exc}")
-            return {"success": False}
-        except httpx.HTTPStatusError as exc:
-            LOGGER.info(exc.response.json())
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Failed to fetch collections: {exc}")
-            return {"success": False}
-        except Exception as exc:
-            LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Unknown error: {exc}")
-            return {"success": False}
+            for row in rows:
+                yield row
+            # an empty page always ends the window, whatever the page size
+            if len(rows) < 1 or len(rows) < page_size:
+                return
+            last_row = rows[-1]
 
 
-    def fetch_collections(self):
+    async def async_fetch_collections(self, force: bool = False):
+        """List of the existing collections within the project, with their schema.
+        
+        The list is cached for `COLLECTION_CATALOG_TTL_S` and downloaded again
+        once expired, after `invalidate_catalog`, or when `force` is set. The
+        download is conditional on the ETag of the cached list when the
+        server sent one. Returns None when the list cannot be fetched.
         """
-        Create a GET request to Hyperbase REST API to get list of existing collections within the project.
-        This is a blocking process and must be executed by sync worker.
+        async with self.__catalog_lock:
+            if (not force and self.__catalog is not None
+                and time.monotonic() - self.__catalog_fetched_at < COLLECTION_CATALOG_TTL_S):
+                return self.__catalog
+            
+            catalog = await self.__async_download_collections()
+            if catalog is not None:
+                self.__catalog = catalog
+                self.__catalog_fetched_at = time.monotonic()
+            return catalog
+    
+    
+    async def async_get_hass_collections(self) -> dict[str, str] | None:
+        """Collection id by collection name of the `hass.` collections, from the catalog."""
+        catalog = await self.async_fetch_collections()
+        if catalog is None:
+            return None
+        return {
+            collection["name"]: collection["id"]
+            for collection in catalog.get("data", [])
+            if collection["name"].startswith("hass.")
+        }
+    
+    
+    async def async_revalidate_models(self, model_mapping: dict[str, list[DomainDeviceClass]]):
+        """Revalidate the collections of the given models only.
+        
+        A model whose revalidation is already in flight is not revalidated
+        again, the caller waits for the running one instead.
         """
+        waiting = {
+            self.__revalidations[model_name]
+            for model_name in model_mapping.keys() if model_name in self.__revalidations
+        }
+        missing = {
+            model_name: device_classes for model_name, device_classes in model_mapping.items()
+            if model_name not in self.__revalidations
+        }
+        if len(missing) > 0:
+            task = self.hass.async_create_task(
+                self.async_revalidate_collections(missing, await_result=True))
+            for model_name in missing.keys():
+                self.__revalidations[model_name] = task
+            task.add_done_callback(partial(self.__revalidation_done, list(missing.keys())))
+            waiting.add(task)
+        # shielded, a cancelled caller must not cancel a revalidation others wait for
+        await asyncio.shield(asyncio.gather(*waiting))
+    
+    
+    def __revalidation_done(self, model_names: list[str], task: asyncio.Task):
+        for model_name in model_names:
+            if self.__revalidations.get(model_name) is task:
+                del self.__revalidations[model_name]
+    
+    
+    def invalidate_catalog(self):
+        """Revalidate the collection list on its next use."""
+        self.__catalog_fetched_at = float("-inf")
+    
+    
+    async def __async_download_collections(self):
         try:
-            with httpx.Client(verify=False) as client:
-                if not self.entry.data["auth_token"]:
-                    raise HyperbaseRESTConnectionError("Token not found", 401)
-                client.headers.update({
-                    "Authorization": f"Bearer {self.entry.data["auth_token"]}",
-                })
-                client.base_url = self.entry.data[CONF_BASE_URL]
-                result = client.get(f"/api/rest/project/{self.__hyperbase_project_id}/collections",
-                    timeout=httpx.Timeout(10, connect=5, read=20, write=5))
-                result.raise_for_status()
-                
-                return result.json()
+            if not self.entry.data["auth_token"]:
+                raise HyperbaseRESTConnectionError("Token not found", status_code=401)
+            headers = {"Authorization": f"Bearer {self.entry.data["auth_token"]}"}
+            if self.__catalog is not None and self.__catalog_etag is not None:
+                headers["If-None-Match"] = self.__catalog_etag
+            result = await self.rest_client.get(
+                f"{self.entry.data[CONF_BASE_URL]}/api/rest/project/{self.__hyperbase_project_id}/collections",
+                headers=headers)
+            if result.status_code == httpx.codes.NOT_MODIFIED:
+                return self.__catalog
+            result.raise_for_status()
+            
+            self.__catalog_etag = result.headers.get("ETag")
+            return result.json()
         except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
             LOGGER.error(f"({self.entry.data[CONF_PROJECT_NAME]}) Hyperbase connection failed: {exc}")
         except httpx.HTTPStatusError as exc:
@@ -718,6 +926,10 @@ class HyperbaseProjectManager:
     def project_id(self):
         return self.__hyperbase_project_id
     
+    @property
+    def rest_client(self):
+        return async_get_rest_client(self.hass)
+    
     @property
     def api_token_id(self):
         return self.entry.data.get(CONF_API_TOKEN)
@@ -764,13 +976,19 @@ class Task:
         user_id: str,
         user_collection_id: str,
         callbacks: dict[str, Any] = None,
+        delta_encoder: DeltaEncoder | None = None,
+        metadata_cache: ConnectorMetadataCache | None = None,
     ):
         self.hass = hass
         self.connector = connector
+        self.__metadata_cache = metadata_cache if metadata_cache is not None else ConnectorMetadataCache(hass)
         self._mqttc = mqtt_client
         self._mqtt_topic = mqtt_topic
         self.__prev_data = None
         self.__prev_fields = set([])
+        self.__entity_fields: dict[str, str] = {}
+        self.__delta_encoder = delta_encoder
+        self.__last_published: datetime | None = None
         self.__project_id = project_id
         self.__collection_name = collection_name
         self.__api_token_id = api_token_id
@@ -779,79 +997,145 @@ class Task:
         
         self.snapshot_buffer = callbacks.get("snapshot_buffer")
         self.get_collection_id = callbacks.get("get_collection_id")
+        
+        # change capture mode
+        self.__dirty_entities: set[str] = set([])
+        self.__debounce_s = DEFAULT_CHANGE_DEBOUNCE_S
+        self.__heartbeat_interval = timedelta(seconds=DEFAULT_HEARTBEAT_INTERVAL_S)
+        self.__unsub_state_changes = None
+        self.__unsub_debounce = None
     
     
-    async def async_publish_on_tick(self, current_time: datetime):
-        er = async_get_entity_registry(self.hass)
-        dr = async_get_device_registry(self.hass)
-        device_entry = dr.async_get(self.connector._listened_device.id)
-        if device_entry is None:
+    async def async_publish_on_tick(self,
+        current_time: datetime,
+        entities: set[str] | None = None,
+        ):
+        """Publish the connector record.
+        
+        Every listened entity is read unless `entities` is given, in which case
+        only those are re-read and the rest of the record is kept as is.
+        """
+        metadata = self.__metadata_cache.get(self.connector)
+        if metadata.device_entry is None:
             return
         
-        _data_exist = False
+        # built on a copy, so neither a failing extractor nor a later tick can
+        # change a record already handed over to be published
+        record = {} if self.__prev_data is None else self.__prev_data.copy()
         
-        if self.__prev_data is None:
-            self.__prev_data = {}
+        if entities is None:
+            entities = self.connector._listened_entities
+            entity_fields = {}
+        else:
+            entity_fields = self.__entity_fields.copy()
         
-        _field_with_data = set([])
-        for entity in self.connector._listened_entities:
+        for entity in entities:
             state = self.hass.states.get(entity)
             if state is None or state.state == "unavailable":
+                entity_fields.pop(entity, None)
+                continue
+            extract = metadata.extractors.get(entity)
+            if extract is None:
+                continue
+            field = extract(state, record)
+            if field is None:
+                entity_fields.pop(entity, None)
                 continue
-            entity_entry = er.async_get(entity)
-            entity_data = parse_entity_data(entity_entry, state)
-            if entity_data is not None:
-                if len(entity_data.keys()) > 0:
-                    _field_with_data.add(list(entity_data.keys())[0])
-                self.__prev_data = {**self.__prev_data, **entity_data}
-                _data_exist = True
+            entity_fields[entity] = field
         
+        _field_with_data = set(entity_fields.values())
         
-        if not _data_exist:
-            if self.__prev_data is None:
-                return
-            else:
-                self.__prev_data["hass_status"] = "device unavailable"
+        if len(entity_fields) < 1:
+            record["hass_status"] = "device unavailable"
         else:
-            self.__prev_data["hass_status"] = None
+            record["hass_status"] = None
         
         changed_fields = self.__prev_fields.difference(_field_with_data)
         if len(changed_fields) > 0:
             for changed_field in changed_fields:
-                self.__prev_data[changed_field] = None # reset value of changed field.
-        
-        product_id = device_entry.id
-        if len(device_entry.dict_repr.get("identifiers")) > 0:
-            product_id = device_entry.dict_repr["identifiers"][0][1]
-        
-        self.__prev_fields = _field_with_data.copy()
-        self.__prev_data["hass_record_date"] = current_time.isoformat()
-        self.__prev_data["hass_area_id"] = device_entry.area_id
-        self.__prev_data["hass_connector_entity"] = self.connector._connector_entity_id
-        self.__prev_data["hass_name_by_user"] = device_entry.name_by_user
-        self.__prev_data["hass_name_default"] = device_entry.name
-        self.__prev_data["hass_product_id"] = product_id
-        
+                record[changed_field] = None # reset value of changed field.
+        
+        record["hass_record_date"] = current_time.isoformat()
+        record["hass_area_id"] = metadata.area_id
+        record["hass_connector_entity"] = self.connector._connector_entity_id
+        record["hass_name_by_user"] = metadata.name_by_user
+        record["hass_name_default"] = metadata.name_default
+        record["hass_product_id"] = metadata.product_id
+        
+        self.__prev_data = record
+        self.__entity_fields = entity_fields
+        self.__prev_fields = _field_with_data
+        self.__last_published = current_time
+        payload = record
+        if self.__delta_encoder is not None:
+            payload = self.__delta_encoder.encode(record)
         self.hass.async_create_task(self.async_post_data(
-            self.__prev_data,
+            payload,
         ))
     
     
-    async def async_publish_reload_status(self):
-        er = async_get_entity_registry(self.hass)
-        dr = async_get_device_registry(self.hass)
-        device_entry = dr.async_get(self.connector._listened_device.id)
+    async def async_publish_heartbeat(self, current_time: datetime):
+        """Publish a full record unless a change was published within the heartbeat interval."""
+        if self.__last_published is not None \
+            and current_time - self.__last_published < self.__heartbeat_interval:
+            return
+        await self.async_publish_on_tick(current_time)
+    
+    
+    def async_start_change_capture(self, debounce_s: float, heartbeat_s: int):
+        """Publish on state changes of the listened entities instead of polling.
         
-        product_id = device_entry.id
-        if len(device_entry.dict_repr.get("identifiers")) > 0:
-            product_id = device_entry.dict_repr["identifiers"][0][1]
+        Changed entities are collected into a dirty set and published together
+        once `debounce_s` seconds passed since the first change.
+        """
+        self.async_stop_change_capture()
+        self.__debounce_s = debounce_s
+        self.__heartbeat_interval = timedelta(seconds=heartbeat_s)
+        self.__unsub_state_changes = async_track_state_change_event(
+            self.hass,
+            self.connector._listened_entities,
+            self.__async_on_state_changed,
+        )
+    
+    
+    def async_stop_change_capture(self):
+        if self.__unsub_state_changes is not None:
+            self.__unsub_state_changes()
+            self.__unsub_state_changes = None
+        if self.__unsub_debounce is not None:
+            self.__unsub_debounce()
+            self.__unsub_debounce = None
+        self.__dirty_entities.clear()
+    
+    
+    @callback
+    def __async_on_state_changed(self, event: Event[EventStateChangedData]):
+        self.__dirty_entities.add(event.data["entity_id"])
+        if self.__unsub_debounce is None:
+            self.__unsub_debounce = async_call_later(
+                self.hass, self.__debounce_s, self.__async_publish_changes)
+    
+    
+    async def __async_publish_changes(self, now: datetime):
+        self.__unsub_debounce = None
+        dirty_entities = self.__dirty_entities.copy()
+        self.__dirty_entities.clear()
+        if len(dirty_entities) < 1:
+            return
+        await self.async_publish_on_tick(now, entities=dirty_entities)
+    
+    
+    async def async_publish_reload_status(self):
+        metadata = self.__metadata_cache.get(self.connector)
+        if metadata.device_entry is None:
+            return
         
         sent_data = {
-            "hass_area_id": device_entry.area_id,
+            "hass_area_id": metadata.area_id,
             "hass_connector_entity": self.connector._connector_entity_id,
-            "hass_name_by_user": device_entry.name_by_user,
-            "hass_name_default": device_entry.name,
-            "hass_product_id": product_id,
+            "hass_name_by_user": metadata.name_by_user,
+            "hass_name_default": metadata.name_default,
+            "hass_product_id": metadata.product_id,
             "hass_status": "reloaded",
             "hass_record_date": datetime.now(tz=ZoneInfo("UTC")).isoformat()
         }
@@ -860,10 +1144,15 @@ class Task:
             state = self.hass.states.get(entity)
             if state is None or state.state == "unavailable":
                 continue
-            entity_entry = er.async_get(entity)
-            entity_data = parse_entity_data(entity_entry, state)
-            if entity_data is not None:
-                sent_data = {**sent_data, **entity_data}
+            extract = metadata.extractors.get(entity)
+            if extract is None:
+                continue
+            extract(state, sent_data)
+        
+        if self.__delta_encoder is not None:
+            # record after a reload is always a full one
+            self.__delta_encoder.reset()
+            sent_data[KEYFRAME_COLUMN] = True
         
         self.hass.async_create_task(self.async_post_data(
             sent_data,
@@ -897,7 +1186,8 @@ class Task:
         })
         
         """Publish data to Hyperbase collection."""
-        await self._mqttc.async_publish(
+        # queued message is flushed together with other connectors' payloads
+        self._mqttc.async_enqueue_publish(
             self._mqtt_topic,
             json_data,
             qos=1,
@@ -924,22 +1214,40 @@ class HyperbaseTaskManager:
         mqttc: MQTT,
         mqtt_topic: str,
         project_manager: HyperbaseProjectManager,
+        model_index: ModelDomainIndex,
         user_id: str,
         user_collection_id: str,
+        config: dict[str, Any] | None = None,
+        recorder: SnapshotRecorder | None = None,
         ):
         
+        if config is None:
+            config = {}
         self.hass = hass
         self.mqttc = mqttc
         self._data_collecting_tasks: dict[str, Any] = {}
         self._data_collecting_task_info: dict[str, Task] = {}
         self.project_manager = project_manager
+        self.model_index = model_index
         self._mqtt_topic = mqtt_topic
         self._connectors = connectors
         
         self._user_id = user_id
         self._user_collection_id = user_collection_id
         
-        self.recorder = SnapshotRecorder(self.hass)
+        self._capture_mode = config.get(CONF_CAPTURE_MODE, CAPTURE_MODE_POLL)
+        self._change_debounce_s = config.get(CONF_CHANGE_DEBOUNCE, DEFAULT_CHANGE_DEBOUNCE_S)
+        self._heartbeat_interval_s = config.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL_S)
+        self._publish_mode = config.get(CONF_PUBLISH_MODE, PUBLISH_MODE_FULL)
+        self._keyframe_interval = config.get(CONF_KEYFRAME_INTERVAL, DEFAULT_KEYFRAME_INTERVAL)
+        self._recovery_chunk_size = config.get(CONF_RECOVERY_CHUNK_SIZE, DEFAULT_RECOVERY_CHUNK_SIZE)
+        self._consistency_semaphore = asyncio.Semaphore(
+            config.get(CONF_CONSISTENCY_CONCURRENCY, DEFAULT_CONSISTENCY_CONCURRENCY))
+        self._records_page_size = config.get(CONF_RECORDS_PAGE_SIZE, DEFAULT_RECORDS_PAGE_SIZE)
+        
+        self.recorder = recorder if recorder is not None else SnapshotRecorder(self.hass)
+        self.scheduler = HyperbaseTickScheduler(self.hass)
+        self.metadata_cache = ConnectorMetadataCache(self.hass)
         
         self._snapshot_buffer: list[dict] = []
         self._shutdown_callback = []
@@ -963,7 +1271,7 @@ class HyperbaseTaskManager:
         
         self._shutdown_callback.append(
             async_track_time_interval(self.hass,
-                self._async_delete_old_snapshots, interval=timedelta(hours=3))
+                self._async_delete_old_snapshots, interval=timedelta(seconds=SNAPSHOT_CLEANUP_INTERVAL_S))
         )
         
         for connector in connectors:
@@ -971,7 +1279,7 @@ class HyperbaseTaskManager:
 
     
     async def _async_delete_old_snapshots(self, _=None):
-        await self.hass.async_add_executor_job(self.recorder.delete_old_snapshots)
+        await self.recorder.async_add_executor_job(self.recorder.delete_old_snapshots)
     
     
     def _get_collection_id(self, collection_name: str):
@@ -993,18 +1301,44 @@ class HyperbaseTaskManager:
                 callbacks={
                     "snapshot_buffer": self.append_snapshot_buffer,
                     "get_collection_id": self._get_collection_id,
-                }
+                },
+                delta_encoder=DeltaEncoder(self._keyframe_interval) \
+                    if self._publish_mode == PUBLISH_MODE_DELTA else None,
+                metadata_cache=self.metadata_cache,
             )
         
         self._data_collecting_task_info[connector._connector_entity_id] = task
         
         await task.async_publish_reload_status()
         
-        self._data_collecting_tasks[connector._connector_entity_id] = async_track_time_interval(self.hass,
-                task.async_publish_on_tick,
-                interval=timedelta(seconds=connector._poll_time_s),
-                cancel_on_shutdown=True,
+        if self._capture_mode != CAPTURE_MODE_EVENT:
+            self._data_collecting_tasks[connector._connector_entity_id] = self.scheduler.async_add(
+                    connector._connector_entity_id,
+                    connector._poll_time_s,
+                    task.async_publish_on_tick,
+                )
+            return
+        
+        task.async_start_change_capture(self._change_debounce_s, self._heartbeat_interval_s)
+        cancel_heartbeat = self.scheduler.async_add(
+                connector._connector_entity_id,
+                self._heartbeat_interval_s,
+                task.async_publish_heartbeat,
             )
+        
+        def cancel():
+            cancel_heartbeat()
+            task.async_stop_change_capture()
+        self._data_collecting_tasks[connector._connector_entity_id] = cancel
+    
+    
+    def async_refresh_change_capture(self, connector_entity: str):
+        """Resubscribe to state changes after the listened entities were updated."""
+        if self._capture_mode != CAPTURE_MODE_EVENT:
+            return
+        task = self._data_collecting_task_info.get(connector_entity)
+        if task is not None:
+            task.async_start_change_capture(self._change_debounce_s, self._heartbeat_interval_s)
 
 
     async def _async_write_snapshot(self, _=None):
@@ -1012,129 +1346,194 @@ class HyperbaseTaskManager:
             return
         snapshot_entries = self._snapshot_buffer.copy()
         self._snapshot_buffer.clear()
-        await self.hass.async_add_executor_job(self.recorder.write_recorder, snapshot_entries, self.project_manager.project_id)
+        await self.recorder.async_add_executor_job(self.recorder.write_recorder, snapshot_entries, self.project_manager.project_id)
 
 
     async def _async_consistency_check(self, _last_entry_record_time: datetime):
-        hyp = await async_get_hyperbase_registry(self.hass)
-        connectors = hyp.get_connector_entries()
         start_time = _last_entry_record_time - timedelta(minutes=4)
         end_time = _last_entry_record_time - timedelta(minutes=1)
+        return await self.__async_check_window(start_time, end_time, _last_entry_record_time)
+    
+    
+    async def __async_check_window(self,
+        start_time: datetime,
+        end_time: datetime,
+        record_time: datetime,
+        collection_ids: list[str] | None = None,
+        ):
+        """Recover snapshots of the window missing in Hyperbase.
         
-        _set, _mapping = await self.hass.async_add_executor_job(
-            self.recorder.query_snapshots,
+        Records of every collection (or only of `collection_ids`) are fetched
+        concurrently. A collection that fails is recorded for a later retry
+        while the others are still checked. Returns whether every collection
+        was checked.
+        """
+        snapshot_keys = await self.recorder.async_add_executor_job(
+            self.recorder.query_snapshot_keys,
             start_time.isoformat(),
             end_time.isoformat(),
-            self.project_manager.project_id)
+            self.project_manager.project_id,
+            collection_ids)
         
         
         await self.hass.services.async_call("recorder", "purge_entities", service_data={"entity_globs": "event.hyperbase_*"})
         # prevent calling API if there is no collected data within given time range
-        if len(_set) < 0:
-            return
+        if len(snapshot_keys) < 1:
+            return True
         
-        collection_ids = []
-        for connector in connectors:
-            collection_id = self.project_manager.get_collection_id(connector._collection_name)
-            if collection_id is None:
-                model_domains_map = await async_verify_device_models(self.hass, self._connectors.entries)
-                await self.project_manager.async_revalidate_collections(model_domains_map, await_result=True)
-                collection_id = self.project_manager.get_collection_id(connector._collection_name)
-            collection_ids.append(collection_id)
-        hyperbase_data_set = set([])
-        is_success = False
-        for collection_id in collection_ids:
-            res = await self.project_manager.async_fetch_records_consistency(
-                collection_id,
-                start_time=start_time.isoformat(),
-                end_time=end_time.isoformat(),
-            )
-            if not res.get("success"):
-                is_success = False
-                break
-            
-            is_success = True
-            if res.get("count") < 1:
+        if collection_ids is None:
+            collection_ids = await self.__async_get_connector_collection_ids()
+        
+        results = await asyncio.gather(*(
+            self.__async_fetch_record_keys(collection_id, start_time, end_time)
+            for collection_id in collection_ids
+        ))
+        record_keys: list[tuple[str, int]] = []
+        checked_collections = []
+        failed_collections = []
+        for collection_id, keys in zip(collection_ids, results):
+            if keys is None:
+                failed_collections.append(collection_id)
                 continue
-            for entry in res.get("data"):
-                hyperbase_data_set.add((entry.get("hass_connector_entity"),
-                    parser.isoparse(entry.get("hass_record_date")).replace(microsecond=0)))
+            checked_collections.append(collection_id)
+            record_keys.extend(keys)
         
-        if not is_success:
+        if len(failed_collections) > 0:
+            LOGGER.warning(f"({self.project_manager.entry.data[CONF_PROJECT_NAME]}) Consistency check failed for {len(failed_collections)} of {len(collection_ids)} collections")
             await self.hass.services.async_call("persistent_notification", "create",
                     service_data={
                         "message": "Integration fails to check data consistency. Please check your Hyperbase instance",
                         "title": "Hyperbase Connection Failure",
                         "notification_id": "hyp_conn_failure",
                     })
-            await self.hass.async_add_executor_job(
+            await self.recorder.async_add_executor_job(
                 self.recorder.write_fail_snapshot,
                 start_time.isoformat(),
-                end_time.isoformat())
-            return is_success
-        
-        _set = set(_set)
-        _set.difference_update(hyperbase_data_set)
-        
-        if len(_set) > 0:
-            snapshot_ids = []
-            for item in _set:
-                snapshot_id = _mapping.get(f"{item[0]}{item[1]}")
-                id_query = f"id={snapshot_id}"
-                snapshot_ids.append(id_query)
-            payloads = await self.hass.async_add_executor_job(
-                self.recorder.query_snapshots_by_ids, snapshot_ids)
-            
-            # payload is a tuple: (data, )
-            payloads_json = [json_loads(payload[0]) for payload in payloads]
-            
-            for payload in payloads:
-                await self._async_retry_failed(payload[0])
-            
-            retry_data = {
-                "timestamp": _last_entry_record_time.isoformat(),
-                "length": len(payloads_json),
-                "data": payloads_json,
-            }
-            
-            await self.project_manager.async_create_bucket_object(retry_data)
+                end_time.isoformat(),
+                failed_collections)
+            if len(checked_collections) < 1:
+                return False
+            # only snapshots of the checked collections can be compared
+            snapshot_keys = await self.recorder.async_add_executor_job(
+                self.recorder.query_snapshot_keys,
+                start_time.isoformat(),
+                end_time.isoformat(),
+                self.project_manager.project_id,
+                checked_collections)
+        
+        # every collection is returned sorted, sorting only merges their runs
+        record_keys.sort()
+        snapshot_ids = missing_snapshot_ids(snapshot_keys, record_keys)
+        
+        if len(snapshot_ids) > 0:
+            snapshot_ids.sort()
+            await self._async_recover_snapshots(snapshot_ids, record_time)
+        
+        return len(failed_collections) < 1
+    
+    
+    async def __async_get_connector_collection_ids(self) -> list[str]:
+        hyp = await async_get_hyperbase_registry(self.hass)
+        connectors = hyp.get_connector_entries_for_project(self.project_manager.project_id)
+        missing = [
+            connector for connector in connectors
+            if self.project_manager.get_collection_id(connector._collection_name) is None
+        ]
+        if len(missing) > 0:
+            # one revalidation for every missing model instead of one per connector
+            for connector in missing:
+                self.model_index.add_connector(connector)
+            model_domains_map = self.model_index.get_model_domains_map(
+                {connector._collection_name for connector in missing})
+            await self.project_manager.async_revalidate_models(model_domains_map)
+        
+        collection_ids = {}
+        for connector in connectors:
+            collection_id = self.project_manager.get_collection_id(connector._collection_name)
+            if collection_id is not None:
+                # connectors of the same model share a collection
+                collection_ids[collection_id] = None
+        return list(collection_ids)
+    
+    
+    async def __async_fetch_record_keys(self,
+        collection_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        ) -> list[tuple[str, int]] | None:
+        """(connector entity, epoch second) of the collection records in the window, None on failure."""
+        async with self._consistency_semaphore:
+            try:
+                return [
+                    (entry.get("hass_connector_entity"), to_epoch_ms(entry.get("hass_record_date")) // 1000)
+                    async for entry in self.project_manager.async_iter_records(
+                        collection_id,
+                        start_time=start_time.isoformat(),
+                        end_time=end_time.isoformat(),
+                        fields=["hass_record_date", "hass_connector_entity"],
+                        page_size=self._records_page_size,
+                    )
+                ]
+            except HyperbaseRESTConnectionError as exc:
+                LOGGER.error(f"({self.project_manager.entry.data[CONF_PROJECT_NAME]}) {exc}")
+                return None
+    
+    
+    async def _async_recover_snapshots(self, snapshot_ids: list[int], record_time: datetime):
+        """Republish missing snapshots and back them up in the bucket.
         
-        return is_success
+        Snapshots are read, republished and uploaded one chunk at a time and
+        every step is awaited before the next chunk is read, so memory use
+        does not grow with the size of the gap.
+        """
+        part = 0
+        async for rows in self.recorder.async_iter_snapshots_by_ids(
+            snapshot_ids, self._recovery_chunk_size):
+            # row is a tuple: (id, payload)
+            failed = await self.mqttc.async_publish_many(
+                [(self._mqtt_topic, payload, 1, False) for _, payload in rows],
+                ack_timeout=RECOVERY_ACK_TIMEOUT,
+            )
+            if failed > 0:
+                LOGGER.warning(f"({self.project_manager.entry.data[CONF_PROJECT_NAME]}) {failed} recovered records were not acknowledged by the broker")
+            
+            part += 1
+            await self.project_manager.async_create_bucket_object(
+                build_recovery_file(record_time, [payload for _, payload in rows]),
+                part=part,
+            )
 
 
     async def _async_check_failed(self, _=None):
-        failed_snapshots = await self.hass.async_add_executor_job(
+        failed_snapshots = await self.recorder.async_add_executor_job(
             self.recorder.query_failed_snapshots
         )
         if len(failed_snapshots) < 1:
             return
         
+        # failed collections of the same window are checked together
+        windows: dict[tuple[str, str], list[FailedSnapshot]] = {}
         for failed_snapshot in failed_snapshots:
-            is_success = await self._async_consistency_check(datetime.fromisoformat(failed_snapshot.end_time))
-            if not is_success:
-                await self.hass.async_add_executor_job(
+            windows.setdefault(
+                (failed_snapshot.start_time, failed_snapshot.end_time), []).append(failed_snapshot)
+        
+        for (start_time, end_time), window_failures in windows.items():
+            collection_ids = [failure.collection_id for failure in window_failures]
+            if None in collection_ids:
+                # recorded before failures were tracked per collection
+                collection_ids = None
+            end_datetime = datetime.fromisoformat(end_time)
+            is_success = await self.__async_check_window(
+                datetime.fromisoformat(start_time), end_datetime, end_datetime, collection_ids)
+            
+            # collections failing again were recorded anew by the check
+            for failure in window_failures:
+                await self.recorder.async_add_executor_job(
                     self.recorder.delete_failed_snapshot_by_id,
-                    failed_snapshot.failed_id
+                    failure.failed_id
                 )
+            if not is_success:
                 return
-        
-        first_entry_start_time = failed_snapshots[0].start_time
-        last_entry_start_time = failed_snapshots[-1].start_time
-        
-        await self.hass.async_add_executor_job(
-            self.recorder.flush_failed_snapshots,
-            first_entry_start_time,
-            last_entry_start_time
-        )
-
-
-    async def _async_retry_failed(self, payload):
-        self.hass.async_create_task(self.mqttc.async_publish(
-            self._mqtt_topic,
-            payload,
-            qos=1,
-            retain=False,
-        ))
 
 
     def append_snapshot_buffer(self, snapshot_entry: dict):
@@ -1150,6 +1549,7 @@ class HyperbaseTaskManager:
     def _shutdown_cancel(self):
         for task in self._shutdown_callback:
             task()
+        self.metadata_cache.async_shutdown()
 
 
     @property
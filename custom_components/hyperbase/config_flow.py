@@ -8,13 +8,13 @@ from paho.mqtt.enums import CallbackAPIVersion, MQTTProtocolVersion
 
 from .util import get_model_identity, is_valid_connector_entity, format_device_name
 
+from .rest import async_get_rest_client
 from .exceptions import ConnectorEntityExists, HyperbaseHTTPError, HyperbaseMQTTConnectionError, HyperbaseRESTConnectivityError, InvalidConnectorEntity, FailedConnector
 
 from .common import HyperbaseConnectorEntry, async_get_hyperbase_registry
 from homeassistant.helpers import selector
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry, async_entries_for_config_entry
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry, async_entries_for_device
-from homeassistant.helpers.httpx_client import get_async_client
 from paho.mqtt import client as mqtt
 
 from homeassistant import config_entries
@@ -53,10 +53,10 @@ class HyperbaseCollection:
     id: str
     name: str
 
-def login(email: str, password: str, base_url: str="http://localhost:8080"):
+async def async_login(hass: HomeAssistant, email: str, password: str, base_url: str="http://localhost:8080"):
     try:
-        client = httpx.Client()
-        r = client.post(f"{base_url}/api/rest/auth/password-based",
+        client = async_get_rest_client(hass, verify_ssl=True)
+        r = await client.post(f"{base_url}/api/rest/auth/password-based",
                                 json={"email": email, "password": password})
         r.raise_for_status()
         return r.json()["data"]["token"]
@@ -76,7 +76,7 @@ async def async_get_hyperbase_collections(hass: HomeAssistant, project_id:str, a
             "Accept": "application/json",
         }
         
-        client = get_async_client(hass, verify_ssl=False)
+        client = async_get_rest_client(hass)
         res = await client.get(
             f"{base_url}/api/rest/project/{project_id}/collections",
             headers=headers,
@@ -98,11 +98,11 @@ async def async_get_hyperbase_collections(hass: HomeAssistant, project_id:str, a
         LOGGER.error(exc.response.json()['error']['message'])
         raise HyperbaseHTTPError(exc.response.json()['error']['status'], status_code=exc.response.status_code)
 
-def get_hyperbase_project(project_id:str, auth_token:str, base_url: str="http://localhost:8080"):
+async def async_get_hyperbase_project(hass: HomeAssistant, project_id:str, auth_token:str, base_url: str="http://localhost:8080"):
     try:
-        client = httpx.Client()
-        client.headers.update({"Authorization": f"Bearer {auth_token}"})
-        r = client.get(f"{base_url}/api/rest/project/{project_id}")
+        client = async_get_rest_client(hass, verify_ssl=True)
+        r = await client.get(f"{base_url}/api/rest/project/{project_id}",
+            headers={"Authorization": f"Bearer {auth_token}"})
         r.raise_for_status()
         return r.json()["data"]
     except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
@@ -113,26 +113,27 @@ def get_hyperbase_project(project_id:str, auth_token:str, base_url: str="http://
         raise HyperbaseHTTPError(exc.response.json()['error']['status'], status_code=exc.response.status_code)
 
 
-def validate_user_account(project_id: str, user_id: str, auth_token:str, base_url: str="http://localhost:8080"):
+async def async_validate_user_account(hass: HomeAssistant, project_id: str, user_id: str, auth_token:str, base_url: str="http://localhost:8080"):
     try:
         headers = {
             "Authorization": f"Bearer {auth_token}",
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
-        with httpx.Client(verify=False, headers=headers) as client:
-            r = client.get(f"{base_url}/api/rest/project/{project_id}/collections")
-            r.raise_for_status()
-            collections: list[dict] = r.json().get("data", [{}])
-            
-            collection_id = ""
-            for collection in collections:
-                if collection.get("name") == "Users":
-                    collection_id = collection.get("id")
+        client = async_get_rest_client(hass)
+        r = await client.get(f"{base_url}/api/rest/project/{project_id}/collections", headers=headers)
+        r.raise_for_status()
+        collections: list[dict] = r.json().get("data", [{}])
+        
+        collection_id = ""
+        for collection in collections:
+            if collection.get("name") == "Users":
+                collection_id = collection.get("id")
 
-            r = client.get(f"{base_url}/api/rest/project/{project_id}/collection/{collection_id}/record/{user_id}")
-            r.raise_for_status()
-            return {"collection_id": collection_id, "user_id": user_id}
+        r = await client.get(f"{base_url}/api/rest/project/{project_id}/collection/{collection_id}/record/{user_id}",
+            headers=headers)
+        r.raise_for_status()
+        return {"collection_id": collection_id, "user_id": user_id}
     except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
         LOGGER.error(exc)
         raise HyperbaseRESTConnectivityError(exc.args)
@@ -152,7 +153,7 @@ async def async_create_bucket(hass: HomeAssistant, project_id: str, auth_token:
             "name": "HA Retries",
         }
         
-        client = get_async_client(hass, verify_ssl=False)
+        client = async_get_rest_client(hass)
         
         buckets_res = await client.get(
                 f"{base_url}/api/rest/project/{project_id}/buckets",
@@ -185,7 +186,7 @@ async def async_create_bucket(hass: HomeAssistant, project_id: str, auth_token:
         raise HyperbaseHTTPError(exc.response.json()['error']['status'], status_code=exc.response.status_code)
 
 
-def create_api_token(project_id: str, auth_token: str, bucket_id: str,base_url):
+async def async_create_api_token(hass: HomeAssistant, project_id: str, auth_token: str, bucket_id: str,base_url):
     try:
         headers = {
             "Authorization": f"Bearer {auth_token}",
@@ -194,45 +195,48 @@ def create_api_token(project_id: str, auth_token: str, bucket_id: str,base_url):
         }
         
         
-        with httpx.Client(verify=False, headers=headers) as client:
-            
-            tokens_res = client.get(
-                f"{base_url}/api/rest/project/{project_id}/tokens",
-            )
-            tokens_res.raise_for_status()
-            tokens_data = tokens_res.json().get("data", [])
-            
-            for _token in tokens_data:
-                token_name = _token.get("name", "")
-                if token_name == "HA Access Token":
-                    return _token.get("id")
-            
-            
-            res = client.post(
-                f"{base_url}/api/rest/project/{project_id}/token",
-                json={
-                    "name": "HA Access Token",
-                    "allow_anonymous": False,
-                }
-            )
-            res.raise_for_status()
-            token: dict = res.json().get("data", {})
-            token_id = token.get("id")
-            
-            # add bucket rule to allow create new file into the bucket
-            res = client.post(
-                f"{base_url}/api/rest/project/{project_id}/token/{token_id}/bucket_rule",
-                json={
-                    "bucket_id": bucket_id,
-                    "find_one": "none",
-                    "find_many": "none",
-                    "insert_one": True,
-                    "update_one": "none",
-                    "delete_one": "none",
-                }
-            )
-            res.raise_for_status()
-            return token_id
+        client = async_get_rest_client(hass)
+        
+        tokens_res = await client.get(
+            f"{base_url}/api/rest/project/{project_id}/tokens",
+            headers=headers,
+        )
+        tokens_res.raise_for_status()
+        tokens_data = tokens_res.json().get("data", [])
+        
+        for _token in tokens_data:
+            token_name = _token.get("name", "")
+            if token_name == "HA Access Token":
+                return _token.get("id")
+        
+        
+        res = await client.post(
+            f"{base_url}/api/rest/project/{project_id}/token",
+            json={
+                "name": "HA Access Token",
+                "allow_anonymous": False,
+            },
+            headers=headers,
+        )
+        res.raise_for_status()
+        token: dict = res.json().get("data", {})
+        token_id = token.get("id")
+        
+        # add bucket rule to allow create new file into the bucket
+        res = await client.post(
+            f"{base_url}/api/rest/project/{project_id}/token/{token_id}/bucket_rule",
+            json={
+                "bucket_id": bucket_id,
+                "find_one": "none",
+                "find_many": "none",
+                "insert_one": True,
+                "update_one": "none",
+                "delete_one": "none",
+            },
+            headers=headers,
+        )
+        res.raise_for_status()
+        return token_id
     except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
         LOGGER.error(exc)
         raise HyperbaseRESTConnectivityError(exc.args)
@@ -240,10 +244,10 @@ def create_api_token(project_id: str, auth_token: str, bucket_id: str,base_url):
         LOGGER.error(exc.response.json()['error']['message'])
         raise HyperbaseHTTPError(exc.response.json()['error']['status'], status_code=exc.response.status_code)
 
-def ping_rest_server(base_url: str):
+async def async_ping_rest_server(hass: HomeAssistant, base_url: str):
     try:
-        client = httpx.Client()
-        _ = client.get(base_url)
+        client = async_get_rest_client(hass, verify_ssl=True)
+        _ = await client.get(base_url)
         return {"success": True}
     except (httpx.ConnectTimeout, httpx.ConnectError) as exc:
         LOGGER.error(exc)
@@ -305,7 +309,7 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             base_url = user_input.get(CONF_REST_ADDRESS)
             try: 
-                await self.hass.async_add_executor_job(ping_rest_server, base_url)
+                await async_ping_rest_server(self.hass, base_url)
                 await self.hass.async_add_executor_job(ping_mqtt_server,
                     user_input.get(CONF_MQTT_ADDRESS),
                     user_input.get(CONF_MQTT_PORT),
@@ -354,11 +358,11 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             is_login_success = False
             is_project_exists = False
             try:
-                self.__auth_token = await self.hass.async_add_executor_job(login,
+                self.__auth_token = await async_login(self.hass,
                     user_input.get(CONF_EMAIL), user_input.get(CONF_PASSWORD),
                     self.__network_config.get(CONF_BASE_URL))
                 is_login_success = True
-                project = await self.hass.async_add_executor_job(get_hyperbase_project,
+                project = await async_get_hyperbase_project(self.hass,
                     user_input.get(CONF_PROJECT_ID),
                     self.__auth_token,
                     self.__network_config.get(CONF_BASE_URL)
@@ -372,7 +376,7 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 
                 is_project_exists = True
                 
-                user_collection = await self.hass.async_add_executor_job(validate_user_account,
+                user_collection = await async_validate_user_account(self.hass,
                     self.__project_config.get(CONF_PROJECT_ID),
                     user_input.get(CONF_USER_ID),
                     self.__auth_token,
@@ -382,7 +386,7 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     self.hass, self.__project_config.get(CONF_PROJECT_ID),
                     self.__auth_token, self.__network_config.get(CONF_BASE_URL))
                 
-                token_id = await self.hass.async_add_executor_job(create_api_token,
+                token_id = await async_create_api_token(self.hass,
                     self.__project_config.get(CONF_PROJECT_ID),
                     self.__auth_token,
                     bucket_id,
@@ -456,11 +460,11 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             is_login_success = False
             is_project_exists = False
             try:
-                _auth_token = await self.hass.async_add_executor_job(login,
+                _auth_token = await async_login(self.hass,
                     user_input.get(CONF_EMAIL), user_input.get(CONF_PASSWORD),
                     user_input.get(CONF_REST_ADDRESS))
                 is_login_success = True
-                project = await self.hass.async_add_executor_job(get_hyperbase_project,
+                project = await async_get_hyperbase_project(self.hass,
                     user_input.get(CONF_PROJECT_ID),
                     _auth_token,
                     user_input.get(CONF_REST_ADDRESS)
@@ -473,7 +477,7 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 
                 is_project_exists = True
                 
-                user_collection = await self.hass.async_add_executor_job(validate_user_account,
+                user_collection = await async_validate_user_account(self.hass,
                     _project_meta.get(CONF_PROJECT_ID),
                     user_input.get(CONF_USER_ID),
                     _auth_token,
@@ -483,7 +487,7 @@ class HyperbaseConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     self.hass, _project_meta.get(CONF_PROJECT_ID),
                     _auth_token, user_input.get(CONF_REST_ADDRESS))
                 
-                token_id = await self.hass.async_add_executor_job(create_api_token,
+                token_id = await async_create_api_token(self.hass,
                     _project_meta.get(CONF_PROJECT_ID),
                     _auth_token,
                     bucket_id,
@@ -607,9 +611,15 @@ class HyperbaseOptionsFlowHandler(config_entries.OptionsFlow):
     
     
     async def async_step_download_csv(self, user_input: dict | Any = None):
-        collections = await async_get_hyperbase_collections(
-            self.hass, self.config_entry.data.get(CONF_PROJECT_ID),
-            self.config_entry.data.get(CONF_AUTH_TOKEN), self.config_entry.data.get(CONF_BASE_URL))
+        collections = None
+        coordinator = getattr(self.config_entry, "runtime_data", None)
+        if coordinator is not None:
+            # reuse the collection catalog of the running integration
+            collections = await coordinator.manager.async_get_hass_collections()
+        if collections is None:
+            collections = await async_get_hyperbase_collections(
+                self.hass, self.config_entry.data.get(CONF_PROJECT_ID),
+                self.config_entry.data.get(CONF_AUTH_TOKEN), self.config_entry.data.get(CONF_BASE_URL))
         
         collection_options = [collection_name for collection_name in collections.keys()]
         
@@ -902,7 +912,7 @@ class HyperbaseOptionsFlowHandler(config_entries.OptionsFlow):
                 if collection_id is None:
                     er.async_remove(entry.entity_id)
                     await hyperbase.async_delete_connector_entry(connector._connector_entity_id)
-                    self.config_entry.runtime_data._cancel_runtime_task(connector._connector_entity_id)
+                    self.config_entry.runtime_data.remove_listened_device(connector._connector_entity_id)
                     raise FailedConnector
                 
                 if user_input["add_next"]:
@@ -942,7 +952,7 @@ class HyperbaseOptionsFlowHandler(config_entries.OptionsFlow):
             else:
                 er.async_remove(self.__current_connector_entity)
                 await hyp.async_delete_connector_entry(self.__current_connector_entity)
-                self.config_entry.runtime_data._cancel_runtime_task(self.__current_connector_entity)
+                self.config_entry.runtime_data.remove_listened_device(self.__current_connector_entity)
                 return self.async_create_entry(
                     title="remove_device_config",
                     data={}
@@ -32,6 +32,52 @@ HYPERBASE_RESPONSE_MSG = "msg"
 MQTT_CONNECTED = "hyperbase_mqtt_connected"
 MQTT_DISCONNECTED = "hyperbase_mqtt_disconnected"
 
+DEFAULT_PUBLISH_BATCH_SIZE = 100
+DEFAULT_PUBLISH_BATCH_DELAY = 0.05 # seconds
+
+# Options read from the `hyperbase:` section of configuration.yaml
+CONF_MQTT_TRANSPORT = "mqtt_transport"
+CONF_CAPTURE_MODE = "capture_mode"
+CONF_CHANGE_DEBOUNCE = "change_debounce_s"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval_s"
+CONF_PUBLISH_MODE = "publish_mode"
+CONF_KEYFRAME_INTERVAL = "keyframe_interval"
+CONF_RECOVERY_CHUNK_SIZE = "recovery_chunk_size"
+CONF_CONSISTENCY_CONCURRENCY = "consistency_concurrency"
+CONF_RECORDS_PAGE_SIZE = "records_page_size"
+CONF_EXPORT_CACHE_SIZE = "export_cache_size_mib"
+
+MQTT_TRANSPORT_THREAD = "thread"
+MQTT_TRANSPORT_ASYNCIO = "asyncio"
+
+CAPTURE_MODE_POLL = "poll"
+CAPTURE_MODE_EVENT = "event"
+
+DEFAULT_CHANGE_DEBOUNCE_S = 2
+DEFAULT_HEARTBEAT_INTERVAL_S = 300
+
+PUBLISH_MODE_FULL = "full"
+PUBLISH_MODE_DELTA = "delta"
+
+DEFAULT_KEYFRAME_INTERVAL = 60 # records
+
+DEFAULT_RECOVERY_CHUNK_SIZE = 500 # snapshots
+RECOVERY_ACK_TIMEOUT = 30 # seconds
+
+DEFAULT_CONSISTENCY_CONCURRENCY = 4 # collections fetched at once
+DEFAULT_RECORDS_PAGE_SIZE = 1000 # records per Hyperbase request
+COLLECTION_CATALOG_TTL_S = 300 # reuse of the downloaded collection list
+REVALIDATION_CONCURRENCY = 8 # collection requests in flight while revalidating
+
+SNAPSHOT_RETENTION_S = 3 * 3600 # snapshots and failed windows older than this are deleted
+SNAPSHOT_CLEANUP_INTERVAL_S = 3 * 3600
+
+DEFAULT_EXPORT_CACHE_SIZE_MIB = 256
+# failed windows are recovered and republished until the cleanup deletes them,
+# ranges ending earlier than this are not refilled anymore
+EXPORT_CACHE_SETTLE_S = SNAPSHOT_RETENTION_S + SNAPSHOT_CLEANUP_INTERVAL_S
+EXPORT_CACHE_LIVE_TTL_S = 60 # reuse of exports of ranges reaching closer to now
+
 def get_storage_directory():
     dir = "config/.storage"
     if Path.cwd() == Path("/config"):
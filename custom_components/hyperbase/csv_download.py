@@ -1,14 +1,31 @@
+import re
 from datetime import datetime
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.httpx_client import get_async_client
 
-import csv
-from io import StringIO
 from aiohttp import web
-import httpx
 
-from .const import DOMAIN, LOGGER
+from .const import (
+    CONF_EXPORT_CACHE_SIZE,
+    CONF_RECORDS_PAGE_SIZE,
+    DEFAULT_EXPORT_CACHE_SIZE_MIB,
+    DEFAULT_RECORDS_PAGE_SIZE,
+    DOMAIN,
+    HYPERBASE_CONFIG,
+    LOGGER,
+)
+from .delta import DeltaDecoder
+from .exceptions import ExportFormatUnavailable, HyperbaseRESTConnectionError
+from .export import (
+    EXPORT_FORMAT_CSV, EXPORT_FORMATS, check_export_format,
+    create_export_writer, get_export_content_type
+)
+from .export_cache import ExportCache, ExportCacheWriter, export_cache_key
+from .models import get_column_kinds
+from .recorder import to_epoch_ms
+
+EXPORT_BATCH_SIZE = 1000 # records encoded and written to the client at once
+_COLLECTION_ID = re.compile(r"[A-Za-z0-9_-]+")
 
 class CSVDownloadView(HomeAssistantView):
     url = "/api/hyperbase/download_csv"
@@ -17,80 +34,133 @@ class CSVDownloadView(HomeAssistantView):
 
     def __init__(self, hass: HomeAssistant):
         self.hass = hass
+        tuning = hass.data.get(HYPERBASE_CONFIG) or {}
+        self.cache = ExportCache(hass,
+            max_size=tuning.get(CONF_EXPORT_CACHE_SIZE, DEFAULT_EXPORT_CACHE_SIZE_MIB) * 1024 * 1024)
         super().__init__()
 
-    async def get(self, request: web.Request) -> web.Response:
+    async def get(self, request: web.Request) -> web.StreamResponse:
         config_entries = self.hass.config_entries.async_entries(DOMAIN)
         if not config_entries:
             return web.Response(status=404, text="Integration not configured")
 
-        config = config_entries[0].data
-        base_url = config.get("base_url")
-        project_id = config.get("project_id")
-        auth_token = config.get("auth_token")
+        coordinator = config_entries[0].runtime_data
+        if coordinator is None:
+            return web.Response(status=503, text="Integration not loaded")
         
-        if not base_url:
+        config = config_entries[0].data
+        if not config.get("base_url"):
             return web.Response(status=400, text="REST endpoint not configured")
 
+        start_time = request.query.get("start_time")
+        end_time = request.query.get("end_time")
+        collection_id = request.query.get("collection_id")
+        # the id ends up in the Hyperbase URL path and in the response headers
+        if collection_id is None or _COLLECTION_ID.fullmatch(collection_id) is None:
+            return web.Response(status=400, text="Invalid collection_id")
         try:
-            client = get_async_client(self.hass, verify_ssl=False)
-            headers = {}
-            if auth_token:
-                headers["Authorization"] = f"Bearer {auth_token}"
-            
-            start_time = request.query.get("start_time")
-            end_time = request.query.get("end_time")
-            collection_id = request.query.get("collection_id")
-
-            query = {
-                "orders": [
-                    {"field": "connector_entity", "kind": "asc"},
-                    {"field": "record_date", "kind": "asc"},
-                ],
-                "filters": [{
-                    "op": "AND",
-                    "children": [
-                        {"field": "record_date", "op": ">=", "value": start_time},
-                        {"field": "record_date", "op": "<=", "value": end_time},
-                    ]
-                }]
-            }
-            
-            LOGGER.debug(query)
-            response = await client.post(f"{base_url}/api/rest/project/{project_id}/collection/{collection_id}/records",
-                headers=headers,
-                timeout=httpx.Timeout(10, connect=5, read=20, write=5),
-                json=query
-                )
-            response.raise_for_status()
-
-            data = response.json().get("data")
-            count = response.json().get("pagination").get("total")
-
-            if count < 1:
-                return web.Response(status=404, text="No data retrieved")
-            
-            csv_headers = data[0].keys()
-            out = StringIO()
-            
-            writer = csv.DictWriter(out, fieldnames=csv_headers)
-            writer.writeheader()
-            
             _start_time = datetime.fromisoformat(start_time).strftime("%Y%m%d-%H%M%S")
             _end_time = datetime.fromisoformat(end_time).strftime("%Y%m%d-%H%M%S")
-            filename = f"{collection_id}_{_start_time}_{_end_time}.csv"
-            for row in data:
-                writer.writerow(row)
+            if to_epoch_ms(start_time) > to_epoch_ms(end_time):
+                return web.Response(status=400, text="start_time is after end_time")
+        except (TypeError, ValueError):
+            return web.Response(status=400, text="Invalid start_time or end_time")
+        export_format = request.query.get("format", EXPORT_FORMAT_CSV)
+        if export_format not in EXPORT_FORMATS:
+            return web.Response(status=400, text=f"Unsupported format, expected one of: {', '.join(EXPORT_FORMATS)}")
+        try:
+            # importing pyarrow reads many files, it must not block the event loop
+            await self.hass.async_add_executor_job(check_export_format, export_format)
+        except ExportFormatUnavailable as e:
+            return web.Response(status=400, text=str(e))
+        filename = f"{collection_id}_{_start_time}_{_end_time}.{export_format}"
+        
+        cache_key = None
+        # exports of a collection no loaded model uses are not cached, their
+        # schema is unknown
+        fingerprint = coordinator.get_collection_fingerprint(collection_id)
+        if self.cache.enabled and fingerprint is not None:
+            await self.cache.async_load()
+            cache_key = export_cache_key(collection_id, fingerprint, start_time, end_time, export_format)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return web.FileResponse(cached.path, headers={
+                    "Content-Type": get_export_content_type(export_format),
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                    "X-Hyperbase-Cache": "hit",
+                })
+        
+        tuning = self.hass.data.get(HYPERBASE_CONFIG) or {}
+        records = coordinator.manager.async_iter_records(
+            collection_id,
+            start_time=start_time,
+            end_time=end_time,
+            end_inclusive=True,
+            page_size=tuning.get(CONF_RECORDS_PAGE_SIZE, DEFAULT_RECORDS_PAGE_SIZE),
+        )
+        
+        # the first page decides the status code and the exported columns,
+        # once the response is prepared rows are written as they arrive
+        try:
+            first_row = await anext(records, None)
+        except HyperbaseRESTConnectionError as e:
+            return web.Response(status=e.status_code or 502, text=f"HTTP error: {str(e)}")
+        except Exception as e:
+            return web.Response(status=500, text=f"Error: {str(e)}")
+        if first_row is None:
+            return web.Response(status=404, text="No data retrieved")
+        
+        decoder = DeltaDecoder()
+        writer = await self.hass.async_add_executor_job(
+            create_export_writer, export_format, list(first_row.keys()), get_column_kinds())
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": writer.content_type,
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Hyperbase-Cache": "miss",
+            }
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        
+        cache_writer = None
+        if cache_key is not None:
+            cache_writer = await self.cache.async_open_writer(cache_key, export_format, end_time)
+        batch = [decoder.decode(first_row)]
+        try:
+            async for row in records:
+                batch.append(decoder.decode(row))
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    await self.__async_write(response, cache_writer,
+                        await self.hass.async_add_executor_job(writer.write, batch))
+                    batch = []
+            if len(batch) > 0:
+                await self.__async_write(response, cache_writer,
+                    await self.hass.async_add_executor_job(writer.write, batch))
+            await self.__async_write(response, cache_writer,
+                await self.hass.async_add_executor_job(writer.close))
+            # committed before the end of the body, a client done reading may
+            # close the connection and cancel the handler
+            if cache_writer is not None:
+                await cache_writer.async_commit()
+                cache_writer = None
+            await response.write_eof()
+        except Exception as exc:
+            # headers are already sent, drop the connection so the client
+            # does not mistake a partial file for a complete one
+            LOGGER.error(f"Export of collection {collection_id} interrupted: {exc}")
+            raise
+        finally:
+            if cache_writer is not None:
+                await cache_writer.async_discard()
+        return response
 
-            return web.Response(
-                body=out.getvalue(),
-                content_type="text/csv",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{filename}"'
-                }
-            )
 
-        except httpx.HTTPStatusError as e:
-            return web.Response(status=e.response.status_code, text=f"HTTP error: {str(e)}")
-        except Exception as e:
-            return web.Response(status=500, text=f"Error: {str(e)}")
\ No newline at end of file
+    @staticmethod
+    async def __async_write(response: web.StreamResponse, cache_writer: ExportCacheWriter | None,
+        content: bytes):
+        if len(content) < 1:
+            return
+        await response.write(content)
+        if cache_writer is not None:
+            await cache_writer.async_write(content)
@@ -0,0 +1,83 @@
+"""
+Delta encoding of connector records.
+
+Delta records only carry the columns that changed since the previous record
+of the same connector and are marked with `hass_keyframe = False`. A full
+record (keyframe) is sent periodically, after a reload, and whenever a column
+is cleared, since a cleared column cannot be told apart from an omitted one.
+"""
+from typing import Any
+
+KEYFRAME_COLUMN = "hass_keyframe"
+
+# columns sent with every record, needed to place a delta in the timeline
+DELTA_KEY_COLUMNS = ("hass_connector_entity", "hass_record_date")
+
+
+class DeltaEncoder:
+    def __init__(self, keyframe_interval: int):
+        self.keyframe_interval = keyframe_interval
+        self.__last_sent: dict[str, Any] | None = None
+        self.__deltas_since_keyframe = 0
+
+
+    def encode(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Return the record to be published for the given full record."""
+        if self.__last_sent is None or self.__deltas_since_keyframe >= self.keyframe_interval:
+            return self.__keyframe(record)
+
+        delta = {}
+        for column, value in record.items():
+            if column in DELTA_KEY_COLUMNS:
+                continue
+            if column in self.__last_sent and self.__last_sent[column] == value:
+                continue
+            if value is None:
+                return self.__keyframe(record)
+            delta[column] = value
+
+        self.__last_sent.update(delta)
+        self.__deltas_since_keyframe += 1
+        for column in DELTA_KEY_COLUMNS:
+            delta[column] = record.get(column)
+        delta[KEYFRAME_COLUMN] = False
+        return delta
+
+
+    def reset(self):
+        """Force the next encoded record to be a keyframe."""
+        self.__last_sent = None
+
+
+    def __keyframe(self, record: dict[str, Any]) -> dict[str, Any]:
+        self.__last_sent = record.copy()
+        self.__deltas_since_keyframe = 0
+        return {**record, KEYFRAME_COLUMN: True}
+
+
+
+class DeltaDecoder:
+    """Rebuild full records from keyframes and delta records, one row at a time.
+
+    Rows must be ordered by record date per connector, which is the order used
+    by every Hyperbase records query of this integration. Rows without the
+    keyframe marker (published in full mode) are passed through as full records.
+    Deltas seen before the first keyframe of their connector only contain the
+    changed columns.
+    """
+    def __init__(self):
+        self.__latest: dict[str, dict[str, Any]] = {}
+
+
+    def decode(self, row: dict[str, Any]) -> dict[str, Any]:
+        connector = row.get("hass_connector_entity")
+        if row.get(KEYFRAME_COLUMN) is not False:
+            self.__latest[connector] = dict(row)
+            return row
+
+        record = self.__latest.setdefault(connector, {})
+        for column, value in row.items():
+            if value is not None:
+                record[column] = value
+        return dict(record)
+
@@ -38,4 +38,7 @@ class InvalidConnectorEntity(Exception):
     """Error to indicate invalid hyperbase connector entity name"""
 
 class ConnectorEntityExists(Exception):
-    """Error to indicate hyperbase connector is already registered"""
\ No newline at end of file
+    """Error to indicate hyperbase connector is already registered"""
+
+class ExportFormatUnavailable(Exception):
+    """Error to indicate an export format needs a missing optional dependency"""
@@ -0,0 +1,309 @@
+"""
+Export formats of the download endpoint.
+
+Every writer turns batches of full records into encoded bytes ready to be
+sent to the client, so an export never holds more than a batch (a row group
+for Parquet). Columnar formats are typed from the collection column kinds
+of the models. Parquet and Arrow IPC need `pyarrow`, which is not a
+requirement of the integration and is only imported when requested.
+
+Writers block while encoding and are not thread safe, the download view
+creates and drives them in the executor, one call at a time.
+"""
+import csv
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, UTC
+from io import RawIOBase, StringIO
+from typing import Any, Callable, Mapping
+
+from homeassistant.helpers.json import json_bytes
+
+from .exceptions import ExportFormatUnavailable
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_CSV_GZIP = "csv.gz"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_NDJSON_GZIP = "ndjson.gz"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMAT_ARROW = "arrow"
+
+EXPORT_FORMATS = (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_CSV_GZIP,
+    EXPORT_FORMAT_NDJSON,
+    EXPORT_FORMAT_NDJSON_GZIP,
+    EXPORT_FORMAT_PARQUET,
+    EXPORT_FORMAT_ARROW,
+)
+
+PARQUET_ROW_GROUP_SIZE = 65536 # rows
+GZIP_COMPRESS_LEVEL = 6
+
+
+class ExportWriter(ABC):
+    """Encode batches of records of a fixed set of columns."""
+    content_type = "application/octet-stream"
+
+    def __init__(self, columns: list[str]):
+        self.columns = columns
+
+
+    @abstractmethod
+    def write(self, rows: list[dict[str, Any]]) -> bytes:
+        """Encoded bytes of `rows`, may be empty while the writer buffers."""
+
+
+    def close(self) -> bytes:
+        """Bytes still buffered by the writer, to be sent last."""
+        return b""
+
+
+
+class CSVExportWriter(ExportWriter):
+    content_type = "text/csv"
+
+    def __init__(self, columns: list[str]):
+        super().__init__(columns)
+        self.__out = StringIO()
+        self.__writer = csv.DictWriter(self.__out, fieldnames=columns)
+        self.__writer.writeheader()
+
+
+    def write(self, rows: list[dict[str, Any]]) -> bytes:
+        self.__writer.writerows(rows)
+        content = self.__out.getvalue().encode("utf-8")
+        self.__out.seek(0)
+        self.__out.truncate()
+        return content
+
+
+
+class NDJSONExportWriter(ExportWriter):
+    content_type = "application/x-ndjson"
+
+    def write(self, rows: list[dict[str, Any]]) -> bytes:
+        return b"".join(json_bytes(row) + b"\n" for row in rows)
+
+
+
+class GzipExportWriter(ExportWriter):
+    """Gzip stream of the output of another writer."""
+    content_type = "application/gzip"
+
+    def __init__(self, writer: ExportWriter):
+        super().__init__(writer.columns)
+        self.__writer = writer
+        # wbits 31 selects the gzip container
+        self.__compressor = zlib.compressobj(GZIP_COMPRESS_LEVEL, zlib.DEFLATED, 31)
+
+
+    def write(self, rows: list[dict[str, Any]]) -> bytes:
+        return self.__compressor.compress(self.__writer.write(rows))
+
+
+    def close(self) -> bytes:
+        return self.__compressor.compress(self.__writer.close()) + self.__compressor.flush()
+
+
+
+class _DrainableSink(RawIOBase):
+    """Write-only file collecting the bytes written by pyarrow until drained."""
+    def __init__(self):
+        super().__init__()
+        self.__buffer = bytearray()
+        self.__position = 0
+
+
+    def writable(self):
+        return True
+
+
+    def write(self, data) -> int:
+        self.__buffer += data
+        self.__position += len(data)
+        return len(data)
+
+
+    def tell(self) -> int:
+        return self.__position
+
+
+    def drain(self) -> bytes:
+        content = bytes(self.__buffer)
+        self.__buffer.clear()
+        return content
+
+
+
+def _to_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> int | None:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _to_bool(value: Any) -> bool | None:
+    return value if isinstance(value, bool) else None
+
+
+def _to_timestamp(value: Any) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp
+
+
+def _to_string(value: Any) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    return json_bytes(value).decode("utf-8")
+
+
+_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "double": _to_float,
+    "int": _to_int,
+    "integer": _to_int,
+    "boolean": _to_bool,
+    "timestamp": _to_timestamp,
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ExportFormatUnavailable("Parquet and Arrow exports require the pyarrow package") from exc
+    return pyarrow
+
+
+class _ArrowExportWriter(ExportWriter):
+    def __init__(self, columns: list[str], column_kinds: Mapping[str, str]):
+        super().__init__(columns)
+        pa = _import_pyarrow()
+        self._pa = pa
+        kinds = [column_kinds.get(column, "string") for column in columns]
+        arrow_types = {
+            "double": pa.float64(),
+            "int": pa.int64(),
+            "integer": pa.int64(),
+            "boolean": pa.bool_(),
+            "timestamp": pa.timestamp("ms", tz="UTC"),
+        }
+        self._schema = pa.schema([
+            pa.field(column, arrow_types.get(kind, pa.string()))
+            for column, kind in zip(columns, kinds)
+        ])
+        self.__converters = [_CONVERTERS.get(kind, _to_string) for kind in kinds]
+        self._sink = _DrainableSink()
+
+
+    def _record_batch(self, rows: list[dict[str, Any]]):
+        return self._pa.RecordBatch.from_arrays([
+            self._pa.array([convert(row.get(column)) for row in rows], type=field.type)
+            for column, convert, field in zip(self.columns, self.__converters, self._schema)
+        ], schema=self._schema)
+
+
+
+class ArrowExportWriter(_ArrowExportWriter):
+    """Arrow IPC stream, one record batch per written batch."""
+    content_type = "application/vnd.apache.arrow.stream"
+
+    def __init__(self, columns: list[str], column_kinds: Mapping[str, str]):
+        super().__init__(columns, column_kinds)
+        self.__writer = self._pa.ipc.new_stream(self._sink, self._schema)
+
+
+    def write(self, rows: list[dict[str, Any]]) -> bytes:
+        self.__writer.write_batch(self._record_batch(rows))
+        return self._sink.drain()
+
+
+    def close(self) -> bytes:
+        self.__writer.close()
+        return self._sink.drain()
+
+
+
+class ParquetExportWriter(_ArrowExportWriter):
+    """Parquet file, batches are buffered into row groups of `PARQUET_ROW_GROUP_SIZE`."""
+    content_type = "application/vnd.apache.parquet"
+
+    def __init__(self, columns: list[str], column_kinds: Mapping[str, str]):
+        super().__init__(columns, column_kinds)
+        self.__writer = self._pa.parquet.ParquetWriter(self._sink, self._schema, compression="zstd")
+        self.__pending = []
+        self.__pending_rows = 0
+
+
+    def write(self, rows: list[dict[str, Any]]) -> bytes:
+        self.__pending.append(self._record_batch(rows))
+        self.__pending_rows += len(rows)
+        if self.__pending_rows >= PARQUET_ROW_GROUP_SIZE:
+            self.__write_row_group()
+        return self._sink.drain()
+
+
+    def close(self) -> bytes:
+        self.__write_row_group()
+        self.__writer.close()
+        return self._sink.drain()
+
+
+    def __write_row_group(self):
+        if self.__pending_rows < 1:
+            return
+        self.__writer.write_table(self._pa.Table.from_batches(self.__pending, schema=self._schema))
+        self.__pending = []
+        self.__pending_rows = 0
+
+
+
+def create_export_writer(export_format: str, columns: list[str],
+    column_kinds: Mapping[str, str]) -> ExportWriter:
+    """Writer of `export_format`. Raises `ExportFormatUnavailable` if pyarrow is missing."""
+    if export_format == EXPORT_FORMAT_CSV:
+        return CSVExportWriter(columns)
+    if export_format == EXPORT_FORMAT_CSV_GZIP:
+        return GzipExportWriter(CSVExportWriter(columns))
+    if export_format == EXPORT_FORMAT_NDJSON:
+        return NDJSONExportWriter(columns)
+    if export_format == EXPORT_FORMAT_NDJSON_GZIP:
+        return GzipExportWriter(NDJSONExportWriter(columns))
+    if export_format == EXPORT_FORMAT_PARQUET:
+        return ParquetExportWriter(columns, column_kinds)
+    if export_format == EXPORT_FORMAT_ARROW:
+        return ArrowExportWriter(columns, column_kinds)
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+
+def get_export_content_type(export_format: str) -> str:
+    if export_format in (EXPORT_FORMAT_CSV_GZIP, EXPORT_FORMAT_NDJSON_GZIP):
+        return GzipExportWriter.content_type
+    return {
+        EXPORT_FORMAT_CSV: CSVExportWriter.content_type,
+        EXPORT_FORMAT_NDJSON: NDJSONExportWriter.content_type,
+        EXPORT_FORMAT_PARQUET: ParquetExportWriter.content_type,
+        EXPORT_FORMAT_ARROW: ArrowExportWriter.content_type,
+    }[export_format]
+
+
+def check_export_format(export_format: str):
+    """Raise `ExportFormatUnavailable` if the dependencies of `export_format` are missing."""
+    if export_format in (EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_ARROW):
+        _import_pyarrow()
@@ -0,0 +1,206 @@
+"""
+On-disk cache of downloaded exports.
+
+Exports are cached per (collection, schema, start, end, format), an export
+made before the collection schema changed is never served. A time range that
+ended more than `EXPORT_CACHE_SETTLE_S` ago no longer receives records, so
+its export is kept until evicted, also across restarts. Ranges reaching
+closer to now are only reused for `EXPORT_CACHE_LIVE_TTL_S`. The cache
+directory is bounded in size, least recently used exports are evicted first.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    EXPORT_CACHE_LIVE_TTL_S,
+    EXPORT_CACHE_SETTLE_S,
+    LOGGER,
+    get_storage_directory,
+)
+from .recorder import to_epoch_ms
+
+DEFAULT_EXPORT_CACHE_PATH = get_storage_directory() + "/hyperbase-exports"
+
+# exports of ranges that were still open are never reused after a restart
+_LIVE_MARKER = ".live"
+_PARTIAL_SUFFIX = ".part"
+
+
+def export_cache_key(collection_id: str, schema_fingerprint: str, start_time: str, end_time: str,
+    export_format: str) -> str:
+    """Cache key of an export, equal for every spelling of the same instants."""
+    key = f"{collection_id}|{schema_fingerprint}|{to_epoch_ms(start_time)}|{to_epoch_ms(end_time)}|{export_format}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(slots=True)
+class ExportCacheEntry:
+    path: str
+    size: int
+    # wall clock expiry, None for exports of closed ranges
+    expires_at: float | None
+
+
+
+class ExportCacheWriter:
+    """Export being streamed into a temporary file, registered on commit."""
+    def __init__(self, cache: "ExportCache", key: str, path: str, expires_at: float | None,
+        file: BinaryIO, partial_path: str):
+        self.__cache = cache
+        self.__key = key
+        self.__path = path
+        self.__expires_at = expires_at
+        self.__file = file
+        self.__partial_path = partial_path
+        self.__size = 0
+
+
+    async def async_write(self, content: bytes):
+        if len(content) < 1:
+            return
+        self.__size += len(content)
+        await self.__cache.hass.async_add_executor_job(self.__file.write, content)
+
+
+    async def async_commit(self):
+        await self.__cache.hass.async_add_executor_job(self.__commit)
+        await self.__cache.async_add(self.__key, self.__path, self.__size, self.__expires_at)
+
+
+    async def async_discard(self):
+        await self.__cache.hass.async_add_executor_job(self.__discard)
+
+
+    def __commit(self):
+        self.__file.close()
+        os.replace(self.__partial_path, self.__path)
+
+
+    def __discard(self):
+        self.__file.close()
+        _unlink(self.__partial_path)
+
+
+
+class ExportCache:
+    def __init__(self, hass: HomeAssistant, max_size: int, directory: str = DEFAULT_EXPORT_CACHE_PATH):
+        self.hass = hass
+        self.max_size = max_size
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[str, ExportCacheEntry] = OrderedDict()
+        self.__size = 0
+        self.__loaded = False
+
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+
+    async def async_load(self):
+        """Register the exports of closed ranges left by a previous run."""
+        if self.__loaded or not self.enabled:
+            return
+        self.__loaded = True
+        for key, entry in await self.hass.async_add_executor_job(self.__scan):
+            self.__entries[key] = entry
+            self.__size += entry.size
+        self.__evict()
+
+
+    def get(self, key: str) -> ExportCacheEntry | None:
+        entry = self.__entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= time.time():
+            self.__remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        # keeps the least recently used order for the next restart
+        self.hass.async_add_executor_job(_touch, entry.path)
+        return entry
+
+
+    async def async_open_writer(self, key: str, export_format: str, end_time: str) -> ExportCacheWriter:
+        now = time.time()
+        expires_at = None
+        if to_epoch_ms(end_time) / 1000 > now - EXPORT_CACHE_SETTLE_S:
+            expires_at = now + EXPORT_CACHE_LIVE_TTL_S
+        name = f"{key}{_LIVE_MARKER if expires_at is not None else ''}.{export_format}"
+        file, partial_path = await self.hass.async_add_executor_job(self.__create_partial, name)
+        return ExportCacheWriter(self, key, os.path.join(self.directory, name), expires_at, file, partial_path)
+
+
+    async def async_add(self, key: str, path: str, size: int, expires_at: float | None):
+        if size > self.max_size:
+            await self.hass.async_add_executor_job(_unlink, path)
+            return
+        previous = self.__entries.pop(key, None)
+        if previous is not None:
+            self.__size -= previous.size
+            if previous.path != path:
+                self.hass.async_add_executor_job(_unlink, previous.path)
+        self.__entries[key] = ExportCacheEntry(path, size, expires_at)
+        self.__size += size
+        self.__evict()
+        LOGGER.debug(f"Export cache: {len(self.__entries)} exports, {self.__size} bytes, {self.hits} hits, {self.misses} misses")
+
+
+    def __evict(self):
+        while self.__size > self.max_size and len(self.__entries) > 0:
+            self.__remove(next(iter(self.__entries)))
+
+
+    def __remove(self, key: str):
+        entry = self.__entries.pop(key)
+        self.__size -= entry.size
+        self.hass.async_add_executor_job(_unlink, entry.path)
+
+
+    def __create_partial(self, name: str) -> tuple[BinaryIO, str]:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(prefix=f"{name}.", suffix=_PARTIAL_SUFFIX, dir=self.directory)
+        return os.fdopen(fd, "wb"), partial_path
+
+
+    def __scan(self) -> list[tuple[str, ExportCacheEntry]]:
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        with os.scandir(self.directory) as files:
+            for file in files:
+                if not file.is_file():
+                    continue
+                if file.name.endswith(_PARTIAL_SUFFIX) or _LIVE_MARKER in file.name:
+                    _unlink(file.path)
+                    continue
+                stat = file.stat()
+                entries.append((stat.st_mtime, file.name.split(".", 1)[0], ExportCacheEntry(file.path, stat.st_size, None)))
+        # oldest first, the least recently used export is evicted first
+        entries.sort(key=lambda item: item[0])
+        return [(key, entry) for _, key, entry in entries]
+
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _touch(path: str):
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
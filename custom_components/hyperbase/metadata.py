@@ -0,0 +1,176 @@
+"""
+Registry metadata of the connectors, cached for the publish path.
+
+Every record carries the area, names and product id of the listened device
+and reads its entities with extractors picked from their registry entries.
+These only change with the device and entity registries, so they are
+looked up once per connector and dropped on `device_registry_updated` and
+`entity_registry_updated` events of the listened device and entities.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.device_registry import (
+    EVENT_DEVICE_REGISTRY_UPDATED,
+    DeviceEntry,
+    EventDeviceRegistryUpdatedData,
+    async_get as async_get_device_registry,
+)
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+    EventEntityRegistryUpdatedData,
+    RegistryEntry,
+    async_get as async_get_entity_registry,
+)
+
+from .models import EntityExtractor, get_entry_extractor
+from .registry import HyperbaseConnectorEntry
+
+
+@dataclass(slots=True)
+class ConnectorMetadata:
+    # listened entities list the metadata was built for
+    listened_entities: list[str]
+    device_id: str
+    device_entry: DeviceEntry | None
+    product_id: str | None
+    area_id: str | None
+    name_by_user: str | None
+    name_default: str | None
+    # entities missing from the entity registry are left out
+    entity_entries: dict[str, RegistryEntry]
+    extractors: dict[str, EntityExtractor]
+
+
+
+def get_product_id(device_entry: DeviceEntry) -> str:
+    """First identifier value of the device, its id if it has none."""
+    for _, identifier in device_entry.identifiers:
+        return identifier
+    return device_entry.id
+
+
+
+class ConnectorMetadataCache:
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.__metadata: dict[str, ConnectorMetadata] = {}
+        # device or entity id -> connector entity ids whose metadata holds it
+        self.__by_device: dict[str, set[str]] = {}
+        self.__by_entity: dict[str, set[str]] = {}
+        self.__unsubs: list[Callable[[], None]] = []
+
+
+    def get(self, connector: HyperbaseConnectorEntry) -> ConnectorMetadata:
+        metadata = self.__metadata.get(connector._connector_entity_id)
+        # listened entities are replaced, not mutated, when a connector is updated
+        if metadata is not None and metadata.listened_entities is connector._listened_entities:
+            return metadata
+        return self.__build(connector)
+
+
+    def invalidate(self, connector_entity_id: str):
+        metadata = self.__metadata.pop(connector_entity_id, None)
+        if metadata is None:
+            return
+        for key, index in [(metadata.device_id, self.__by_device)] + [
+            (entity_id, self.__by_entity) for entity_id in metadata.listened_entities]:
+            connectors = index.get(key)
+            if connectors is None:
+                continue
+            connectors.discard(connector_entity_id)
+            if len(connectors) < 1:
+                del index[key]
+
+
+    @callback
+    def async_shutdown(self):
+        for unsub in self.__unsubs:
+            unsub()
+        self.__unsubs.clear()
+        self.__metadata.clear()
+        self.__by_device.clear()
+        self.__by_entity.clear()
+
+
+    def __build(self, connector: HyperbaseConnectorEntry) -> ConnectorMetadata:
+        connector_entity_id = connector._connector_entity_id
+        self.invalidate(connector_entity_id)
+        self.__async_listen()
+
+        device_id = connector._listened_device.id
+        device_entry = async_get_device_registry(self.hass).async_get(device_id)
+        er = async_get_entity_registry(self.hass)
+        entity_entries = {}
+        for entity_id in connector._listened_entities:
+            entity_entry = er.async_get(entity_id)
+            if entity_entry is not None:
+                entity_entries[entity_id] = entity_entry
+
+        metadata = ConnectorMetadata(
+            listened_entities=connector._listened_entities,
+            device_id=device_id,
+            device_entry=device_entry,
+            product_id=None if device_entry is None else get_product_id(device_entry),
+            area_id=None if device_entry is None else device_entry.area_id,
+            name_by_user=None if device_entry is None else device_entry.name_by_user,
+            name_default=None if device_entry is None else device_entry.name,
+            entity_entries=entity_entries,
+            extractors={
+                entity_id: get_entry_extractor(entity_entry)
+                for entity_id, entity_entry in entity_entries.items()
+            },
+        )
+        self.__metadata[connector_entity_id] = metadata
+        # a missing device or entity is watched too, its creation rebuilds the metadata
+        self.__by_device.setdefault(device_id, set()).add(connector_entity_id)
+        for entity_id in connector._listened_entities:
+            self.__by_entity.setdefault(entity_id, set()).add(connector_entity_id)
+        return metadata
+
+
+    def __async_listen(self):
+        if len(self.__unsubs) > 0:
+            return
+        self.__unsubs.append(self.hass.bus.async_listen(
+            EVENT_DEVICE_REGISTRY_UPDATED,
+            self.__async_device_updated,
+            event_filter=self.__device_filter,
+        ))
+        self.__unsubs.append(self.hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED,
+            self.__async_entity_updated,
+            event_filter=self.__entity_filter,
+        ))
+
+
+    @callback
+    def __device_filter(self, event_data: EventDeviceRegistryUpdatedData) -> bool:
+        return event_data["device_id"] in self.__by_device
+
+
+    @callback
+    def __entity_filter(self, event_data: EventEntityRegistryUpdatedData) -> bool:
+        return event_data["entity_id"] in self.__by_entity \
+            or event_data.get("old_entity_id") in self.__by_entity
+
+
+    @callback
+    def __async_device_updated(self, event: Event[EventDeviceRegistryUpdatedData]):
+        self.__invalidate_all(self.__by_device.get(event.data["device_id"]))
+
+
+    @callback
+    def __async_entity_updated(self, event: Event[EventEntityRegistryUpdatedData]):
+        self.__invalidate_all(self.__by_entity.get(event.data["entity_id"]))
+        old_entity_id = event.data.get("old_entity_id")
+        if old_entity_id is not None:
+            self.__invalidate_all(self.__by_entity.get(old_entity_id))
+
+
+    def __invalidate_all(self, connector_entity_ids: set[str] | None):
+        if connector_entity_ids is None:
+            return
+        for connector_entity_id in list(connector_entity_ids):
+            self.invalidate(connector_entity_id)
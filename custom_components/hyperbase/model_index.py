@@ -0,0 +1,207 @@
+"""
+Entity domains and device classes of every listened model.
+
+The index is built once from the connectors and then kept up to date by
+connector changes and `entity_registry_updated` events, so building the
+schema of a model never walks the entity registry again.
+"""
+from collections import Counter
+from typing import Callable, Iterable
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.entity_registry import (
+    EVENT_ENTITY_REGISTRY_UPDATED,
+    EventEntityRegistryUpdatedData,
+    RegistryEntry,
+    async_get as async_get_entity_registry,
+)
+
+from .models import DomainDeviceClass
+from .registry import HyperbaseConnectorEntry
+
+EntityKey = tuple[str, str]
+
+# registry changes able to change the (domain, device class) of an entity
+_KEY_CHANGES = {"original_device_class", "translation_key"}
+
+
+def get_entity_key(entity: RegistryEntry) -> EntityKey:
+    """(domain, device class) of an entity, device class falls back to the translation key."""
+    if entity.original_device_class is not None:
+        return entity.domain, entity.original_device_class
+    if entity.translation_key is not None:
+        return entity.domain, entity.translation_key
+    return entity.domain, "unknown"
+
+
+
+class ModelDomainIndex:
+    """Count of listened entities per model, domain and device class.
+
+    Every (connector, listened entity) pair adds one to the count of its
+    (domain, device class) in the model of the connector. Changing a
+    connector or an entity only moves the counts it contributed.
+    """
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.__models: dict[str, Counter[EntityKey]] = {}
+        # connector entity id -> (model identity, listened entity ids)
+        self.__connectors: dict[str, tuple[str, tuple[str, ...]]] = {}
+        # listened entity id -> connector entity ids listening it
+        self.__listeners: dict[str, set[str]] = {}
+        # listened entity id -> key, None while missing from the entity registry
+        self.__keys: dict[str, EntityKey | None] = {}
+
+
+    def __contains__(self, model_identity: str) -> bool:
+        return model_identity in self.__models
+
+
+    def add_connector(self, connector: HyperbaseConnectorEntry) -> bool:
+        """Add or update a connector. Returns True if the domains of its model changed."""
+        return self.update_connector(
+            connector._connector_entity_id, connector._collection_name, connector._listened_entities)
+
+
+    def update_connector(self, connector_entity_id: str, model_identity: str,
+        listened_entities: Iterable[str]) -> bool:
+        """Move the counts of a connector to its new listened entities.
+
+        Only entities added to or removed from the connector are looked up.
+        Returns True if the domains of the model changed.
+        """
+        entities = tuple(dict.fromkeys(listened_entities))
+        previous = self.__connectors.get(connector_entity_id)
+        if previous is not None and previous[0] != model_identity:
+            self.remove_connector(connector_entity_id)
+            previous = None
+
+        previous_entities = () if previous is None else previous[1]
+        self.__connectors[connector_entity_id] = (model_identity, entities)
+        counts = self.__models.setdefault(model_identity, Counter())
+        before = set(counts)
+
+        removed = set(previous_entities).difference(entities)
+        added = [entity for entity in entities if entity not in previous_entities]
+        for entity_id in removed:
+            self.__unlisten(connector_entity_id, entity_id, counts)
+        if len(added) > 0:
+            er = async_get_entity_registry(self.hass)
+            for entity_id in added:
+                self.__listen(connector_entity_id, entity_id, counts, er)
+        return counts.keys() != before
+
+
+    def remove_connector(self, connector_entity_id: str) -> bool:
+        """Returns True if the domains of the model of the connector changed."""
+        previous = self.__connectors.pop(connector_entity_id, None)
+        if previous is None:
+            return False
+        model_identity, entities = previous
+        counts = self.__models[model_identity]
+        before = set(counts)
+        for entity_id in entities:
+            self.__unlisten(connector_entity_id, entity_id, counts)
+        if not any(model == model_identity for model, _ in self.__connectors.values()):
+            del self.__models[model_identity]
+            return True
+        return counts.keys() != before
+
+
+    def update_entity(self, entity_id: str) -> set[str]:
+        """Look up a listened entity again. Returns the models whose domains changed."""
+        connectors = self.__listeners.get(entity_id)
+        if connectors is None:
+            return set()
+        entity = async_get_entity_registry(self.hass).async_get(entity_id)
+        key = None if entity is None else get_entity_key(entity)
+        previous = self.__keys.get(entity_id)
+        if key == previous:
+            return set()
+        self.__keys[entity_id] = key
+
+        changed = set()
+        for connector_entity_id in connectors:
+            model_identity = self.__connectors[connector_entity_id][0]
+            counts = self.__models[model_identity]
+            before = set(counts)
+            if previous is not None:
+                _decrement(counts, previous)
+            if key is not None:
+                counts[key] += 1
+            if counts.keys() != before:
+                changed.add(model_identity)
+        return changed
+
+
+    def get_model_domains(self, model_identity: str) -> list[DomainDeviceClass]:
+        domains: dict[str, list[str]] = {}
+        for domain, device_class in self.__models.get(model_identity, ()):
+            domains.setdefault(domain, []).append(device_class)
+        return [DomainDeviceClass(domain, device_classes) for domain, device_classes in domains.items()]
+
+
+    def get_model_domains_map(self, model_identities: Iterable[str] | None = None,
+        ) -> dict[str, list[DomainDeviceClass]]:
+        """Domains of the given models, of every model if None."""
+        if model_identities is None:
+            model_identities = self.__models.keys()
+        return {model: self.get_model_domains(model) for model in model_identities}
+
+
+    @callback
+    def async_listen(self, on_models_changed: Callable[[set[str]], None]) -> Callable[[], None]:
+        """Follow entity registry updates of listened entities.
+
+        `on_models_changed` is called with the models whose domains changed.
+        """
+        @callback
+        def _filter(event_data: EventEntityRegistryUpdatedData) -> bool:
+            return event_data["entity_id"] in self.__listeners or \
+                event_data.get("old_entity_id") in self.__listeners
+
+        @callback
+        def _async_updated(event: Event[EventEntityRegistryUpdatedData]):
+            data = event.data
+            if data["action"] == "update" and data.get("old_entity_id") is None \
+                and _KEY_CHANGES.isdisjoint(data["changes"]):
+                return
+            changed = self.update_entity(data["entity_id"])
+            if data.get("old_entity_id") is not None:
+                changed |= self.update_entity(data["old_entity_id"])
+            if len(changed) > 0:
+                on_models_changed(changed)
+
+        return self.hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED, _async_updated, event_filter=_filter)
+
+
+    def __listen(self, connector_entity_id: str, entity_id: str,
+        counts: Counter[EntityKey], er) -> None:
+        listeners = self.__listeners.setdefault(entity_id, set())
+        listeners.add(connector_entity_id)
+        if len(listeners) == 1:
+            entity = er.async_get(entity_id)
+            self.__keys[entity_id] = None if entity is None else get_entity_key(entity)
+        key = self.__keys[entity_id]
+        if key is not None:
+            counts[key] += 1
+
+
+    def __unlisten(self, connector_entity_id: str, entity_id: str,
+        counts: Counter[EntityKey]) -> None:
+        key = self.__keys.get(entity_id)
+        if key is not None:
+            _decrement(counts, key)
+        listeners = self.__listeners[entity_id]
+        listeners.discard(connector_entity_id)
+        if len(listeners) < 1:
+            del self.__listeners[entity_id]
+            del self.__keys[entity_id]
+
+
+
+def _decrement(counts: Counter[EntityKey], key: EntityKey):
+    counts[key] -= 1
+    if counts[key] < 1:
+        del counts[key]
@@ -1,8 +1,11 @@
-from typing import Any
+import hashlib
+from enum import StrEnum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 
 from homeassistant.core import State
 from homeassistant.helpers.entity_registry import RegistryEntry
-from homeassistant.const import STATE_ON
 
 from .air_quality import *
 from .alarm import *
@@ -35,8 +38,16 @@ from .vacuum import *
 from .valve import *
 from .water_heater import *
 from .weather import *
-from .base import BASE_COLUMNS
+from .base import BASE_COLUMNS, KEYFRAME_COLUMNS, EntityData
+from .extractor import EntityExtractor, get_entity_class, get_entity_extractor, get_entry_extractor
 
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.components.cover import CoverDeviceClass
+from homeassistant.components.humidifier import HumidifierDeviceClass
+from homeassistant.components.number import NumberDeviceClass
+from homeassistant.components.sensor.const import SensorDeviceClass
+from homeassistant.components.switch import SwitchDeviceClass
+from homeassistant.components.valve import ValveDeviceClass
 from homeassistant.const import Platform
 
 class DomainDeviceClass:
@@ -45,440 +56,133 @@ class DomainDeviceClass:
         self.device_clasess = device_classes
 
 
-def create_schema(entity_domains: list[DomainDeviceClass]) -> dict[str, dict[str, Any]]:
-    schema = {**BASE_COLUMNS}
-    for entity_domain in entity_domains:
-        match entity_domain.domain:
-            case Platform.AIR_QUALITY:
-                _additional_cols = AirQColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.ALARM_CONTROL_PANEL:
-                _additional_cols = AlarmColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.BINARY_SENSOR:
-                _additional_cols = BinarySensorColumns(entity_domain.device_clasess)
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.BUTTON:
-                _additional_cols = ButtonColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.CALENDAR:
-                _additional_cols = CalendarColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.CAMERA:
-                _additional_cols = CameraColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.CLIMATE:
-                _additional_cols = ClimateColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.CONVERSATION:
-                _additional_cols = ConversationColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.COVER:
-                _additional_cols = CoverColumns(entity_domain.device_clasess)
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.DATETIME:
-                _additional_cols = DateTimeColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.DATE:
-                _additional_cols = DateColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.DEVICE_TRACKER:
-                _additional_cols = DeviceTrackerColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.EVENT:
-                _additional_cols = EventColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.FAN:
-                _additional_cols = FanColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.HUMIDIFIER:
-                _additional_cols = HumidifierColumns(entity_domain.device_clasess)
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.LAWN_MOWER:
-                _additional_cols = LawnMowerColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.LIGHT:
-                _additional_cols = LightColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.LOCK:
-                _additional_cols = LockColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.NUMBER:
-                _additional_cols = NumberColumns(entity_domain.device_clasess)
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.REMOTE:
-                _additional_cols = RemoteColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.ASSIST_SATELLITE:
-                _additional_cols = SatelliteColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.SELECT:
-                _additional_cols = SelectColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.SENSOR:
-                _additional_cols = SensorColumns(entity_domain.device_clasess)
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.SIREN:
-                _additional_cols = SirenColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.SWITCH:
-                _additional_cols = SwitchColumns(entity_domain.device_clasess)
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.TEXT:
-                _additional_cols = TextColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.TIME:
-                _additional_cols = TimeColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.VACUUM:
-                _additional_cols = VacuumColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.WATER_HEATER:
-                _additional_cols = WaterHeaterColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case Platform.WEATHER:
-                _additional_cols = WeatherColumns()
-                schema = {**schema, **_additional_cols.schema}
-                continue
-            case _:
-                schema = {
-                    **schema,
-                    f"{entity_domain.domain}":{"kind": "string", "required": False}
-                }
-                continue
-    return schema
+SchemaKey = frozenset[tuple[str, frozenset[str]]]
 
+_COLUMN_BUILDERS: dict[str, Callable[[list[str]], Any]] = {
+    Platform.AIR_QUALITY: lambda _: AirQColumns(),
+    Platform.ALARM_CONTROL_PANEL: lambda _: AlarmColumns(),
+    Platform.BINARY_SENSOR: BinarySensorColumns,
+    Platform.BUTTON: lambda _: ButtonColumns(),
+    Platform.CALENDAR: lambda _: CalendarColumns(),
+    Platform.CAMERA: lambda _: CameraColumns(),
+    Platform.CLIMATE: lambda _: ClimateColumns(),
+    Platform.CONVERSATION: lambda _: ConversationColumns(),
+    Platform.COVER: CoverColumns,
+    Platform.DATETIME: lambda _: DateTimeColumns(),
+    Platform.DATE: lambda _: DateColumns(),
+    Platform.DEVICE_TRACKER: lambda _: DeviceTrackerColumns(),
+    Platform.EVENT: lambda _: EventColumns(),
+    Platform.FAN: lambda _: FanColumns(),
+    Platform.HUMIDIFIER: HumidifierColumns,
+    Platform.LAWN_MOWER: lambda _: LawnMowerColumns(),
+    Platform.LIGHT: lambda _: LightColumns(),
+    Platform.LOCK: lambda _: LockColumns(),
+    Platform.NUMBER: NumberColumns,
+    Platform.REMOTE: lambda _: RemoteColumns(),
+    Platform.ASSIST_SATELLITE: lambda _: SatelliteColumns(),
+    Platform.SELECT: lambda _: SelectColumns(),
+    Platform.SENSOR: SensorColumns,
+    Platform.SIREN: lambda _: SirenColumns(),
+    Platform.SWITCH: SwitchColumns,
+    Platform.TEXT: lambda _: TextColumns(),
+    Platform.TIME: lambda _: TimeColumns(),
+    Platform.VACUUM: lambda _: VacuumColumns(),
+    Platform.VALVE: ValveColumns,
+    Platform.WATER_HEATER: lambda _: WaterHeaterColumns(),
+    Platform.WEATHER: lambda _: WeatherColumns(),
+}
 
-def parse_entity_data(entity_entry: RegistryEntry, state: State):
-    device_class = entity_entry.original_device_class
-    if device_class is None:
-        # use translation_key as class identifier
-        # in case device_class = null
-        device_class = entity_entry.translation_key
+_DEVICE_CLASSES: dict[str, type[StrEnum]] = {
+    Platform.BINARY_SENSOR: BinarySensorDeviceClass,
+    Platform.COVER: CoverDeviceClass,
+    Platform.HUMIDIFIER: HumidifierDeviceClass,
+    Platform.NUMBER: NumberDeviceClass,
+    Platform.SENSOR: SensorDeviceClass,
+    Platform.SWITCH: SwitchDeviceClass,
+    Platform.VALVE: ValveDeviceClass,
+}
+
+
+def get_schema_key(entity_domains: list[DomainDeviceClass]) -> SchemaKey:
+    """Canonical key of a model, independent of domain and device class order."""
+    return frozenset(
+        (entity_domain.domain, frozenset(entity_domain.device_clasess))
+        for entity_domain in entity_domains
+    )
+
+
+def create_schema(entity_domains: list[DomainDeviceClass],
+    keyframe: bool = False) -> Mapping[str, Mapping[str, Any]]:
+    """Collection schema of a model, with the `hass_keyframe` column if `keyframe`.
     
-    if state.state == "unknown":
-        return None
+    The returned mapping is shared between callers and read-only, use
+    `schema_to_dict` for a mutable copy.
+    """
+    return build_schema(get_schema_key(entity_domains), keyframe)
+
+
+def get_schema_fingerprint(entity_domains: list[DomainDeviceClass], keyframe: bool = False) -> str:
+    return _build_schema_fingerprint(get_schema_key(entity_domains), keyframe)
+
+
+@lru_cache(maxsize=128)
+def build_schema(schema_key: SchemaKey, keyframe: bool = False) -> Mapping[str, Mapping[str, Any]]:
+    schema = {**BASE_COLUMNS}
+    if keyframe:
+        schema.update(KEYFRAME_COLUMNS)
+    # sorted, so the same model always produces the same column order
+    for domain, device_classes in sorted(schema_key, key=lambda item: item[0]):
+        builder = _COLUMN_BUILDERS.get(domain)
+        if builder is None:
+            schema[f"{domain}"] = {"kind": "string", "required": False}
+            continue
+        schema.update(builder(sorted(device_classes)).schema)
+    return MappingProxyType({
+        column: MappingProxyType(dict(field)) for column, field in schema.items()
+    })
+
+
+@lru_cache(maxsize=128)
+def _build_schema_fingerprint(schema_key: SchemaKey, keyframe: bool) -> str:
+    return schema_fingerprint(build_schema(schema_key, keyframe))
+
+
+def schema_fingerprint(schema: Mapping[str, Mapping[str, Any]]) -> str:
+    """Short hash of the columns, kinds and required flags of a schema."""
+    digest = hashlib.blake2b(digest_size=8)
+    for column in sorted(schema.keys()):
+        field = schema[column]
+        digest.update(f"{column}:{field.get('kind')}:{field.get('required')};".encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_column_kinds() -> Mapping[str, str]:
+    """Kind of every column a model can produce, keyed by column name.
     
-    match entity_entry.domain:
-        case Platform.AIR_QUALITY:
-            from homeassistant.components.air_quality import (
-                ATTR_AQI, ATTR_CO, ATTR_CO2, ATTR_N2O, ATTR_NO,
-                ATTR_NO2, ATTR_OZONE, ATTR_PM_0_1, ATTR_PM_2_5, ATTR_PM_10,
-                ATTR_SO2
-            )
-            
-            airq = AirQEntityData(
-                air_quality_index=state.attributes.get(ATTR_AQI),
-                carbon_dioxide=state.attributes.get(ATTR_CO),
-                carbon_monoxide=state.attributes.get(ATTR_CO2),
-                nitrogen_dioxide=state.attributes.get(ATTR_N2O),
-                nitrogen_monoxide=state.attributes.get(ATTR_NO),
-                nitrogen_oxide=state.attributes.get(ATTR_NO2),
-                ozone=state.attributes.get(ATTR_OZONE),
-                particulate_matter_0_1=state.attributes.get(ATTR_PM_0_1),
-                particulate_matter_2_5=state.attributes.get(ATTR_PM_2_5),
-                particulate_matter_10=state.attributes.get(ATTR_PM_10),
-                sulphur_dioxide=state.attributes.get(ATTR_SO2),
-            )
-            return airq.data
-        
-        case Platform.ALARM_CONTROL_PANEL:
-            alarm = AlarmEntityData(state_value=state.state)
-            return alarm.data
-        
-        case Platform.BINARY_SENSOR:
-            binary_sensor = BinarySensorEntityData(device_class, state_value= state.state == STATE_ON)
-            return binary_sensor.data
-        
-        case Platform.BUTTON:
-            button = ButtonEntityData(state_value=state.state)
-            return button.data
-        
-        case Platform.CALENDAR:
-            calendar = CalendarEntityData(state_value=state.state)
-            return calendar.data
+    Columns of unknown domains are stored as strings and are not listed.
+    """
+    kinds = {column: field["kind"] for column, field in {**BASE_COLUMNS, **KEYFRAME_COLUMNS}.items()}
+    for domain, builder in _COLUMN_BUILDERS.items():
+        device_classes = ["unknown"]
+        if domain in _DEVICE_CLASSES:
+            device_classes.extend(dc.value for dc in _DEVICE_CLASSES[domain])
+        for column, field in builder(device_classes).schema.items():
+            kinds.setdefault(column, field["kind"])
+    return MappingProxyType(kinds)
 
-        case Platform.CAMERA:
-            camera = CameraEntityData(state_value=state.state)
-            return camera.data
-        
-        case Platform.CLIMATE:
-            from homeassistant.components.climate.const import (
-                ATTR_CURRENT_HUMIDITY, ATTR_CURRENT_TEMPERATURE, ATTR_FAN_MODE,
-                ATTR_HVAC_ACTION, ATTR_HVAC_MODE, ATTR_PRESET_MODE, ATTR_SWING_MODE,
-                ATTR_SWING_HORIZONTAL_MODE, ATTR_HUMIDITY, ATTR_TARGET_TEMP_HIGH,
-                ATTR_TARGET_TEMP_LOW
-            )
-            climate = ClimateEntityData(
-                current_humidity=state.attributes.get(ATTR_CURRENT_HUMIDITY, None),
-                current_temperature=state.attributes.get(ATTR_CURRENT_TEMPERATURE, None),
-                fan_mode=state.attributes.get(ATTR_FAN_MODE, None),
-                hvac_action=state.attributes.get(ATTR_HVAC_ACTION, None),
-                hvac_mode=state.attributes.get(ATTR_HVAC_MODE, None),
-                preset_mode=state.attributes.get(ATTR_PRESET_MODE, None),
-                swing_mode=state.attributes.get(ATTR_SWING_MODE, None),
-                swing_horizontal_mode=state.attributes.get(ATTR_SWING_HORIZONTAL_MODE, None),
-                target_humidity=state.attributes.get(ATTR_HUMIDITY, None),
-                target_temperature=state.attributes.get("temperature", None),
-                target_temperature_high=state.attributes.get(ATTR_TARGET_TEMP_HIGH, None),
-                target_temperature_low=state.attributes.get(ATTR_TARGET_TEMP_LOW, None),
-            )
-            return climate.data
-        
-        case Platform.CONVERSATION:
-            conversation = ConversationEntityData(state_value=state.state)
-            return conversation.data
-        
-        case Platform.COVER:
-            from homeassistant.components.cover import CoverState
-            cover = CoverEntityData(device_class, state_value = state.state == CoverState.CLOSED)
-            return cover.data
-        
-        case Platform.DATETIME:
-            datetime = DateTimeEntityData(datetime_iso=state.state)
-            return datetime.data
-        
-        case Platform.DATE:
-            date = DateEntityData(date_iso=state.state)
-            return date.data
-        
-        case Platform.DEVICE_TRACKER:
-            from homeassistant.components.device_tracker import ATTR_BATTERY
-            device_tracker = DeviceTrackerEntityData(
-                battery=state.attributes.get(ATTR_BATTERY, None),
-                latitude=state.attributes.get("latitude", None),
-                longitude=state.attributes.get("longitude", None),
-            )
-            return device_tracker.data
-        
-        case Platform.EVENT:
-            event = EventEntityData(state_value=state.state)
-            return event.data
-        
-        case Platform.FAN:
-            from homeassistant.components.fan import (
-                ATTR_DIRECTION,
-                ATTR_OSCILLATING,
-                ATTR_PERCENTAGE,
-                ATTR_PRESET_MODE
-                )
-            
-            fan = FanEntityData(
-                direction = state.attributes.get(ATTR_DIRECTION, None),
-                is_on = state.state == STATE_ON,
-                oscillating = state.attributes.get(ATTR_OSCILLATING, None),
-                percentage = state.attributes.get(ATTR_PERCENTAGE, None),
-                mode = state.attributes.get(ATTR_PRESET_MODE, None),
-            )
-            return fan.data
-        
-        case Platform.HUMIDIFIER:
-            from homeassistant.components.humidifier.const import (
-                ATTR_ACTION,
-                ATTR_CURRENT_HUMIDITY,
-                ATTR_HUMIDITY
-                )
-            
-            humidifier = HumidifierEntityData(
-                device_class=device_class,
-                action=state.attributes.get(ATTR_ACTION, None),
-                current_humidity=state.attributes.get(ATTR_CURRENT_HUMIDITY, None),
-                is_on=state.state==STATE_ON,
-                mode=state.attributes.get("mode", None),
-                target=state.attributes.get(ATTR_HUMIDITY, None),
-            )
-            return humidifier.data
-        
-        case Platform.LAWN_MOWER:
-            mower = LawnMowerEntityData(state_value=state.state)
-            return mower.data
-        
-        case Platform.LIGHT:
-            from homeassistant.components.light import (
-                ATTR_BRIGHTNESS, ATTR_COLOR_TEMP_KELVIN,
-                ATTR_HS_COLOR, ATTR_RGB_COLOR, ATTR_XY_COLOR
-            )
-            
-            hs_color = state.attributes.get(ATTR_HS_COLOR, None)
-            rgb_color = state.attributes.get(ATTR_RGB_COLOR, None)
-            xy_color = state.attributes.get(ATTR_XY_COLOR, None)
-            
-            hue = None
-            saturation = None
-            red = None
-            green = None
-            blue = None
-            x_color = None
-            y_color = None
-            
-            if hs_color is not None:
-                hue = hs_color[0]
-                saturation = hs_color[1]
-            
-            if rgb_color is not None:
-                red = rgb_color[0]
-                green = rgb_color[1]
-                blue = rgb_color[2]
-            
-            if xy_color is not None:
-                x_color = xy_color[0]
-                y_color = xy_color[1]
-            
-            light = LightEntityData(
-                state_value=state.state == STATE_ON,
-                brightness=state.attributes.get(ATTR_BRIGHTNESS, None),
-                color_temp_kelvin=state.attributes.get(ATTR_COLOR_TEMP_KELVIN, None),
-                hue=hue,
-                saturation=saturation,
-                color_temp=state.attributes.get("color_temp", None),
-                red=red,
-                green=green,
-                blue=blue,
-                x_color=x_color,
-                y_color=y_color
-            )
-            return light.data
-        
-        case Platform.LOCK:
-            lock = LockEntityData(state_value=state.state)
-            return lock.data
-        
-        case Platform.NUMBER:
-            number = NumberEntityData(device_class, float(state.state))
-            return number.data
-        
-        case Platform.REMOTE:
-            remote = RemoteEntityData(state.state)
-            return remote.data
-        
-        case Platform.ASSIST_SATELLITE:
-            satellite = SatelliteEntityData(state.state)
-            return satellite.data
-        
-        case Platform.SELECT:
-            select = SelectEntityData(state.state)
-            return select.data
-        
-        case Platform.SENSOR:
-            sensor = SensorEntityData(device_class, state.state)
-            return sensor.data
-        
-        case Platform.SIREN:
-            siren = SirenEntityData(state.state==STATE_ON)
-            return siren.data
-        
-        case Platform.SWITCH:
-            switch = SwitchEntityData(device_class, state.state==STATE_ON)
-            return switch.data
-        
-        case Platform.TEXT:
-            text = TextEntityData(state.state)
-            return text.data
-        
-        case Platform.TIME:
-            time = TimeEntityData(state.state)
-            return time.data
-        
-        case Platform.VACUUM:
-            from homeassistant.components.vacuum import ATTR_FAN_SPEED, ATTR_STATUS
-            vacuum = VacuumEntityData(
-                vacuum_fan_speed=state.attributes.get(ATTR_FAN_SPEED, None),
-                vacuum_status=state.attributes.get(ATTR_STATUS, None),
-            )
-            return vacuum.data
-        
-        case Platform.VALVE:
-            from homeassistant.components.valve import ATTR_CURRENT_POSITION, STATE_OPEN
-            valve = ValveEntityData(
-                device_class=device_class,
-                is_open=state.state==STATE_OPEN,
-                position=state.attributes.get(ATTR_CURRENT_POSITION, None)
-                )
-            return valve.data
-        
-        case Platform.WATER_HEATER:
-            from homeassistant.components.water_heater import (
-                ATTR_CURRENT_TEMPERATURE, ATTR_TARGET_TEMP_HIGH,
-                ATTR_TARGET_TEMP_LOW, ATTR_TEMPERATURE, ATTR_AWAY_MODE
-            )
-            
-            is_away = state.attributes.get(ATTR_AWAY_MODE, None)
-            if is_away is not None:
-                is_away = is_away == STATE_ON
-            
-            heater = WaterHeaterEntityData(
-                temperature=state.attributes.get(ATTR_CURRENT_TEMPERATURE, None),
-                target_temperature=state.attributes.get(ATTR_TEMPERATURE, None),
-                target_temperature_high=state.attributes.get(ATTR_TARGET_TEMP_HIGH, None),
-                target_temperature_low=state.attributes.get(ATTR_TARGET_TEMP_LOW, None),
-                mode=state.state,
-                is_away=is_away,
-            )
-            return heater.data
 
-        case Platform.WEATHER:
-            from homeassistant.components.weather.const import (
-                ATTR_WEATHER_CLOUD_COVERAGE, ATTR_WEATHER_HUMIDITY,
-                ATTR_WEATHER_APPARENT_TEMPERATURE, ATTR_WEATHER_DEW_POINT,
-                ATTR_WEATHER_PRESSURE, ATTR_WEATHER_TEMPERATURE,
-                ATTR_WEATHER_VISIBILITY, ATTR_WEATHER_WIND_GUST_SPEED,
-                ATTR_WEATHER_WIND_SPEED, ATTR_WEATHER_OZONE, ATTR_WEATHER_WIND_BEARING,
-                ATTR_WEATHER_UV_INDEX
-            )
-            
-            cloud_coverage = state.attributes.get(ATTR_WEATHER_CLOUD_COVERAGE, None)
-            if cloud_coverage is not None:
-                cloud_coverage = int(cloud_coverage)
-            
-            wind_bearing = state.attributes.get(ATTR_WEATHER_WIND_BEARING, None)
-            if wind_bearing is not None:
-                wind_bearing = str(wind_bearing)
-            
-            
-            weather = WeatherEntityData(
-                cloud_coverage=cloud_coverage,
-                condition=state.state,
-                humidity=state.attributes.get(ATTR_WEATHER_HUMIDITY ,None),
-                feels_like_temperature=state.attributes.get(ATTR_WEATHER_APPARENT_TEMPERATURE ,None),
-                dew_point=state.attributes.get(ATTR_WEATHER_DEW_POINT ,None),
-                pressure=state.attributes.get(ATTR_WEATHER_PRESSURE ,None),
-                temperature=state.attributes.get(ATTR_WEATHER_TEMPERATURE ,None),
-                uv_index=state.attributes.get(ATTR_WEATHER_UV_INDEX ,None),
-                visibility=state.attributes.get(ATTR_WEATHER_VISIBILITY ,None),
-                wind_gust_speed=state.attributes.get(ATTR_WEATHER_WIND_GUST_SPEED ,None),
-                wind_speed=state.attributes.get(ATTR_WEATHER_WIND_SPEED ,None),
-                ozone=state.attributes.get(ATTR_WEATHER_OZONE ,None),
-                wind_bearing=wind_bearing,
-            )
-            return weather.data
-        case _:
-            pass
\ No newline at end of file
+def schema_to_dict(schema: Mapping[str, Mapping[str, Any]]) -> dict[str, dict[str, Any]]:
+    return {column: dict(field) for column, field in schema.items()}
+
+
+def parse_entity_data(entity_entry: RegistryEntry, state: State):
+    """Map entity state to its collection columns.
+    
+    Prefer keeping the extractor from `get_entry_extractor` when the same
+    entity is parsed repeatedly.
+    """
+    data = {}
+    if get_entry_extractor(entity_entry)(state, data) is None:
+        return None
+    return data
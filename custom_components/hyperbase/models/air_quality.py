@@ -1,3 +1,20 @@
+from .base import EntityData
+
+AIRQ_COLUMNS = (
+    "airq_particulate_matter_2_5",
+    "airq_particulate_matter_10",
+    "airq_particulate_matter_0_1",
+    "airq_air_quality_index",
+    "airq_ozone",
+    "airq_carbon_monoxide",
+    "airq_carbon_dioxide",
+    "airq_sulphur_dioxide",
+    "airq_nitrogen_oxide",
+    "airq_nitrogen_monoxide",
+    "airq_nitrogen_dioxide",
+)
+
+
 class AirQColumns:
     def __init__(self):
         self.__columns = {
@@ -19,7 +36,9 @@ class AirQColumns:
         return self.__columns
 
 
-class AirQEntityData:
+class AirQEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         particulate_matter_2_5: float | None = None,
         particulate_matter_10: float | None = None,
@@ -33,30 +52,16 @@ class AirQEntityData:
         nitrogen_monoxide: float | None = None,
         nitrogen_dioxide: float | None = None,
         ):
-        self._particulate_matter_2_5 = particulate_matter_2_5
-        self._particulate_matter_10 = particulate_matter_10
-        self._particulate_matter_0_1 = particulate_matter_0_1
-        self._air_quality_index = air_quality_index
-        self._ozone = ozone
-        self._carbon_monoxide = carbon_monoxide
-        self._carbon_dioxide = carbon_dioxide
-        self._sulphur_dioxide = sulphur_dioxide
-        self._nitrogen_oxide = nitrogen_oxide
-        self._nitrogen_monoxide = nitrogen_monoxide
-        self._nitrogen_dioxide = nitrogen_dioxide
-    
-    @property
-    def data(self):
-        return {
-            "airq_particulate_matter_2_5": self._particulate_matter_2_5,
-            "airq_particulate_matter_10": self._particulate_matter_10,
-            "airq_particulate_matter_0_1": self._particulate_matter_0_1,
-            "airq_air_quality_index": self._air_quality_index,
-            "airq_ozone": self._ozone,
-            "airq_carbon_monoxide": self._carbon_monoxide,
-            "airq_carbon_dioxide": self._carbon_dioxide,
-            "airq_sulphur_dioxide": self._sulphur_dioxide,
-            "airq_nitrogen_oxide": self._nitrogen_oxide,
-            "airq_nitrogen_monoxide": self._nitrogen_monoxide,
-            "airq_nitrogen_dioxide": self._nitrogen_dioxide,
-        }
\ No newline at end of file
+        super().__init__(AIRQ_COLUMNS, (
+            particulate_matter_2_5,
+            particulate_matter_10,
+            particulate_matter_0_1,
+            air_quality_index,
+            ozone,
+            carbon_monoxide,
+            carbon_dioxide,
+            sulphur_dioxide,
+            nitrogen_oxide,
+            nitrogen_monoxide,
+            nitrogen_dioxide,
+        ))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+ALARM_COLUMNS = ("alarm",)
+
+
 class AlarmColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class AlarmColumns:
         return self.__columns
 
 
-class AlarmEntityData:
+class AlarmEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"alarm": self.__state_value}
\ No newline at end of file
+        super().__init__(ALARM_COLUMNS, (state_value,))
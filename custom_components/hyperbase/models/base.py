@@ -1,6 +1,7 @@
 """
 Base model for hyperbase collections.
 """
+from typing import Any
 
 BASE_COLUMNS = {
     "hass_connector_entity": {"kind": "string", "required": True},
@@ -9,5 +10,40 @@ BASE_COLUMNS = {
     "hass_name_by_user": {"kind": "string", "required": False},
     "hass_area_id": {"kind": "string", "required": False},
     "hass_status": {"kind": "string", "required": False},
-    "hass_record_date": {"kind": "timestamp", "required": False}
-}
\ No newline at end of file
+    "hass_record_date": {"kind": "timestamp", "required": False},
+}
+
+# only in collections of projects publishing deltas
+KEYFRAME_COLUMNS = {
+    "hass_keyframe": {"kind": "boolean", "required": False},
+}
+
+class EntityData:
+    """Column values of one entity.
+
+    Instances only hold a tuple of values, the column names are a tuple shared
+    by every instance of the same domain (and device class).
+    """
+    __slots__ = ("_columns", "_values")
+
+    def __init__(self, columns: tuple[str, ...], values: tuple[Any, ...]):
+        self._columns = columns
+        self._values = values
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def data(self):
+        return dict(zip(self._columns, self._values))
+
+    def write_into(self, row: dict[str, Any]) -> str:
+        """Write the values into `row` and return the first column."""
+        for column, value in zip(self._columns, self._values):
+            row[column] = value
+        return self._columns[0]
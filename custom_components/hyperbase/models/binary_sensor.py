@@ -1,3 +1,15 @@
+from functools import lru_cache
+
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def binary_sensor_columns(device_class: str | None) -> tuple[str, ...]:
+    if device_class is not None:
+        return (f"binary_sensor__{device_class}",)
+    return ("binary_sensor",)
+
+
 class BinarySensorColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -11,16 +23,10 @@ class BinarySensorColumns:
         return self.__columns
 
 
-class BinarySensorEntityData:
+class BinarySensorEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
-            device_class: str | None = None,
-            state_value: bool | None = None):
-        self.__device_class = device_class
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        if self.__device_class is not None:
-            return {f"binary_sensor__{self.__device_class}": self.__state_value}
-        else:
-            return {f"binary_sensor": self.__state_value}
\ No newline at end of file
+        device_class: str | None = None,
+        state_value: bool | None = None):
+        super().__init__(binary_sensor_columns(device_class), (state_value,))
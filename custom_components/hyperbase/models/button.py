@@ -1,3 +1,8 @@
+from .base import EntityData
+
+BUTTON_COLUMNS = ("button",)
+
+
 class ButtonColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class ButtonColumns:
         return self.__columns
 
 
-class ButtonEntityData:
+class ButtonEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"button": self.__state_value}
\ No newline at end of file
+        super().__init__(BUTTON_COLUMNS, (state_value,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+CALENDAR_COLUMNS = ("calendar",)
+
+
 class CalendarColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class CalendarColumns:
         return self.__columns
 
 
-class CalendarEntityData:
+class CalendarEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"calendar": self.__state_value}
\ No newline at end of file
+        super().__init__(CALENDAR_COLUMNS, (state_value,))
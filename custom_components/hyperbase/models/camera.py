@@ -1,3 +1,8 @@
+from .base import EntityData
+
+CAMERA_COLUMNS = ("camera",)
+
+
 class CameraColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class CameraColumns:
         return self.__columns
 
 
-class CameraEntityData:
+class CameraEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"camera": self.__state_value}
\ No newline at end of file
+        super().__init__(CAMERA_COLUMNS, (state_value,))
@@ -1,5 +1,23 @@
 from typing import Any
 
+from .base import EntityData
+
+CLIMATE_COLUMNS = (
+    "climate_current_humidity",
+    "climate_current_temperature",
+    "climate_fan_mode",
+    "climate_hvac_action",
+    "climate_hvac_mode",
+    "climate_preset_mode",
+    "climate_swing_mode",
+    "climate_swing_horizontal_mode",
+    "climate_target_humidity",
+    "climate_target_temperature",
+    "climate_target_temperature_high",
+    "climate_target_temperature_low",
+)
+
+
 class ClimateColumns:
     def __init__(self):
         self.__columns = {
@@ -22,7 +40,9 @@ class ClimateColumns:
         return self.__columns
 
 
-class ClimateEntityData:
+class ClimateEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         current_humidity: float | None = None,
         current_temperature: float | None = None,
@@ -37,32 +57,17 @@ class ClimateEntityData:
         target_temperature_high: float | None = None,
         target_temperature_low: float | None = None,
         ):
-        self._current_humidity = current_humidity
-        self._current_temperature = current_temperature
-        self._fan_mode = fan_mode
-        self._hvac_action = hvac_action
-        self._hvac_mode = hvac_mode
-        self._preset_mode = preset_mode
-        self._swing_mode = swing_mode
-        self._swing_horizontal_mode = swing_horizontal_mode
-        self._target_humidity = target_humidity
-        self._target_temperature = target_temperature
-        self._target_temperature_high = target_temperature_high
-        self._target_temperature_low = target_temperature_low
-    
-    @property
-    def data(self):
-        return {
-            "climate_current_humidity": self._current_humidity,
-            "climate_current_temperature": self._current_temperature,
-            "climate_fan_mode": self._fan_mode,
-            "climate_hvac_action": self._hvac_action,
-            "climate_hvac_mode": self._hvac_mode,
-            "climate_preset_mode": self._preset_mode,
-            "climate_swing_mode": self._swing_mode,
-            "climate_swing_horizontal_mode": self._swing_horizontal_mode,
-            "climate_target_humidity": self._target_humidity,
-            "climate_target_temperature": self._target_temperature,
-            "climate_target_temperature_high": self._target_temperature_high,
-            "climate_target_temperature_low": self._target_temperature_low,
-        }
\ No newline at end of file
+        super().__init__(CLIMATE_COLUMNS, (
+            current_humidity,
+            current_temperature,
+            fan_mode,
+            hvac_action,
+            hvac_mode,
+            preset_mode,
+            swing_mode,
+            swing_horizontal_mode,
+            target_humidity,
+            target_temperature,
+            target_temperature_high,
+            target_temperature_low,
+        ))
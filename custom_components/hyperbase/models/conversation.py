@@ -1,3 +1,8 @@
+from .base import EntityData
+
+CONVERSATION_COLUMNS = ("conversation",)
+
+
 class ConversationColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class ConversationColumns:
         return self.__columns
 
 
-class ConversationEntityData:
+class ConversationEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"conversation": self.__state_value}
\ No newline at end of file
+        super().__init__(CONVERSATION_COLUMNS, (state_value,))
@@ -1,3 +1,15 @@
+from functools import lru_cache
+
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def cover_columns(device_class: str | None) -> tuple[str, ...]:
+    if device_class is not None:
+        return (f"cover__{device_class}_is_closed",)
+    return ("cover_is_closed",)
+
+
 class CoverColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -13,14 +25,10 @@ class CoverColumns:
         return self.__columns
 
 
-class CoverEntityData:
-    def __init__(self, device_class: str | None = None, state_value: bool | None = None):
-        self.__device_class = device_class
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        if self.__device_class is not None:
-            return {f"cover__{self.__device_class}_is_closed": self.__state_value}
-        else:
-            return {f"cover_is_closed": self.__state_value}
\ No newline at end of file
+class CoverEntityData(EntityData):
+    __slots__ = ()
+
+    def __init__(self,
+        device_class: str | None = None,
+        state_value: bool | None = None):
+        super().__init__(cover_columns(device_class), (state_value,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+DATE_COLUMNS = ("date",)
+
+
 class DateColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class DateColumns:
         return self.__columns
 
 
-class DateEntityData:
+class DateEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, date_iso: str | None = None):
-        self.__state_value = date_iso
-    
-    @property
-    def data(self):
-        return {"date": self.__state_value}
\ No newline at end of file
+        super().__init__(DATE_COLUMNS, (date_iso,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+DATE_TIME_COLUMNS = ("datetime",)
+
+
 class DateTimeColumns:
     def __init__(self):
         self.__columns = {
@@ -8,10 +13,8 @@ class DateTimeColumns:
         return self.__columns
 
 
-class DateTimeEntityData:
+class DateTimeEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, datetime_iso: str | None = None):
-        self.__state_value = datetime_iso
-    
-    @property
-    def data(self):
-        return {"datetime": self.__state_value}
\ No newline at end of file
+        super().__init__(DATE_TIME_COLUMNS, (datetime_iso,))
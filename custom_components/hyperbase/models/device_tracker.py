@@ -1,5 +1,14 @@
 from typing import Any
 
+from .base import EntityData
+
+DEVICE_TRACKER_COLUMNS = (
+    "device_tracker_battery",
+    "device_tracker_latitude",
+    "device_tracker_longitude",
+)
+
+
 class DeviceTrackerColumns:
     def __init__(self):
         self.__columns = {
@@ -13,21 +22,16 @@ class DeviceTrackerColumns:
         return self.__columns
 
 
-class DeviceTrackerEntityData:
+class DeviceTrackerEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         battery: int | None = None,
-        latitude: float | None = None, 
-        longitude: float | None = None, 
+        latitude: float | None = None,
+        longitude: float | None = None,
         ):
-        self._battery = battery
-        self._latitude = latitude
-        self._longitude = longitude
-    
-    @property
-    def data(self):
-        return {
-            "device_tracker_battery": self._battery,
-            "device_tracker_is_connected": self._is_connected,
-            "device_tracker_latitude": self._latitude,
-            "device_tracker_longitude": self._longitude,
-        }
\ No newline at end of file
+        super().__init__(DEVICE_TRACKER_COLUMNS, (
+            battery,
+            latitude,
+            longitude,
+        ))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+EVENT_COLUMNS = ("event",)
+
+
 class EventColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class EventColumns:
         return self.__columns
 
 
-class EventEntityData:
+class EventEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"event": self.__state_value}
\ No newline at end of file
+        super().__init__(EVENT_COLUMNS, (state_value,))
@@ -0,0 +1,327 @@
+"""
+Precompiled entity extractors.
+
+An extractor maps an entity state straight to its collection columns. It is
+built once per (domain, device class) pair, so component constants are
+imported and column names are formatted once instead of on every tick.
+
+Extractors write into the record of the caller and return the first column
+written (or None when the state has no data), so a tick does not allocate an
+intermediate dict per entity.
+"""
+from functools import lru_cache
+from typing import Any, Callable
+
+from homeassistant.const import STATE_ON, Platform
+from homeassistant.core import State
+from homeassistant.helpers.entity_registry import RegistryEntry
+
+from .air_quality import AIRQ_COLUMNS
+from .binary_sensor import binary_sensor_columns
+from .climate import CLIMATE_COLUMNS
+from .cover import cover_columns
+from .device_tracker import DEVICE_TRACKER_COLUMNS
+from .fan import FAN_COLUMNS
+from .humidifier import humidifier_columns
+from .light import LIGHT_COLUMNS
+from .number import number_columns
+from .sensor import sensor_columns
+from .switch import switch_columns
+from .vacuum import VACUUM_COLUMNS
+from .valve import valve_columns
+from .water_heater import WATER_HEATER_COLUMNS
+from .weather import WEATHER_COLUMNS
+
+EntityExtractor = Callable[[State, dict[str, Any]], str | None]
+
+
+def get_entity_class(entity_entry: RegistryEntry) -> str | None:
+    """Device class of the entity, translation key is used if device class is not set."""
+    if entity_entry.original_device_class is not None:
+        return entity_entry.original_device_class
+    return entity_entry.translation_key
+
+
+def get_entry_extractor(entity_entry: RegistryEntry) -> EntityExtractor:
+    return get_entity_extractor(entity_entry.domain, get_entity_class(entity_entry))
+
+
+@lru_cache(maxsize=None)
+def get_entity_extractor(domain: str, device_class: str | None) -> EntityExtractor:
+    builder = _EXTRACTOR_BUILDERS.get(domain)
+    if builder is None:
+        return _extract_nothing
+
+    extract = builder(device_class)
+    def extract_known(state: State, row: dict[str, Any]):
+        if state.state == "unknown":
+            return None
+        return extract(state, row)
+    return extract_known
+
+
+def _extract_nothing(state: State, row: dict[str, Any]):
+    return None
+
+
+def _state_extractor(column: str):
+    def extract(state: State, row: dict[str, Any]):
+        row[column] = state.state
+        return column
+    return extract
+
+
+def _is_on_extractor(column: str):
+    def extract(state: State, row: dict[str, Any]):
+        row[column] = state.state == STATE_ON
+        return column
+    return extract
+
+
+def _attributes_extractor(columns: tuple[str, ...], attrs: tuple[str, ...]):
+    pairs = tuple(zip(columns, attrs))
+    def extract(state: State, row: dict[str, Any]):
+        attributes = state.attributes
+        for column, attr in pairs:
+            row[column] = attributes.get(attr)
+        return columns[0]
+    return extract
+
+
+def _build_air_quality(device_class):
+    from homeassistant.components.air_quality import (
+        ATTR_AQI, ATTR_CO, ATTR_CO2, ATTR_N2O, ATTR_NO,
+        ATTR_NO2, ATTR_OZONE, ATTR_PM_0_1, ATTR_PM_2_5, ATTR_PM_10,
+        ATTR_SO2
+    )
+    return _attributes_extractor(AIRQ_COLUMNS, (
+        ATTR_PM_2_5, ATTR_PM_10, ATTR_PM_0_1, ATTR_AQI, ATTR_OZONE,
+        ATTR_CO2, ATTR_CO, ATTR_SO2, ATTR_NO2, ATTR_NO, ATTR_N2O,
+    ))
+
+
+def _build_binary_sensor(device_class):
+    return _is_on_extractor(binary_sensor_columns(device_class)[0])
+
+
+def _build_climate(device_class):
+    from homeassistant.components.climate.const import (
+        ATTR_CURRENT_HUMIDITY, ATTR_CURRENT_TEMPERATURE, ATTR_FAN_MODE,
+        ATTR_HVAC_ACTION, ATTR_HVAC_MODE, ATTR_PRESET_MODE, ATTR_SWING_MODE,
+        ATTR_SWING_HORIZONTAL_MODE, ATTR_HUMIDITY, ATTR_TARGET_TEMP_HIGH,
+        ATTR_TARGET_TEMP_LOW
+    )
+    return _attributes_extractor(CLIMATE_COLUMNS, (
+        ATTR_CURRENT_HUMIDITY, ATTR_CURRENT_TEMPERATURE, ATTR_FAN_MODE,
+        ATTR_HVAC_ACTION, ATTR_HVAC_MODE, ATTR_PRESET_MODE, ATTR_SWING_MODE,
+        ATTR_SWING_HORIZONTAL_MODE, ATTR_HUMIDITY, "temperature",
+        ATTR_TARGET_TEMP_HIGH, ATTR_TARGET_TEMP_LOW,
+    ))
+
+
+def _build_cover(device_class):
+    from homeassistant.components.cover import CoverState
+    column = cover_columns(device_class)[0]
+    def extract(state: State, row: dict[str, Any]):
+        row[column] = state.state == CoverState.CLOSED
+        return column
+    return extract
+
+
+def _build_device_tracker(device_class):
+    from homeassistant.components.device_tracker import ATTR_BATTERY
+    return _attributes_extractor(DEVICE_TRACKER_COLUMNS, (ATTR_BATTERY, "latitude", "longitude"))
+
+
+def _build_fan(device_class):
+    from homeassistant.components.fan import (
+        ATTR_DIRECTION,
+        ATTR_OSCILLATING,
+        ATTR_PERCENTAGE,
+        ATTR_PRESET_MODE
+        )
+    direction, is_on, oscillating, percentage, mode = FAN_COLUMNS
+    def extract(state: State, row: dict[str, Any]):
+        attributes = state.attributes
+        row[direction] = attributes.get(ATTR_DIRECTION)
+        row[is_on] = state.state == STATE_ON
+        row[oscillating] = attributes.get(ATTR_OSCILLATING)
+        row[percentage] = attributes.get(ATTR_PERCENTAGE)
+        row[mode] = attributes.get(ATTR_PRESET_MODE)
+        return direction
+    return extract
+
+
+def _build_humidifier(device_class):
+    from homeassistant.components.humidifier.const import (
+        ATTR_ACTION,
+        ATTR_CURRENT_HUMIDITY,
+        ATTR_HUMIDITY
+        )
+    action, current_humidity, is_on, mode, target = humidifier_columns(device_class)
+    def extract(state: State, row: dict[str, Any]):
+        attributes = state.attributes
+        row[action] = attributes.get(ATTR_ACTION)
+        row[current_humidity] = attributes.get(ATTR_CURRENT_HUMIDITY)
+        row[is_on] = state.state == STATE_ON
+        row[mode] = attributes.get("mode")
+        row[target] = attributes.get(ATTR_HUMIDITY)
+        return action
+    return extract
+
+
+def _build_light(device_class):
+    from homeassistant.components.light import (
+        ATTR_BRIGHTNESS, ATTR_COLOR_TEMP_KELVIN,
+        ATTR_HS_COLOR, ATTR_RGB_COLOR, ATTR_XY_COLOR
+    )
+    (brightness, color_temp_kelvin, hue, saturation, is_on, color_temp,
+        red, green, blue, x_color, y_color) = LIGHT_COLUMNS
+    no_hs = (None, None)
+    no_rgb = (None, None, None)
+    def extract(state: State, row: dict[str, Any]):
+        attributes = state.attributes
+        hs_color = attributes.get(ATTR_HS_COLOR) or no_hs
+        rgb_color = attributes.get(ATTR_RGB_COLOR) or no_rgb
+        xy_color = attributes.get(ATTR_XY_COLOR) or no_hs
+        row[brightness] = attributes.get(ATTR_BRIGHTNESS)
+        row[color_temp_kelvin] = attributes.get(ATTR_COLOR_TEMP_KELVIN)
+        row[hue] = hs_color[0]
+        row[saturation] = hs_color[1]
+        row[is_on] = state.state == STATE_ON
+        row[color_temp] = attributes.get("color_temp")
+        row[red] = rgb_color[0]
+        row[green] = rgb_color[1]
+        row[blue] = rgb_color[2]
+        row[x_color] = xy_color[0]
+        row[y_color] = xy_color[1]
+        return brightness
+    return extract
+
+
+def _build_number(device_class):
+    column = number_columns(device_class)[0]
+    def extract(state: State, row: dict[str, Any]):
+        row[column] = float(state.state)
+        return column
+    return extract
+
+
+def _build_sensor(device_class):
+    from homeassistant.components.sensor.const import SensorDeviceClass
+    column = sensor_columns(device_class)[0]
+    if device_class is None or device_class in (
+        SensorDeviceClass.TIMESTAMP, SensorDeviceClass.DATE, SensorDeviceClass.ENUM):
+        return _state_extractor(column)
+
+    def extract(state: State, row: dict[str, Any]):
+        try:
+            row[column] = float(state.state)
+        except ValueError:
+            row[column] = state.state
+        return column
+    return extract
+
+
+def _build_switch(device_class):
+    return _is_on_extractor(switch_columns(device_class)[0])
+
+
+def _build_vacuum(device_class):
+    from homeassistant.components.vacuum import ATTR_FAN_SPEED, ATTR_STATUS
+    return _attributes_extractor(VACUUM_COLUMNS, (ATTR_FAN_SPEED, ATTR_STATUS))
+
+
+def _build_valve(device_class):
+    from homeassistant.components.valve import ATTR_CURRENT_POSITION, STATE_OPEN
+    is_open, position = valve_columns(device_class)
+    def extract(state: State, row: dict[str, Any]):
+        row[is_open] = state.state == STATE_OPEN
+        row[position] = state.attributes.get(ATTR_CURRENT_POSITION)
+        return is_open
+    return extract
+
+
+def _build_water_heater(device_class):
+    from homeassistant.components.water_heater import (
+        ATTR_CURRENT_TEMPERATURE, ATTR_TARGET_TEMP_HIGH,
+        ATTR_TARGET_TEMP_LOW, ATTR_TEMPERATURE, ATTR_AWAY_MODE
+    )
+    (temperature, target_temperature, target_temperature_high,
+        target_temperature_low, mode, is_away) = WATER_HEATER_COLUMNS
+    def extract(state: State, row: dict[str, Any]):
+        attributes = state.attributes
+        away_mode = attributes.get(ATTR_AWAY_MODE)
+        row[temperature] = attributes.get(ATTR_CURRENT_TEMPERATURE)
+        row[target_temperature] = attributes.get(ATTR_TEMPERATURE)
+        row[target_temperature_high] = attributes.get(ATTR_TARGET_TEMP_HIGH)
+        row[target_temperature_low] = attributes.get(ATTR_TARGET_TEMP_LOW)
+        row[mode] = state.state
+        row[is_away] = away_mode == STATE_ON if away_mode is not None else None
+        return temperature
+    return extract
+
+
+def _build_weather(device_class):
+    from homeassistant.components.weather.const import (
+        ATTR_WEATHER_CLOUD_COVERAGE, ATTR_WEATHER_HUMIDITY,
+        ATTR_WEATHER_APPARENT_TEMPERATURE, ATTR_WEATHER_DEW_POINT,
+        ATTR_WEATHER_PRESSURE, ATTR_WEATHER_TEMPERATURE,
+        ATTR_WEATHER_VISIBILITY, ATTR_WEATHER_WIND_GUST_SPEED,
+        ATTR_WEATHER_WIND_SPEED, ATTR_WEATHER_OZONE, ATTR_WEATHER_WIND_BEARING,
+        ATTR_WEATHER_UV_INDEX
+    )
+    cloud_coverage, condition = WEATHER_COLUMNS[:2]
+    wind_bearing = WEATHER_COLUMNS[-1]
+    pairs = tuple(zip(WEATHER_COLUMNS[2:-1], (
+        ATTR_WEATHER_HUMIDITY, ATTR_WEATHER_APPARENT_TEMPERATURE,
+        ATTR_WEATHER_DEW_POINT, ATTR_WEATHER_PRESSURE, ATTR_WEATHER_TEMPERATURE,
+        ATTR_WEATHER_UV_INDEX, ATTR_WEATHER_VISIBILITY,
+        ATTR_WEATHER_WIND_GUST_SPEED, ATTR_WEATHER_WIND_SPEED, ATTR_WEATHER_OZONE,
+    )))
+    def extract(state: State, row: dict[str, Any]):
+        attributes = state.attributes
+        coverage = attributes.get(ATTR_WEATHER_CLOUD_COVERAGE)
+        bearing = attributes.get(ATTR_WEATHER_WIND_BEARING)
+        row[cloud_coverage] = int(coverage) if coverage is not None else None
+        row[condition] = state.state
+        for column, attr in pairs:
+            row[column] = attributes.get(attr)
+        row[wind_bearing] = str(bearing) if bearing is not None else None
+        return cloud_coverage
+    return extract
+
+
+_EXTRACTOR_BUILDERS: dict[str, Callable[[str | None], EntityExtractor]] = {
+    Platform.AIR_QUALITY: _build_air_quality,
+    Platform.ALARM_CONTROL_PANEL: lambda _: _state_extractor("alarm"),
+    Platform.BINARY_SENSOR: _build_binary_sensor,
+    Platform.BUTTON: lambda _: _state_extractor("button"),
+    Platform.CALENDAR: lambda _: _state_extractor("calendar"),
+    Platform.CAMERA: lambda _: _state_extractor("camera"),
+    Platform.CLIMATE: _build_climate,
+    Platform.CONVERSATION: lambda _: _state_extractor("conversation"),
+    Platform.COVER: _build_cover,
+    Platform.DATETIME: lambda _: _state_extractor("datetime"),
+    Platform.DATE: lambda _: _state_extractor("date"),
+    Platform.DEVICE_TRACKER: _build_device_tracker,
+    Platform.EVENT: lambda _: _state_extractor("event"),
+    Platform.FAN: _build_fan,
+    Platform.HUMIDIFIER: _build_humidifier,
+    Platform.LAWN_MOWER: lambda _: _state_extractor("lawn_mower"),
+    Platform.LIGHT: _build_light,
+    Platform.LOCK: lambda _: _state_extractor("lock"),
+    Platform.NUMBER: _build_number,
+    Platform.REMOTE: lambda _: _state_extractor("remote"),
+    Platform.ASSIST_SATELLITE: lambda _: _state_extractor("satellite"),
+    Platform.SELECT: lambda _: _state_extractor("selected_option"),
+    Platform.SENSOR: _build_sensor,
+    Platform.SIREN: lambda _: _is_on_extractor("siren_is_on"),
+    Platform.SWITCH: _build_switch,
+    Platform.TEXT: lambda _: _state_extractor("text_data"),
+    Platform.TIME: lambda _: _state_extractor("time"),
+    Platform.VACUUM: _build_vacuum,
+    Platform.VALVE: _build_valve,
+    Platform.WATER_HEATER: _build_water_heater,
+    Platform.WEATHER: _build_weather,
+}
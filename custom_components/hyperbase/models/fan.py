@@ -1,3 +1,14 @@
+from .base import EntityData
+
+FAN_COLUMNS = (
+    "fan_direction",
+    "fan_is_on",
+    "fan_oscillating",
+    "fan_percentage",
+    "fan_mode",
+)
+
+
 class FanColumns:
     def __init__(self):
         self.__columns = {
@@ -13,7 +24,9 @@ class FanColumns:
         return self.__columns
 
 
-class FanEntityData:
+class FanEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         direction: str | None = None,
         is_on: bool | None = None,
@@ -21,18 +34,10 @@ class FanEntityData:
         percentage: int | None = None,
         mode: str | None = None,
         ):
-        self._direction = direction
-        self._is_on = is_on
-        self._oscillating = oscillating
-        self._percentage = percentage
-        self._mode = mode
-        
-    @property
-    def data(self):
-        return {
-            "fan_direction": self._direction,
-            "fan_is_on": self._is_on,
-            "fan_oscillating": self._oscillating,
-            "fan_percentage": self._percentage,
-            "fan_mode": self._mode,
-        }
\ No newline at end of file
+        super().__init__(FAN_COLUMNS, (
+            direction,
+            is_on,
+            oscillating,
+            percentage,
+            mode,
+        ))
@@ -1,3 +1,20 @@
+from functools import lru_cache
+
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def humidifier_columns(device_class: str | None) -> tuple[str, ...]:
+    prefix = device_class if device_class is not None else "humidifier"
+    return (
+        f"{prefix}_action",
+        f"{prefix}_current_humidity",
+        f"{prefix}_is_on",
+        f"{prefix}_mode",
+        f"{prefix}_target",
+    )
+
+
 class HumidifierColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -21,37 +38,21 @@ class HumidifierColumns:
         return self.__columns
 
 
-class HumidifierEntityData:
+class HumidifierEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         device_class: str | None = None,
         action: str | None = None,
         current_humidity: float | None = None,
         is_on: bool | None = None,
         mode: str | None = None,
-        target: bool | None = None,
+        target: float | None = None,
         ):
-        self._device_class = device_class
-        self._action = action
-        self._current_humidity = current_humidity
-        self._is_on = is_on
-        self._mode = mode
-        self._target = target
-        
-    @property
-    def data(self):
-        if self._device_class is not None:
-            return {
-                f"{self._device_class}_action": self._action,  
-                f"{self._device_class}_current_humidity": self._current_humidity,  
-                f"{self._device_class}_is_on": self._is_on,  
-                f"{self._device_class}_mode": self._mode,  
-                f"{self._device_class}_target": self._target,
-            }
-        else:
-            return {
-                f"humidifier_action": self._action,  
-                f"humidifier_current_humidity": self._current_humidity,  
-                f"humidifier_is_on": self._is_on,  
-                f"humidifier_mode": self._mode,  
-                f"humidifier_target": self._target,
-            }
\ No newline at end of file
+        super().__init__(humidifier_columns(device_class), (
+            action,
+            current_humidity,
+            is_on,
+            mode,
+            target,
+        ))
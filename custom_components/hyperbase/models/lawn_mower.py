@@ -1,3 +1,8 @@
+from .base import EntityData
+
+LAWN_MOWER_COLUMNS = ("lawn_mower",)
+
+
 class LawnMowerColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class LawnMowerColumns:
         return self.__columns
 
 
-class LawnMowerEntityData:
+class LawnMowerEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"lawn_mower": self.__state_value}
\ No newline at end of file
+        super().__init__(LAWN_MOWER_COLUMNS, (state_value,))
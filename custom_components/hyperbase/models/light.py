@@ -1,3 +1,20 @@
+from .base import EntityData
+
+LIGHT_COLUMNS = (
+    "light_brightness",
+    "light_color_temp_kelvin",
+    "light_hue",
+    "light_saturation",
+    "light_is_on",
+    "light_color_temp",
+    "light_red",
+    "light_green",
+    "light_blue",
+    "light_x_color",
+    "light_y_color",
+)
+
+
 class LightColumns:
     def __init__(self):
         self._columns = {
@@ -19,7 +36,9 @@ class LightColumns:
         return self._columns
 
 
-class LightEntityData:
+class LightEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         state_value: bool | None = None,
         brightness: int | None = None,
@@ -31,32 +50,18 @@ class LightEntityData:
         green: int | None = None,
         blue: int | None = None,
         x_color: float | None = None,
-        y_color: float | None = None
+        y_color: float | None = None,
         ):
-        self._state_value = state_value
-        self._brightness = brightness
-        self._color_temp_kelvin = color_temp_kelvin
-        self._hue = hue
-        self._saturation = saturation
-        self._color_temp = color_temp
-        self._red = red
-        self._green = green
-        self._blue = blue
-        self._x_color = x_color
-        self._y_color = y_color
-    
-    @property
-    def data(self):
-        return {
-            "light_brightness": self._brightness,
-            "light_color_temp_kelvin": self._color_temp_kelvin,
-            "light_hue": self._hue,
-            "light_saturation": self._saturation,
-            "light_is_on": self._state_value,
-            "light_color_temp": self._color_temp,
-            "light_red": self._red,
-            "light_green": self._green,
-            "light_blue": self._blue,
-            "light_x_color": self._x_color,
-            "light_y_color": self._y_color,
-        }
\ No newline at end of file
+        super().__init__(LIGHT_COLUMNS, (
+            brightness,
+            color_temp_kelvin,
+            hue,
+            saturation,
+            state_value,
+            color_temp,
+            red,
+            green,
+            blue,
+            x_color,
+            y_color,
+        ))
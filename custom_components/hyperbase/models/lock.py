@@ -1,3 +1,8 @@
+from .base import EntityData
+
+LOCK_COLUMNS = ("lock",)
+
+
 class LockColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class LockColumns:
         return self.__columns
 
 
-class LockEntityData:
+class LockEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"lock": self.__state_value}
\ No newline at end of file
+        super().__init__(LOCK_COLUMNS, (state_value,))
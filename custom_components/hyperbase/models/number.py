@@ -1,3 +1,15 @@
+from functools import lru_cache
+
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def number_columns(device_class: str | None) -> tuple[str, ...]:
+    if device_class is not None:
+        return (f"number__{device_class}",)
+    return ("number",)
+
+
 class NumberColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -13,17 +25,10 @@ class NumberColumns:
         return self.__columns
 
 
+class NumberEntityData(EntityData):
+    __slots__ = ()
 
-class NumberEntityData:
     def __init__(self,
         device_class: str | None = None,
         state_value: float | None = None):
-        self.__device_class = device_class
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        if self.__device_class is not None:
-            return {f"sensor__{self.__device_class}": self.__state_value}
-        else:
-            return {f"sensor": self.__state_value}
\ No newline at end of file
+        super().__init__(number_columns(device_class), (state_value,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+REMOTE_COLUMNS = ("remote",)
+
+
 class RemoteColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class RemoteColumns:
         return self.__columns
 
 
-class RemoteEntityData:
+class RemoteEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"remote": self.__state_value}
\ No newline at end of file
+        super().__init__(REMOTE_COLUMNS, (state_value,))
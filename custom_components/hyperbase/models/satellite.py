@@ -1,5 +1,10 @@
 from typing import Any
 
+from .base import EntityData
+
+SATELLITE_COLUMNS = ("satellite",)
+
+
 class SatelliteColumns:
     def __init__(self):
         self.__columns = {
@@ -11,10 +16,8 @@ class SatelliteColumns:
         return self.__columns
 
 
-class SatelliteEntityData:
+class SatelliteEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"satellite": self.__state_value}
\ No newline at end of file
+        super().__init__(SATELLITE_COLUMNS, (state_value,))
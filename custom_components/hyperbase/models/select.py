@@ -1,3 +1,8 @@
+from .base import EntityData
+
+SELECT_COLUMNS = ("selected_option",)
+
+
 class SelectColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class SelectColumns:
         return self.__columns
 
 
-class SelectEntityData:
+class SelectEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"selected_option": self.__state_value}
\ No newline at end of file
+        super().__init__(SELECT_COLUMNS, (state_value,))
@@ -1,7 +1,18 @@
+from functools import lru_cache
 from typing import Any
 
 from homeassistant.components.sensor.const import SensorDeviceClass
 
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def sensor_columns(device_class: str | None) -> tuple[str, ...]:
+    if device_class is not None:
+        return (f"sensor__{device_class}",)
+    return ("sensor",)
+
+
 class SensorColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -21,21 +32,14 @@ class SensorColumns:
         return self.__columns
 
 
+class SensorEntityData(EntityData):
+    __slots__ = ()
 
-class SensorEntityData:
     def __init__(self, device_class: str | None = None, state_value: Any | None = None):
-        self.__device_class = device_class
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        if self.__device_class is not None:
-            if self.__device_class == SensorDeviceClass.TIMESTAMP or self.__device_class == SensorDeviceClass.DATE or self.__device_class == SensorDeviceClass.ENUM:
-                return {f"sensor__{self.__device_class}": self.__state_value}
-            else:
-                try:
-                    return {f"sensor__{self.__device_class}": float(self.__state_value)}
-                except ValueError:
-                    return {f"sensor__{self.__device_class}": self.__state_value}
-        else:
-            return {f"sensor": self.__state_value}
\ No newline at end of file
+        if device_class is not None and device_class not in (
+            SensorDeviceClass.TIMESTAMP, SensorDeviceClass.DATE, SensorDeviceClass.ENUM):
+            try:
+                state_value = float(state_value)
+            except ValueError:
+                pass
+        super().__init__(sensor_columns(device_class), (state_value,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+SIREN_COLUMNS = ("siren_is_on",)
+
+
 class SirenColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class SirenColumns:
         return self.__columns
 
 
-class SirenEntityData:
+class SirenEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: bool | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"siren_is_on": self.__state_value}
\ No newline at end of file
+        super().__init__(SIREN_COLUMNS, (state_value,))
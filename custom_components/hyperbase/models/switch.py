@@ -1,3 +1,15 @@
+from functools import lru_cache
+
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def switch_columns(device_class: str | None) -> tuple[str, ...]:
+    if device_class is not None:
+        return (f"switch__{device_class}",)
+    return ("switch",)
+
+
 class SwitchColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -12,17 +24,10 @@ class SwitchColumns:
         return self.__columns
 
 
+class SwitchEntityData(EntityData):
+    __slots__ = ()
 
-class SwitchEntityData:
     def __init__(self,
         device_class: str | None = None,
         state_value: bool | None = None):
-        self.__device_class = device_class
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        if self.__device_class is not None:
-            return {f"switch__{self.__device_class}": self.__state_value}
-        else:
-            return {f"switch": self.__state_value}
\ No newline at end of file
+        super().__init__(switch_columns(device_class), (state_value,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+TEXT_COLUMNS = ("text_data",)
+
+
 class TextColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class TextColumns:
         return self.__columns
 
 
-class TextEntityData:
+class TextEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, state_value: str | None = None):
-        self.__state_value = state_value
-    
-    @property
-    def data(self):
-        return {"text_data": self.__state_value}
\ No newline at end of file
+        super().__init__(TEXT_COLUMNS, (state_value,))
@@ -1,3 +1,8 @@
+from .base import EntityData
+
+TIME_COLUMNS = ("time",)
+
+
 class TimeColumns:
     def __init__(self):
         self.__columns = {
@@ -9,10 +14,8 @@ class TimeColumns:
         return self.__columns
 
 
-class TimeEntityData:
+class TimeEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self, time_iso: str | None = None):
-        self.__state_value = time_iso
-    
-    @property
-    def data(self):
-        return {"time": self.__state_value}
\ No newline at end of file
+        super().__init__(TIME_COLUMNS, (time_iso,))
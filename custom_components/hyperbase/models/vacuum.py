@@ -1,3 +1,11 @@
+from .base import EntityData
+
+VACUUM_COLUMNS = (
+    "vacuum_fan_speed",
+    "vacuum_status",
+)
+
+
 class VacuumColumns:
     def __init__(self):
         self.__columns = {
@@ -10,17 +18,14 @@ class VacuumColumns:
         return self.__columns
 
 
-class VacuumEntityData:
+class VacuumEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         vacuum_fan_speed: str | None = None,
         vacuum_status: str | None = None,
         ):
-        self._vacuum_fan_speed = vacuum_fan_speed
-        self._vacuum_status = vacuum_status
-    
-    @property
-    def data(self):
-        return {
-            "vacuum_fan_speed": self._vacuum_fan_speed,
-            "vacuum_status": self._vacuum_status,
-        }
\ No newline at end of file
+        super().__init__(VACUUM_COLUMNS, (
+            vacuum_fan_speed,
+            vacuum_status,
+        ))
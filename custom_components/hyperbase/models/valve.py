@@ -1,3 +1,15 @@
+from functools import lru_cache
+
+from .base import EntityData
+
+
+@lru_cache(maxsize=None)
+def valve_columns(device_class: str | None) -> tuple[str, ...]:
+    if device_class is not None:
+        return (f"valve__{device_class}_is_open", f"valve__{device_class}_position")
+    return ("valve_is_open", "valve_position")
+
+
 class ValveColumns:
     def __init__(self, device_classes):
         self.__columns = {}
@@ -14,26 +26,12 @@ class ValveColumns:
         return self.__columns
 
 
+class ValveEntityData(EntityData):
+    __slots__ = ()
 
-class ValveEntityData:
     def __init__(self,
         device_class: str | None = None,
         is_open: bool | None = None,
         position: int | None = None,
         ):
-        self._device_class = device_class
-        self._is_open = is_open
-        self._position = position
-    
-    @property
-    def data(self):
-        if self._device_class is not None:
-            return {
-                f"valve__{self.__device_class}_is_open": self._is_open,
-                f"valve__{self.__device_class}_position": self._position
-            }
-        else:
-            return {
-                f"valve_is_open": self._is_open,
-                f"valve_position": self._position
-            }
\ No newline at end of file
+        super().__init__(valve_columns(device_class), (is_open, position))
@@ -1,3 +1,15 @@
+from .base import EntityData
+
+WATER_HEATER_COLUMNS = (
+    "heater_temperature",
+    "heater_target_temperature",
+    "heater_target_temperature_high",
+    "heater_target_temperature_low",
+    "heater_mode",
+    "heater_is_away",
+)
+
+
 class WaterHeaterColumns:
     def __init__(self):
         self.__columns = {
@@ -14,7 +26,9 @@ class WaterHeaterColumns:
         return self.__columns
 
 
-class WaterHeaterEntityData:
+class WaterHeaterEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         temperature: float | None = None,
         target_temperature: float | None = None,
@@ -23,20 +37,11 @@ class WaterHeaterEntityData:
         mode: str | None = None,
         is_away: bool | None = None,
         ):
-        self._temperature = temperature
-        self._target_temperature = target_temperature
-        self._target_temperature_high = target_temperature_high
-        self._target_temperature_low = target_temperature_low
-        self._mode = mode
-        self._is_away = is_away
-    
-    @property
-    def data(self):
-        return {
-            "heater_temperature": self._temperature,
-            "heater_target_temperature": self._target_temperature,
-            "heater_target_temperature_high": self._target_temperature_high,
-            "heater_target_temperature_low": self._target_temperature_low,
-            "heater_mode": self._mode,
-            "heater_is_away": self._is_away,
-        }
\ No newline at end of file
+        super().__init__(WATER_HEATER_COLUMNS, (
+            temperature,
+            target_temperature,
+            target_temperature_high,
+            target_temperature_low,
+            mode,
+            is_away,
+        ))
@@ -1,3 +1,22 @@
+from .base import EntityData
+
+WEATHER_COLUMNS = (
+    "weather_cloud_coverage",
+    "weather_condition",
+    "weather_humidity",
+    "weather_feels_like_temperature",
+    "weather_dew_point",
+    "weather_pressure",
+    "weather_temperature",
+    "weather_uv_index",
+    "weather_visibility",
+    "weather_wind_gust_speed",
+    "weather_wind_speed",
+    "weather_ozone",
+    "weather_wind_bearing",
+)
+
+
 class WeatherColumns:
     def __init__(self):
         self.__columns = {
@@ -21,7 +40,9 @@ class WeatherColumns:
         return self.__columns
 
 
-class WeatherEntityData:
+class WeatherEntityData(EntityData):
+    __slots__ = ()
+
     def __init__(self,
         cloud_coverage: int | None = None,
         condition: str | None = None,
@@ -37,34 +58,18 @@ class WeatherEntityData:
         ozone: float | None = None,
         wind_bearing: str | None = None,
         ):
-        self._cloud_coverage = cloud_coverage
-        self._condition = condition
-        self._humidity = humidity
-        self._feels_like_temperature = feels_like_temperature
-        self._dew_point = dew_point
-        self._pressure = pressure
-        self._temperature = temperature
-        self._uv_index = uv_index
-        self._visibility = visibility
-        self._wind_gust_speed = wind_gust_speed
-        self._wind_speed = wind_speed
-        self._ozone = ozone
-        self._wind_bearing = wind_bearing
-    
-    @property
-    def data(self):
-        return {
-            "weather_cloud_coverage": self._cloud_coverage,
-            "weather_condition": self._condition,
-            "weather_humidity": self._humidity,
-            "weather_feels_like_temperature": self._feels_like_temperature,
-            "weather_dew_point": self._dew_point,
-            "weather_pressure": self._pressure,
-            "weather_temperature": self._temperature,
-            "weather_uv_index": self._uv_index,
-            "weather_visibility": self._visibility,
-            "weather_wind_gust_speed": self._wind_gust_speed,
-            "weather_wind_speed": self._wind_speed,
-            "weather_ozone": self._ozone,
-            "weather_wind_bearing": self._wind_bearing,
-        }
\ No newline at end of file
+        super().__init__(WEATHER_COLUMNS, (
+            cloud_coverage,
+            condition,
+            humidity,
+            feels_like_temperature,
+            dew_point,
+            pressure,
+            temperature,
+            uv_index,
+            visibility,
+            wind_gust_speed,
+            wind_speed,
+            ozone,
+            wind_bearing,
+        ))
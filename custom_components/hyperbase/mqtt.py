@@ -1,15 +1,68 @@
+from functools import partial
+from socket import socket
+import threading
 from paho.mqtt.enums import CallbackAPIVersion
 from homeassistant.core import HomeAssistant
 from paho.mqtt import client as mqtt
 import asyncio
+import time
 
 from homeassistant.helpers.dispatcher import dispatcher_send
 from .exceptions import HyperbaseMQTTConnectionError
-from .const import LOGGER
+from .const import (
+    DEFAULT_PUBLISH_BATCH_DELAY,
+    DEFAULT_PUBLISH_BATCH_SIZE,
+    LOGGER,
+    MQTT_TRANSPORT_ASYNCIO,
+    MQTT_TRANSPORT_THREAD,
+    RECOVERY_ACK_TIMEOUT,
+)
 
 MQTT_CONNECTED = "hyperbase_mqtt_connected"
 MQTT_DISCONNECTED = "hyperbase_mqtt_disconnected"
 
+MAX_PACKETS_TO_READ = 500
+MISC_LOOP_INTERVAL = 1 # seconds
+RECONNECT_INTERVAL = 10 # seconds
+
+
+class PublishMetrics:
+    """Counters describing the coalescing publish queue."""
+    def __init__(self):
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.flushed_batches = 0
+        self.flushed_messages = 0
+        self.last_batch_size = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.last_queue_wait = 0.0
+        self.pending_acks = 0
+
+
+    def record_flush(self, batch_size: int, latency: float, queue_wait: float):
+        self.flushed_batches += 1
+        self.flushed_messages += batch_size
+        self.last_batch_size = batch_size
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self.last_queue_wait = queue_wait
+
+
+    @property
+    def as_dict(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "flushed_batches": self.flushed_batches,
+            "flushed_messages": self.flushed_messages,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+            "last_queue_wait": self.last_queue_wait,
+            "pending_acks": self.pending_acks,
+        }
+
 
 class MQTT:
     """Hyperbase MQTT client connection"""
@@ -19,16 +72,50 @@ class MQTT:
         user_id: str,
         host: str="localhost",
         port: int=1883,
+        batch_size: int=DEFAULT_PUBLISH_BATCH_SIZE,
+        batch_delay: float=DEFAULT_PUBLISH_BATCH_DELAY,
+        transport: str=MQTT_TRANSPORT_THREAD,
     ) -> None:
-        """Initialize Hyperbase MQTT client."""
+        """Initialize Hyperbase MQTT client.
+
+        Messages queued with `async_enqueue_publish` are coalesced and flushed
+        in micro-batches, either once `batch_size` messages are waiting or
+        `batch_delay` seconds after the first message of the batch was queued.
+
+        With `transport` set to `asyncio` the paho socket is driven by the
+        Home Assistant event loop instead of paho's network thread, so
+        publishing is a direct call without executor jobs or locking.
+        """
         self.hass = hass
         self.host = host
         self.port = port
         self.client_id = f"hass_{user_id}"
         self.connected = False
+        self.transport = transport
         self._mqttc: mqtt.Client = None
         self._paho_lock = asyncio.Lock()
 
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.metrics = PublishMetrics()
+        self._publish_queue: list[tuple[str, mqtt.PayloadType, int, bool]] = []
+        self._publish_queue_since: float | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+
+        # asyncio transport: acks awaited in the event loop, keyed by mid
+        self._pending_acks: dict[int, asyncio.Future[bool]] = {}
+        # thread transport: awaited mids and whether the broker rejected them,
+        # written by paho's network thread
+        self._awaited_acks: dict[int, bool] = {}
+        # rejections of mids not registered yet, kept while awaited messages are published
+        self._early_rejections: set[int] = set()
+        self._publishing_awaited = 0
+        self._awaited_lock = threading.Lock()
+        self._misc_handle: asyncio.TimerHandle | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._closing = False
+
         self.init_client()
 
     def init_client(self):
@@ -42,19 +129,255 @@ class MQTT:
 
         self._mqttc.on_connect = self._mqtt_on_connect
         self._mqttc.on_disconnect = self._mqtt_on_disconnect
+        self._mqttc.on_publish = self._mqtt_on_publish
+
+        if self.is_asyncio_transport:
+            self._mqttc.on_socket_open = self._on_socket_open
+            self._mqttc.on_socket_close = self._on_socket_close
+            self._mqttc.on_socket_register_write = self._on_socket_register_write
+            self._mqttc.on_socket_unregister_write = self._on_socket_unregister_write
 
     async def async_publish(
-        self, topic: str=None, payload: mqtt.PayloadType=None, qos: int=None, retain: bool=None
+        self, topic: str=None, payload: mqtt.PayloadType=None, qos: int=None, retain: bool=None,
+        wait_for_ack: bool=False, ack_timeout: float=RECOVERY_ACK_TIMEOUT,
+    ) -> bool | None:
+        """Publish a MQTT message.
+
+        If `wait_for_ack` is set and `qos` is greater than 0, waits up to
+        `ack_timeout` seconds until the broker acknowledged the message and
+        returns whether it was accepted.
+        """
+        if not wait_for_ack or not qos:
+            if self.is_asyncio_transport:
+                self._mqttc.publish(topic, payload, qos, retain)
+                return None
+            async with self._paho_lock:
+                await self.hass.async_add_executor_job(self._mqttc.publish, topic, payload, qos, retain)
+            return None
+        return await self.async_publish_many([(topic, payload, qos, retain)], ack_timeout) == 0
+
+    async def async_publish_many(
+        self, messages: list[tuple[str, mqtt.PayloadType, int, bool]], ack_timeout: float,
+    ) -> int:
+        """Publish messages and wait until the broker acknowledged them.
+
+        Every message is handed to paho first, then the acks are awaited
+        together. Waiting for the acks keeps the number of in-flight messages
+        bounded by the batch when a large amount of messages is republished.
+        Returns the number of QoS > 0 messages that were rejected or not
+        acknowledged within `ack_timeout`.
+        """
+        if len(messages) == 0:
+            return 0
+        if self.is_asyncio_transport:
+            return await self.__async_publish_many_nowait(messages, ack_timeout)
+
+        async with self._paho_lock:
+            infos = await self.hass.async_add_executor_job(self.__publish_awaited_batch, messages)
+        if len(infos) == 0:
+            return 0
+        self.metrics.pending_acks += len(infos)
+        try:
+            return await self.hass.async_add_executor_job(self.__wait_for_acks, infos, ack_timeout)
+        finally:
+            self.metrics.pending_acks -= len(infos)
+            self.__forget_acks(infos)
+
+    def async_enqueue_publish(
+        self, topic: str, payload: mqtt.PayloadType, qos: int=0, retain: bool=False
     ) -> None:
-        """Publish a MQTT message."""
+        """Queue a MQTT message to be published with the next batch.
+
+        Must be called from the event loop.
+        """
+        if len(self._publish_queue) == 0:
+            self._publish_queue_since = time.monotonic()
+        self._publish_queue.append((topic, payload, qos, retain))
+
+        depth = len(self._publish_queue)
+        self.metrics.queue_depth = depth
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+
+        if depth >= self.batch_size:
+            self.__async_schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                self.batch_delay, self.__async_schedule_flush)
+
+
+    def __async_schedule_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if len(self._publish_queue) == 0:
+            return
+        if self.is_asyncio_transport:
+            # publishing does not leave the event loop, flush right away
+            self.__async_flush_nowait()
+            return
+        if self._flush_task is not None:
+            # messages queued meanwhile are scheduled once it is done
+            return
+        self._flush_task = self.hass.async_create_background_task(
+            self.async_flush(), "hyperbase_mqtt_publish_flush")
+        self._flush_task.add_done_callback(self.__async_flush_done)
+
+
+    def __async_flush_done(self, _task: asyncio.Task):
+        self._flush_task = None
+        if len(self._publish_queue) >= self.batch_size:
+            self.__async_schedule_flush()
+        elif len(self._publish_queue) > 0 and self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                self.batch_delay, self.__async_schedule_flush)
+
+
+    def __take_publish_queue(self):
+        batch = self._publish_queue
+        queued_since = self._publish_queue_since
+        self._publish_queue = []
+        self._publish_queue_since = None
+        self.metrics.queue_depth = 0
+        return batch, queued_since
+
+
+    def __async_flush_nowait(self):
+        batch, queued_since = self.__take_publish_queue()
+        started = time.monotonic()
+        for topic, payload, qos, retain in batch:
+            self._mqttc.publish(topic, payload, qos, retain)
+        finished = time.monotonic()
+        self.metrics.record_flush(len(batch), finished - started, finished - queued_since)
+
+
+    async def async_flush(self) -> None:
+        """Publish every queued message with a single executor job."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if len(self._publish_queue) == 0:
+            return
+
+        if self.is_asyncio_transport:
+            self.__async_flush_nowait()
+            return
+
+        batch, queued_since = self.__take_publish_queue()
         async with self._paho_lock:
-            await self.hass.async_add_executor_job(
-                self._mqttc.publish, topic, payload, qos, retain
-            )
+            started = time.monotonic()
+            await self.hass.async_add_executor_job(self.__publish_batch, batch)
+            finished = time.monotonic()
+
+        self.metrics.record_flush(len(batch), finished - started, finished - queued_since)
+
+
+    def __publish_batch(
+        self, batch: list[tuple[str, mqtt.PayloadType, int, bool]]
+    ) -> list[mqtt.MQTTMessageInfo]:
+        return [self._mqttc.publish(topic, payload, qos, retain) for topic, payload, qos, retain in batch]
+
+
+    def __publish_awaited_batch(
+        self, batch: list[tuple[str, mqtt.PayloadType, int, bool]]
+    ) -> list[mqtt.MQTTMessageInfo]:
+        """Publish `batch` and register the mids of its QoS > 0 messages for `__wait_for_acks`."""
+        infos = []
+        with self._awaited_lock:
+            self._publishing_awaited += 1
+        try:
+            for topic, payload, qos, retain in batch:
+                info = self._mqttc.publish(topic, payload, qos, retain)
+                if not qos:
+                    continue
+                infos.append(info)
+                with self._awaited_lock:
+                    # the ack may have been handled before publish returned
+                    self._awaited_acks[info.mid] = info.mid in self._early_rejections
+        except Exception:
+            self.__forget_acks(infos)
+            raise
+        finally:
+            with self._awaited_lock:
+                self._publishing_awaited -= 1
+                if self._publishing_awaited == 0:
+                    self._early_rejections.clear()
+        return infos
+
+
+    def __forget_acks(self, infos: list[mqtt.MQTTMessageInfo]):
+        with self._awaited_lock:
+            for info in infos:
+                self._awaited_acks.pop(info.mid, None)
+
+
+    def __wait_for_acks(self, infos: list[mqtt.MQTTMessageInfo], timeout: float) -> int:
+        """Wait in a worker thread for the acks of `infos`, `timeout` seconds at most in total.
+
+        Returns the number of messages that were rejected or not acknowledged.
+        """
+        deadline = time.monotonic() + timeout
+        failed = 0
+        for info in infos:
+            try:
+                info.wait_for_publish(max(0.0, deadline - time.monotonic()))
+                published = info.is_published()
+            except (RuntimeError, ValueError):
+                # not accepted by paho, e.g. while disconnected
+                published = False
+            with self._awaited_lock:
+                rejected = self._awaited_acks.get(info.mid, False)
+            if not published or rejected:
+                failed += 1
+        return failed
+
+
+    async def __async_publish_many_nowait(
+        self, messages: list[tuple[str, mqtt.PayloadType, int, bool]], ack_timeout: float,
+    ) -> int:
+        """Publish directly from the event loop. Only valid for asyncio transport."""
+        failed = 0
+        pending = []
+        for topic, payload, qos, retain in messages:
+            info = self._mqttc.publish(topic, payload, qos, retain)
+            if not qos:
+                continue
+            if info.rc not in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN):
+                failed += 1
+                continue
+            pending.append((info.mid, self.__track_ack(info.mid)))
+        if len(pending) == 0:
+            return failed
+        done, not_done = await asyncio.wait([ack for _, ack in pending], timeout=ack_timeout)
+        failed += len(not_done)
+        for ack in done:
+            if ack.cancelled() or not ack.result():
+                failed += 1
+        # acks arriving after the timeout are not awaited anymore
+        for mid, ack in pending:
+            if ack in not_done and self._pending_acks.get(mid) is ack:
+                del self._pending_acks[mid]
+                ack.cancel()
+        self.metrics.pending_acks = len(self._pending_acks)
+        return failed
+
+
+    def __track_ack(self, mid: int) -> asyncio.Future[bool]:
+        ack = self.hass.loop.create_future()
+        self._pending_acks[mid] = ack
+        self.metrics.pending_acks = len(self._pending_acks)
+        return ack
+
+
+    def __async_resolve_ack(self, mid: int, accepted: bool):
+        ack = self._pending_acks.pop(mid, None)
+        self.metrics.pending_acks = len(self._pending_acks)
+        if ack is not None and not ack.done():
+            ack.set_result(accepted)
 
     async def async_connect(self) -> str:
         """Initiate MQTT connection to host"""
         result: int = None
+        self._closing = False
         try:
             result = await self.hass.async_add_executor_job(
                 self._mqttc.connect, self.host, self.port,
@@ -64,23 +387,135 @@ class MQTT:
 
         if result is not None and result != 0:
             raise HyperbaseMQTTConnectionError(mqtt.error_string(result))
-        self._mqttc.loop_start()
+        if not self.is_asyncio_transport:
+            self._mqttc.loop_start()
         return result
 
     async def async_disconnect(self):
         """Disconnect from the MQTT host."""
-        await self.hass.async_add_executor_job(self.__mqtt_close)
-    
-    
+        await self.async_flush()
+        self._closing = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+
+        if self.is_asyncio_transport:
+            if self._mqttc is not None:
+                self._mqttc.disconnect()
+            self.__async_stop_misc_loop()
+        else:
+            await self.hass.async_add_executor_job(self.__mqtt_close)
+
+        for ack in self._pending_acks.values():
+            ack.cancel()
+        self._pending_acks.clear()
+        self.metrics.pending_acks = 0
+
+
     def __mqtt_close(self):
         if self._mqttc is not None:
             self._mqttc.disconnect()
             self._mqttc.loop_stop()
 
+
+    def __call_in_loop(self, func, *args):
+        """Run callback in the event loop, paho may call it from a worker thread."""
+        if threading.get_ident() == self.hass.loop_thread_id:
+            func(*args)
+        else:
+            self.hass.loop.call_soon_threadsafe(func, *args)
+
+
+    def _on_socket_open(self, client: mqtt.Client, userdata, sock: socket):
+        self.__call_in_loop(self.__async_on_socket_open, client, sock.fileno())
+
+
+    def _on_socket_close(self, client: mqtt.Client, userdata, sock: socket):
+        # socket may be closed once the callback reaches the event loop,
+        # so the file descriptor is captured here
+        self.__call_in_loop(self.__async_on_socket_close, sock.fileno())
+
+
+    def _on_socket_register_write(self, client: mqtt.Client, userdata, sock: socket):
+        self.__call_in_loop(self.__async_on_socket_register_write, client, sock.fileno())
+
+
+    def _on_socket_unregister_write(self, client: mqtt.Client, userdata, sock: socket):
+        self.__call_in_loop(self.__async_on_socket_unregister_write, sock.fileno())
+
+
+    def __async_on_socket_open(self, client: mqtt.Client, fileno: int):
+        if fileno < 0:
+            return
+        self.hass.loop.add_reader(fileno, partial(self.__async_on_readable, client))
+        if self._misc_handle is None:
+            self._misc_handle = self.hass.loop.call_later(
+                MISC_LOOP_INTERVAL, self.__async_misc_loop)
+        # CONNACK may already be waiting in the socket buffer
+        self.__async_on_readable(client)
+
+
+    def __async_on_socket_close(self, fileno: int):
+        if fileno > -1:
+            self.hass.loop.remove_reader(fileno)
+            self.hass.loop.remove_writer(fileno)
+        self.__async_stop_misc_loop()
+
+
+    def __async_on_socket_register_write(self, client: mqtt.Client, fileno: int):
+        if fileno > -1:
+            self.hass.loop.add_writer(fileno, partial(self.__async_on_writable, client))
+
+
+    def __async_on_socket_unregister_write(self, fileno: int):
+        if fileno > -1:
+            self.hass.loop.remove_writer(fileno)
+
+
+    def __async_on_readable(self, client: mqtt.Client):
+        result = client.loop_read(MAX_PACKETS_TO_READ)
+        if result != mqtt.MQTT_ERR_SUCCESS and result != mqtt.MQTT_ERR_AGAIN:
+            LOGGER.debug(f"mqtt read failed | rc: {mqtt.error_string(result)}")
+
+
+    def __async_on_writable(self, client: mqtt.Client):
+        result = client.loop_write()
+        if result != mqtt.MQTT_ERR_SUCCESS and result != mqtt.MQTT_ERR_AGAIN:
+            LOGGER.debug(f"mqtt write failed | rc: {mqtt.error_string(result)}")
+
+
+    def __async_misc_loop(self):
+        """Keepalive and retry handling, normally done by paho's network thread."""
+        self._misc_handle = None
+        self._mqttc.loop_misc()
+        if self._mqttc.socket() is not None:
+            self._misc_handle = self.hass.loop.call_later(
+                MISC_LOOP_INTERVAL, self.__async_misc_loop)
+
+
+    def __async_stop_misc_loop(self):
+        if self._misc_handle is not None:
+            self._misc_handle.cancel()
+            self._misc_handle = None
+
+
+    async def __async_reconnect(self):
+        """Reconnect loop for asyncio transport. paho's network thread does this otherwise."""
+        try:
+            while not self._closing and not self.connected:
+                await asyncio.sleep(RECONNECT_INTERVAL)
+                try:
+                    await self.hass.async_add_executor_job(self._mqttc.reconnect)
+                    return
+                except OSError as err:
+                    LOGGER.debug(f"mqtt reconnect failed: {err}")
+        finally:
+            self._reconnect_task = None
+
     def _mqtt_on_connect(self, client, userdata, connect_flags, reason_code, properties) -> None:
         """
         Connect Callback
-        
+
         Function called when the client connected to the broker.
         """
         LOGGER.info(f"mqtt connected | rc: {reason_code}")
@@ -93,10 +528,46 @@ class MQTT:
     def _mqtt_on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties) -> None:
         """
         Disconnect Callback
-        
+
         Function called when the client disconnected from the broker.
         """
         LOGGER.info(f"mqtt disconnected | rc: {reason_code}")
         self.connected = False
+        if self.is_asyncio_transport and not self._closing:
+            self.__call_in_loop(self.__async_schedule_reconnect)
         # self._mqttc = None
-        # dispatcher_send(self.hass, MQTT_DISCONNECTED)
\ No newline at end of file
+        # dispatcher_send(self.hass, MQTT_DISCONNECTED)
+
+
+    def __async_schedule_reconnect(self):
+        if self._closing or self._reconnect_task is not None:
+            return
+        self._reconnect_task = self.hass.async_create_background_task(
+            self.__async_reconnect(), "hyperbase_mqtt_reconnect")
+
+
+    def _mqtt_on_publish(self, client, userdata, mid, reason_code, properties) -> None:
+        """
+        Publish Callback
+
+        Function called when the broker acknowledged a QoS > 0 message.
+        """
+        if self.is_asyncio_transport:
+            # only awaited messages have a future
+            if mid in self._pending_acks:
+                self.__call_in_loop(self.__async_resolve_ack, mid, not reason_code.is_failure)
+            return
+        if not reason_code.is_failure:
+            return
+        # paho runs this callback before marking the message published,
+        # so the waiting worker sees the rejection
+        with self._awaited_lock:
+            if mid in self._awaited_acks:
+                self._awaited_acks[mid] = True
+            elif self._publishing_awaited > 0:
+                self._early_rejections.add(mid)
+
+
+    @property
+    def is_asyncio_transport(self):
+        return self.transport == MQTT_TRANSPORT_ASYNCIO
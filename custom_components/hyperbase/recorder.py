@@ -1,147 +1,307 @@
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
 import sqlite3
+from typing import Any, AsyncIterator, Callable, TypeVar
 
-from dateutil import parser
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_dumps
 from pathlib import Path
-from .const import get_storage_directory
+from .const import SNAPSHOT_RETENTION_S, get_storage_directory
 
 DEFAULT_SNAPSHOT_PATH = get_storage_directory() + "/hyperbase-snapshot.db"
 
+# negative cache size is in KiB
+SNAPSHOT_CACHE_SIZE_KIB = 8192
+SNAPSHOT_CACHED_STATEMENTS = 64
+# ids looked up per statement, bounds the memory used by a single fetch
+SNAPSHOT_ID_CHUNK_SIZE = 500
+
+_T = TypeVar("_T")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def to_epoch_ms(timestamp: datetime | str) -> int:
+    """Epoch milliseconds of a datetime or ISO 8601 string (naive values are local time).
+    
+    Sub-millisecond digits are truncated, so a snapshot never moves into the
+    next second.
+    """
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return (timestamp.astimezone(UTC) - _EPOCH) // _MILLISECOND
+
+
+def from_epoch_ms(epoch_ms: int) -> datetime:
+    return datetime.fromtimestamp(epoch_ms / 1000, tz=UTC)
+
+
+def _migrate_initial_tables(cur: sqlite3.Cursor):
+    cur.execute("""CREATE TABLE IF NOT EXISTS snapshot(
+        "id" INTEGER PRIMARY KEY,
+        "timestamp" TEXT,
+        connector_entity_id TEXT,
+        payload TEXT,
+        collection_id TEXT,
+        project_id TEXT)
+        """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS failed(
+        "id" INTEGER PRIMARY KEY,
+        start_snapshot_time TEXT,
+        end_snapshot_time TEXT)
+        """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS check_history(
+        "id" INTEGER PRIMARY KEY,
+        "timestamp" TEXT
+        )""")
+
+
+def _migrate_snapshot_epoch(cur: sqlite3.Cursor):
+    """Store snapshot time as integer epoch milliseconds and index it."""
+    cur.execute("""CREATE TABLE snapshot_epoch(
+        "id" INTEGER PRIMARY KEY,
+        epoch_ms INTEGER NOT NULL,
+        connector_entity_id TEXT,
+        payload TEXT,
+        collection_id TEXT,
+        project_id TEXT)
+        """)
+    # stored text is always UTC `%Y-%m-%dT%H:%M:%S.%fZ`, the fraction is cut
+    # to milliseconds instead of letting SQLite round it
+    cur.execute("""
+        INSERT INTO snapshot_epoch("id", epoch_ms, connector_entity_id, payload, collection_id, project_id)
+        SELECT "id",
+            CAST(strftime('%s', substr("timestamp", 1, 19)) AS INTEGER) * 1000
+                + CASE WHEN substr("timestamp", 20, 1) = '.'
+                    THEN CAST(substr("timestamp", 21, 3) AS INTEGER) ELSE 0 END,
+            connector_entity_id, payload, collection_id, project_id
+        FROM snapshot WHERE strftime('%s', substr("timestamp", 1, 19)) IS NOT NULL
+        """)
+    cur.execute("DROP TABLE snapshot")
+    cur.execute("ALTER TABLE snapshot_epoch RENAME TO snapshot")
+    cur.execute("CREATE INDEX snapshot_project_epoch ON snapshot(project_id, epoch_ms)")
+    cur.execute("CREATE INDEX snapshot_connector_epoch ON snapshot(connector_entity_id, epoch_ms)")
+
+
+def _migrate_failed_collection(cur: sqlite3.Cursor):
+    """Record failed consistency windows per collection, NULL is every collection."""
+    cur.execute("ALTER TABLE failed ADD COLUMN collection_id TEXT")
+
+
+# index + 1 is the `user_version` of the database after the migration ran,
+# append new migrations to the end only.
+SNAPSHOT_MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    _migrate_initial_tables,
+    _migrate_snapshot_epoch,
+    _migrate_failed_collection,
+]
+
+
 class FailedSnapshot:
-    def __init__(self, id, start_time, end_time):
+    def __init__(self, id, start_time, end_time, collection_id=None):
         self.failed_id = id
         self.start_time = start_time
         self.end_time = end_time
+        self.collection_id = collection_id
 
 
 class SnapshotRecorder:
+    """Snapshot database of the integration.
+    
+    A single connection is kept open for the lifetime of the recorder. It is
+    only used from the recorder's own single thread executor, so every
+    method that touches the database must be run through
+    `async_add_executor_job` of the recorder (not the one of hass).
+    """
     def __init__(self, hass: HomeAssistant):
         self.hass = hass
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hyperbase_recorder")
+        self.__db: sqlite3.Connection | None = None
+        self.__closed = False
+    
+    
+    async def async_add_executor_job(self, target: Callable[..., _T], *args: Any) -> _T:
+        return await self.hass.loop.run_in_executor(self._executor, target, *args)
+    
     
     async def async_validate_table(self):
-        await self.hass.async_add_executor_job(self.__create_table)
+        await self.async_add_executor_job(self.__create_table)
+    
+    
+    async def async_close(self):
+        if self.__closed:
+            return
+        self.__closed = True
+        await self.async_add_executor_job(self.__close)
+        self._executor.shutdown(wait=False)
+    
+    
+    def __connection(self) -> sqlite3.Connection:
+        if self.__db is None:
+            db = sqlite3.connect(DEFAULT_SNAPSHOT_PATH, cached_statements=SNAPSHOT_CACHED_STATEMENTS)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA cache_size=-{SNAPSHOT_CACHE_SIZE_KIB}")
+            db.execute("PRAGMA temp_store=MEMORY")
+            self.__db = db
+        return self.__db
+    
+    
+    def __close(self):
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+    
     
     def __create_table(self):
-        db = sqlite3.connect(DEFAULT_SNAPSHOT_PATH)
+        """Bring the database to the latest schema version."""
+        db = self.__connection()
+        version = db.execute("PRAGMA user_version").fetchone()[0]
         cur = db.cursor()
-        cur.execute("""CREATE TABLE IF NOT EXISTS snapshot(
-            "id" INTEGER PRIMARY KEY,
-            "timestamp" TEXT,
-            connector_entity_id TEXT,
-            payload TEXT,
-            collection_id TEXT,
-            project_id TEXT)
-            """)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS failed(
-            "id" INTEGER PRIMARY KEY,
-            start_snapshot_time TEXT,
-            end_snapshot_time TEXT)
-            """)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS check_history(
-            "id" INTEGER PRIMARY KEY,
-            "timestamp" TEXT
-            )""")
+        for target_version in range(version + 1, len(SNAPSHOT_MIGRATIONS) + 1):
+            # every migration and its version bump run in one transaction
+            cur.execute("BEGIN")
+            try:
+                SNAPSHOT_MIGRATIONS[target_version - 1](cur)
+                cur.execute(f"PRAGMA user_version = {target_version}")
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        cur.close()
     
     
     def write_recorder(self, stored_data, project_id):
         data = [(
-            message.get("timestamp"),
+            to_epoch_ms(message.get("timestamp")),
             message.get("connector_entity_id"),
             message.get("collection_id"),
             message.get("payload"),
             project_id) for message in stored_data]
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
+        db = self.__connection()
+        with db:
             cur = db.cursor()
             cur.executemany("""
-                INSERT INTO snapshot("timestamp", connector_entity_id, collection_id, payload, project_id)
+                INSERT INTO snapshot(epoch_ms, connector_entity_id, collection_id, payload, project_id)
                 VALUES (?, ?, ?, ?, ?)
                 """, data)
-            db.commit()
             cur.close()
     
     
-    def write_fail_snapshot(self, start_time, end_time):
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
+    def write_fail_snapshot(self, start_time, end_time, collection_ids: list[str | None] | None = None):
+        """Record a failed consistency window for each of `collection_ids` (every collection if not given)."""
+        if collection_ids is None:
+            collection_ids = [None]
+        db = self.__connection()
+        with db:
             cur = db.cursor()
-            cur.execute("""
-                INSERT INTO failed(start_snapshot_time, end_snapshot_time)
-                VALUES (?, ?)
-                """, (start_time, end_time))
-            db.commit()
+            cur.executemany("""
+                INSERT INTO failed(start_snapshot_time, end_snapshot_time, collection_id)
+                VALUES (?, ?, ?)
+                """, [(start_time, end_time, collection_id) for collection_id in collection_ids])
             cur.close()
     
     
-    def query_snapshots(self, start_time, end_time, project_id):
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
-            cur = db.cursor()
-            rows = cur.execute("""
-                SELECT id, connector_entity_id, "timestamp" FROM snapshot
-                WHERE "timestamp" >= ? AND "timestamp" < ? AND project_id = ?
-                """, (start_time, end_time, project_id))
-            data = rows.fetchall()
-            cur.close()
-            data_set = [(item[1], parser.isoparse(item[2]).replace(microsecond=0)) for item in data]
-            data_mapping = {}
-            for item in data:
-                data_mapping[f"{item[1]}{parser.isoparse(item[2]).replace(microsecond=0)}"] = item[0]
-            return data_set, data_mapping
+    def query_snapshot_keys(self,
+        start_time,
+        end_time,
+        project_id,
+        collection_ids: list[str] | None = None,
+        ) -> list[tuple[str, int, int]]:
+        """Return (connector entity, epoch second, id) of the snapshots in the time range.
+        
+        Rows are ordered by connector entity, then time, the same order used
+        for Hyperbase records in the consistency check. If `collection_ids`
+        is given, only snapshots of those collections are returned.
+        """
+        db = self.__connection()
+        cur = db.cursor()
+        collection_filter = ""
+        params = [project_id, to_epoch_ms(start_time), to_epoch_ms(end_time)]
+        if collection_ids is not None:
+            collection_filter = "AND collection_id IN (SELECT value FROM json_each(?))"
+            params.append(json_dumps(collection_ids))
+        rows = cur.execute(f"""
+            SELECT connector_entity_id, epoch_ms / 1000, "id" FROM snapshot
+            WHERE project_id = ? AND epoch_ms >= ? AND epoch_ms < ? {collection_filter}
+            ORDER BY connector_entity_id, epoch_ms, "id"
+            """, params)
+        keys: list[tuple[str, int, int]] = rows.fetchall()
+        cur.close()
+        return keys
     
     
     def query_failed_snapshots(self):
         FAILED_ID = 0
         START_TIME = 1
         END_TIME = 2
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
+        COLLECTION_ID = 3
+        db = self.__connection()
+        with db:
             cur = db.cursor()
-            rows = cur.execute("SELECT * FROM failed ORDER BY start_snapshot_time ASC")
+            rows = cur.execute("""
+                SELECT "id", start_snapshot_time, end_snapshot_time, collection_id FROM failed
+                ORDER BY start_snapshot_time ASC
+                """)
             data = rows.fetchall()
             failed_snapshots = [FailedSnapshot(
                 snapshot[FAILED_ID],
                 snapshot[START_TIME],
-                snapshot[END_TIME]) for snapshot in data]
+                snapshot[END_TIME],
+                snapshot[COLLECTION_ID]) for snapshot in data]
             cur.close()
             return failed_snapshots
     
     
-    def flush_failed_snapshots(self, first_entry_start_time: str, last_entry_start_time: str):
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
-            cur = db.cursor()
-            cur.execute("DELETE FROM failed WHERE start_snapshot_time >= ? AND start_snapshot_time <= ?",
-                (first_entry_start_time, last_entry_start_time))
-            db.commit()
-            cur.close()
+    def query_snapshots_by_ids(self, id_list: list[int]) -> list[tuple[int, str]]:
+        """Return (id, payload) of the given snapshots, ordered by id.
+        
+        Ids are bound as a single JSON array parameter and joined through
+        `json_each`, so the statement is the same whatever the number of ids.
+        """
+        db = self.__connection()
+        cur = db.cursor()
+        rows = cur.execute("""
+            SELECT snapshot."id", snapshot.payload FROM json_each(?) AS ids
+            JOIN snapshot ON snapshot."id" = ids.value
+            ORDER BY snapshot."id"
+            """, (json_dumps(id_list), ))
+        payloads: list[tuple[int, str]] = rows.fetchall()
+        cur.close()
+        return payloads
     
     
-    def query_snapshots_by_ids(self, id_list: list):
-        select_query = " or ".join(id_list)
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
-            cur = db.cursor()
-            rows = cur.execute(f"SELECT payload FROM snapshot WHERE {select_query}")
-            payloads: list[str] = rows.fetchall()
-            cur.close()
-            return payloads
+    async def async_iter_snapshots_by_ids(self,
+        id_list: list[int],
+        chunk_size: int = SNAPSHOT_ID_CHUNK_SIZE,
+        ) -> AsyncIterator[list[tuple[int, str]]]:
+        """Stream (id, payload) rows of the given snapshots in chunks of `chunk_size` ids."""
+        for index in range(0, len(id_list), chunk_size):
+            yield await self.async_add_executor_job(
+                self.query_snapshots_by_ids, id_list[index:index + chunk_size])
     
     
     def delete_failed_snapshot_by_id(self, failed_id):
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
+        db = self.__connection()
+        with db:
             cur = db.cursor()
             cur.execute("DELETE FROM failed WHERE id = ?",
                 (failed_id, ))
-            db.commit()
             cur.close()
     
     
     def delete_old_snapshots(self):
-        old_timestamp = datetime.now() - timedelta(hours=3)
+        old_timestamp = datetime.now(tz=UTC) - timedelta(seconds=SNAPSHOT_RETENTION_S)
         
-        with sqlite3.connect(DEFAULT_SNAPSHOT_PATH) as db:
+        db = self.__connection()
+        with db:
             cur = db.cursor()
-            cur.execute("""DELETE FROM snapshot WHERE "timestamp" <= ?""",
-                (old_timestamp.isoformat(), ))
+            project_ids = [row[0] for row in cur.execute("SELECT DISTINCT project_id FROM snapshot")]
+            cur.executemany("DELETE FROM snapshot WHERE project_id = ? AND epoch_ms <= ?",
+                [(project_id, to_epoch_ms(old_timestamp)) for project_id in project_ids])
             cur.execute("DELETE FROM failed WHERE start_snapshot_time <= ?",
                 (old_timestamp.isoformat(), ))
-            db.commit()
             cur.close()
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Pooled HTTP client of the Hyperbase REST API.
+
+Every REST call of the integration, including the config flow, goes through
+an `httpx.AsyncClient` kept in `hass.data`. Connections are kept alive
+between calls and HTTP/2 is negotiated when the `h2` package is installed.
+The clients are created with Home Assistant's `create_async_httpx_client`,
+which closes them when Home Assistant closes, they are never closed by the
+integration itself. Calls that verified the server certificate before the
+clients were shared (login, project lookup, REST ping and the bucket upload)
+use the verifying client, the other calls use a second client that does not.
+"""
+from importlib.util import find_spec
+
+import httpx
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.httpx_client import create_async_httpx_client
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+REST_TIMEOUT = httpx.Timeout(10, connect=5, read=20, write=5)
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+# verify_ssl -> client
+HYPERBASE_REST_CLIENT: HassKey[dict[bool, httpx.AsyncClient]] = HassKey(f"{DOMAIN}_rest_client")
+
+
+@callback
+def async_get_rest_client(hass: HomeAssistant, verify_ssl: bool = False) -> httpx.AsyncClient:
+    """Shared REST client, created on first use and closed with Home Assistant."""
+    rest_clients = hass.data.setdefault(HYPERBASE_REST_CLIENT, {})
+    client = rest_clients.get(verify_ssl)
+    if client is None or client.is_closed:
+        client = create_async_httpx_client(hass, verify_ssl,
+            http2=HTTP2_AVAILABLE,
+            timeout=REST_TIMEOUT,
+        )
+        rest_clients[verify_ssl] = client
+    return client
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Coroutine
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import LOGGER
+
+WHEEL_RESOLUTION_S = 1
+MAX_WHEEL_SLOTS = 10
+
+TickCallback = Callable[[datetime], Coroutine[Any, Any, None]]
+
+
+class TickWheel:
+    """Connectors sharing the same poll interval.
+
+    The interval is split into slots and every connector is pinned to one
+    slot, so each wheel tick only handles a share of the connectors and the
+    load is spread over the whole interval.
+    """
+    def __init__(self, interval_s: int):
+        self.interval_s = interval_s
+        slot_count = int(interval_s / WHEEL_RESOLUTION_S)
+        self.slots: list[dict[str, TickCallback]] = [
+            {} for _ in range(max(1, min(MAX_WHEEL_SLOTS, slot_count)))]
+        self.slot_of: dict[str, int] = {}
+        self.cursor = 0
+        self.unsub: Callable[[], None] | None = None
+
+
+    def add(self, key: str, callback: TickCallback):
+        slot = min(range(len(self.slots)), key=lambda index: len(self.slots[index]))
+        self.slots[slot][key] = callback
+        self.slot_of[key] = slot
+
+
+    def remove(self, key: str):
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+
+
+    def advance(self) -> list[TickCallback]:
+        """Move to the next slot and return the callbacks due on it."""
+        due = list(self.slots[self.cursor].values())
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        return due
+
+
+    @property
+    def tick_interval(self):
+        return timedelta(seconds=self.interval_s / len(self.slots))
+
+    @property
+    def is_empty(self):
+        return len(self.slot_of) == 0
+
+
+
+class HyperbaseTickScheduler:
+    """Central scheduler for connector polling.
+
+    Connectors are bucketed by `poll_time_s`; every bucket is served by a
+    single timer instead of one timer per connector. Ticks do not read the
+    registries, the registry metadata of each connector is cached by
+    `ConnectorMetadataCache` until its device or entities change.
+    """
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._wheels: dict[int, TickWheel] = {}
+        self._scheduled: dict[str, tuple[int, TickCallback]] = {}
+
+
+    def async_add(self, key: str, interval_s: int, callback: TickCallback) -> Callable[[], None]:
+        """Schedule `callback` every `interval_s` seconds. Returns a cancel callback."""
+        self.async_remove(key)
+
+        wheel = self._wheels.get(interval_s)
+        if wheel is None:
+            wheel = TickWheel(interval_s)
+            self._wheels[interval_s] = wheel
+            wheel.unsub = async_track_time_interval(self.hass,
+                partial(self.__async_tick, wheel),
+                interval=wheel.tick_interval,
+                cancel_on_shutdown=True,
+            )
+        wheel.add(key, callback)
+        self._scheduled[key] = (interval_s, callback)
+
+        def cancel():
+            # key may have been rescheduled since, leave the newer entry alone
+            scheduled = self._scheduled.get(key)
+            if scheduled is not None and scheduled[1] is callback:
+                self.async_remove(key)
+        return cancel
+
+
+    def async_remove(self, key: str):
+        scheduled = self._scheduled.pop(key, None)
+        if scheduled is None:
+            return
+        interval_s = scheduled[0]
+        wheel = self._wheels[interval_s]
+        wheel.remove(key)
+        if wheel.is_empty:
+            wheel.unsub()
+            del self._wheels[interval_s]
+
+
+    async def __async_tick(self, wheel: TickWheel, now: datetime):
+        due = wheel.advance()
+        if len(due) < 1:
+            return
+        for callback in due:
+            try:
+                await callback(now)
+            except Exception as exc:
+                LOGGER.exception(f"Failed to process connector tick: {exc}")
+
+
+    @property
+    def wheel_sizes(self):
+        return {interval_s: len(wheel.slot_of) for interval_s, wheel in self._wheels.items()}
@@ -0,0 +1,71 @@
+from hyperbase.delta import KEYFRAME_COLUMN, DeltaDecoder, DeltaEncoder
+
+
+def make_record(date: int, **columns):
+    return {"hass_connector_entity": "connector-1", "hass_record_date": date, **columns}
+
+
+def test_first_record_is_keyframe():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    encoded = encoder.encode(make_record(1, state="on", brightness=10))
+    assert encoded == {**make_record(1, state="on", brightness=10), KEYFRAME_COLUMN: True}
+
+
+def test_delta_only_carries_changed_columns():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    encoder.encode(make_record(1, state="on", brightness=10))
+    encoded = encoder.encode(make_record(2, state="on", brightness=20))
+    assert encoded == {
+        "brightness": 20,
+        "hass_connector_entity": "connector-1",
+        "hass_record_date": 2,
+        KEYFRAME_COLUMN: False,
+    }
+
+
+def test_keyframe_every_interval():
+    encoder = DeltaEncoder(keyframe_interval=3)
+    keyframes = [
+        encoder.encode(make_record(date, brightness=date))[KEYFRAME_COLUMN]
+        for date in range(9)
+    ]
+    assert keyframes == [True, False, False, False, True, False, False, False, True]
+
+
+def test_cleared_column_forces_keyframe():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    encoder.encode(make_record(1, state="on", brightness=10))
+    encoded = encoder.encode(make_record(2, state="off", brightness=None))
+    assert encoded[KEYFRAME_COLUMN] is True
+    assert encoded["brightness"] is None
+    assert encoded["state"] == "off"
+
+
+def test_reset_forces_keyframe():
+    encoder = DeltaEncoder(keyframe_interval=10)
+    encoder.encode(make_record(1, state="on"))
+    encoder.reset()
+    assert encoder.encode(make_record(2, state="on"))[KEYFRAME_COLUMN] is True
+
+
+def test_round_trip():
+    records = [
+        make_record(1, state="on", brightness=10, color="red"),
+        make_record(2, state="on", brightness=20, color="red"),
+        make_record(3, state="on", brightness=20, color="blue"),
+        make_record(4, state="off", brightness=None, color="blue"),
+        make_record(5, state="on", brightness=30, color="blue"),
+        make_record(6, state="on", brightness=30, color="blue"),
+        make_record(7, state="on", brightness=40, color="green"),
+    ]
+    encoder = DeltaEncoder(keyframe_interval=2)
+    decoder = DeltaDecoder()
+    for record in records:
+        decoded = decoder.decode(encoder.encode(record))
+        assert {k: v for k, v in decoded.items() if k != KEYFRAME_COLUMN} == record
+
+
+def test_decoder_passes_full_mode_rows_through():
+    decoder = DeltaDecoder()
+    row = make_record(1, state="on")
+    assert decoder.decode(row) is row
@@ -0,0 +1,44 @@
+import random
+
+from hyperbase.common import missing_snapshot_ids
+
+
+def reference_missing_snapshot_ids(snapshot_keys, record_keys):
+    """Set difference of the snapshot and record keys, like before the merge join.
+
+    Snapshots sharing the same key map to the last of their ids.
+    """
+    mapping = {(connector, second): snapshot_id for connector, second, snapshot_id in snapshot_keys}
+    missing = set(mapping).difference(record_keys)
+    return sorted(mapping[key] for key in missing)
+
+
+def test_no_records():
+    snapshot_keys = [("event.a", 10, 1), ("event.a", 11, 2), ("event.b", 10, 3)]
+    assert missing_snapshot_ids(snapshot_keys, []) == [1, 2, 3]
+
+
+def test_no_snapshots():
+    assert missing_snapshot_ids([], [("event.a", 10)]) == []
+
+
+def test_duplicate_keys_keep_last_id():
+    snapshot_keys = [("event.a", 10, 1), ("event.a", 10, 2), ("event.a", 11, 3)]
+    assert missing_snapshot_ids(snapshot_keys, [("event.a", 11)]) == [2]
+
+
+def test_matches_set_difference():
+    rng = random.Random(20250101)
+    connectors = [f"event.connector_{index}" for index in range(5)]
+    for _ in range(200):
+        # same order as the recorder query: connector, second, then id
+        snapshot_keys = sorted(
+            (rng.choice(connectors), rng.randrange(60), snapshot_id)
+            for snapshot_id in range(rng.randrange(80)))
+        # records are a random subset of the snapshots plus some unknown keys
+        record_keys = {(connector, second) for connector, second, _ in snapshot_keys if rng.random() < 0.6}
+        record_keys.update((rng.choice(connectors), rng.randrange(60)) for _ in range(rng.randrange(20)))
+        record_keys = sorted(record_keys)
+
+        assert sorted(missing_snapshot_ids(snapshot_keys, record_keys)) \
+            == reference_missing_snapshot_ids(snapshot_keys, record_keys)
@@ -0,0 +1,102 @@
+import sqlite3
+from datetime import UTC, datetime
+
+import pytest
+
+from hyperbase import recorder as recorder_module
+from hyperbase.recorder import SNAPSHOT_MIGRATIONS, SnapshotRecorder, to_epoch_ms
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "hyperbase-snapshot.db")
+    monkeypatch.setattr(recorder_module, "DEFAULT_SNAPSHOT_PATH", path)
+    return path
+
+
+def migrate(path):
+    recorder = SnapshotRecorder(None)
+    recorder._SnapshotRecorder__create_table()
+    recorder._SnapshotRecorder__close()
+    recorder._executor.shutdown()
+    return sqlite3.connect(path)
+
+
+def create_baseline_tables(path, rows):
+    """Tables as created by the integration before the database was versioned."""
+    db = sqlite3.connect(path)
+    db.execute("""CREATE TABLE snapshot(
+        "id" INTEGER PRIMARY KEY,
+        "timestamp" TEXT,
+        connector_entity_id TEXT,
+        payload TEXT,
+        collection_id TEXT,
+        project_id TEXT)
+        """)
+    db.execute("""CREATE TABLE failed(
+        "id" INTEGER PRIMARY KEY,
+        start_snapshot_time TEXT,
+        end_snapshot_time TEXT)
+        """)
+    db.execute("""CREATE TABLE check_history(
+        "id" INTEGER PRIMARY KEY,
+        "timestamp" TEXT
+        )""")
+    db.executemany("""
+        INSERT INTO snapshot("id", "timestamp", connector_entity_id, payload, collection_id, project_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+    db.commit()
+    db.close()
+
+
+def columns(db, table):
+    return [row[1] for row in db.execute(f"PRAGMA table_info({table})")]
+
+
+def indexes(db, table):
+    return {row[1] for row in db.execute(f"PRAGMA index_list({table})")}
+
+
+def test_new_database_is_created_at_latest_version(snapshot_path):
+    db = migrate(snapshot_path)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == len(SNAPSHOT_MIGRATIONS)
+    assert "epoch_ms" in columns(db, "snapshot")
+    assert "timestamp" not in columns(db, "snapshot")
+    assert "collection_id" in columns(db, "failed")
+    assert {"snapshot_project_epoch", "snapshot_connector_epoch"} <= indexes(db, "snapshot")
+    db.close()
+
+
+def test_unversioned_database_is_migrated(snapshot_path):
+    create_baseline_tables(snapshot_path, [
+        (1, "2025-01-01T10:00:00.123456Z", "event.connector_1", '{"data": 1}', "collection", "project"),
+        (2, "2025-01-01T10:00:01Z", "event.connector_2", '{"data": 2}', "collection", "project"),
+        (3, "2025-01-01T10:00:02.999999Z", "event.connector_1", '{"data": 3}', "collection", "project"),
+        (4, "not a timestamp", "event.connector_1", '{"data": 4}', "collection", "project"),
+    ])
+
+    db = migrate(snapshot_path)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == len(SNAPSHOT_MIGRATIONS)
+    rows = db.execute("""
+        SELECT "id", epoch_ms, connector_entity_id, payload, collection_id, project_id
+        FROM snapshot ORDER BY "id"
+        """).fetchall()
+    db.close()
+
+    assert rows == [
+        (1, to_epoch_ms(datetime(2025, 1, 1, 10, 0, 0, 123000, tzinfo=UTC)),
+            "event.connector_1", '{"data": 1}', "collection", "project"),
+        (2, to_epoch_ms(datetime(2025, 1, 1, 10, 0, 1, tzinfo=UTC)),
+            "event.connector_2", '{"data": 2}', "collection", "project"),
+        # fractions are truncated, not rounded into the next second
+        (3, to_epoch_ms(datetime(2025, 1, 1, 10, 0, 2, 999000, tzinfo=UTC)),
+            "event.connector_1", '{"data": 3}', "collection", "project"),
+    ]
+
+
+def test_migrations_are_not_run_twice(snapshot_path):
+    migrate(snapshot_path).close()
+    db = migrate(snapshot_path)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == len(SNAPSHOT_MIGRATIONS)
+    db.close()
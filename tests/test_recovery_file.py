@@ -0,0 +1,38 @@
+import json
+from datetime import UTC, datetime
+
+from hyperbase.common import build_recovery_file
+
+RECORD_TIME = datetime(2025, 1, 1, 10, 0, 0, 123456, tzinfo=UTC)
+
+
+def reference_recovery_file(record_time, payloads):
+    """Recovery file as built by decoding every payload, like before payloads were spliced."""
+    data = [json.loads(payload) for payload in payloads]
+    return json.dumps({
+        "timestamp": record_time.isoformat(),
+        "length": len(data),
+        "data": data,
+    }, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def test_matches_json_dumps():
+    payloads = [
+        json.dumps({"data": {"sensor__temperature": 21.5, "hass_connector_entity": "event.connector_1"}},
+            separators=(",", ":")),
+        json.dumps({"data": {"hass_name_default": "Lampu ruang tamu é中", "light__state": None}},
+            separators=(",", ":"), ensure_ascii=False),
+        json.dumps({"data": {"text__value": "quote \" and \\ backslash\n"}}, separators=(",", ":")),
+    ]
+    assert build_recovery_file(RECORD_TIME, payloads) == reference_recovery_file(RECORD_TIME, payloads)
+
+
+def test_empty_payloads():
+    assert build_recovery_file(RECORD_TIME, []) == reference_recovery_file(RECORD_TIME, [])
+
+
+def test_payloads_are_not_reformatted():
+    payloads = ['{"data": {"sensor__temperature": 21.50}}']
+    content = build_recovery_file(RECORD_TIME, payloads)
+    assert payloads[0].encode() in content
+    assert json.loads(content) == json.loads(reference_recovery_file(RECORD_TIME, payloads))
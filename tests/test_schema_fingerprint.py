@@ -0,0 +1,41 @@
+from hyperbase.models import DomainDeviceClass, create_schema, get_schema_fingerprint, schema_fingerprint
+
+
+def test_fingerprint_ignores_domain_order():
+    first = get_schema_fingerprint([
+        DomainDeviceClass("sensor", ["temperature", "humidity"]),
+        DomainDeviceClass("light"),
+    ])
+    second = get_schema_fingerprint([
+        DomainDeviceClass("light"),
+        DomainDeviceClass("sensor", ["temperature", "humidity"]),
+    ])
+    assert first == second
+
+
+def test_fingerprint_ignores_device_class_order():
+    first = get_schema_fingerprint([DomainDeviceClass("sensor", ["temperature", "humidity"])])
+    second = get_schema_fingerprint([DomainDeviceClass("sensor", ["humidity", "temperature"])])
+    assert first == second
+
+
+def test_fingerprint_changes_with_model():
+    sensor = get_schema_fingerprint([DomainDeviceClass("sensor", ["temperature"])])
+    assert sensor != get_schema_fingerprint([DomainDeviceClass("sensor", ["humidity"])])
+    assert sensor != get_schema_fingerprint([
+        DomainDeviceClass("sensor", ["temperature"]),
+        DomainDeviceClass("light"),
+    ])
+
+
+def test_fingerprint_changes_with_keyframe_column():
+    entity_domains = [DomainDeviceClass("light")]
+    assert get_schema_fingerprint(entity_domains) != get_schema_fingerprint(entity_domains, keyframe=True)
+
+
+def test_fingerprint_matches_schema():
+    entity_domains = [DomainDeviceClass("sensor", ["temperature"]), DomainDeviceClass("switch")]
+    schema = {column: dict(field) for column, field in create_schema(entity_domains).items()}
+    assert get_schema_fingerprint(entity_domains) == schema_fingerprint(schema)
+    # the fingerprint does not depend on the column order of a fetched schema
+    assert schema_fingerprint(dict(reversed(schema.items()))) == schema_fingerprint(schema)